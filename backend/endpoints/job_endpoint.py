@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
+
+from core.schemas.job_schema import BatchRead, JobRead
+from core.services.job_service import JobService
+
+router = APIRouter()
+
+
+@router.get("/batch/{batch_id}/", response_model=BatchRead)
+async def get_batch(batch_id: str):
+    return await JobService.batch(batch_id=batch_id)
+
+@router.get("/{job_id}/", response_model=JobRead)
+async def get_job(job_id: str):
+    return await JobService.get(job_id=job_id)
+
+@router.get("/{job_id}/stream/")
+async def stream_job(job_id: str, last_event_id: str | None = Header(default=None)):
+    await JobService.get(job_id=job_id)
+    return StreamingResponse(
+        JobService.stream(job_id=job_id, last_event_id=last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from core.utils.metrics_export import CONTENT_TYPE, render_process_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    resume_agent = getattr(request.app.state, "resume_agent", None)
+    return PlainTextResponse(await render_process_metrics(resume_agent), media_type=CONTENT_TYPE)
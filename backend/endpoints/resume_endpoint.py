@@ -1,25 +1,74 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, File, Form, Query, UploadFile
 
-from core.schemas.resume_schema import ResumeRead, ResumeCreate, ResumeUpdate
+from core.schemas.pagination_schema import Page
+from core.schemas.resume_schema import (
+    ResumeRead, ResumeCreate, ResumeUpdate, ResumeJobRead, ResumeSummary, ResumeSearchHit,
+    ResumeBatchCreate, ResumeBatchRead
+)
 from core.db.db import SessionDep
+from core.db.loading import Loading
+from core.models.resume_version import ResumeFileKind
+from core.services.import_service import ImportService
 from core.services.resume_service import ResumeService
+from core.services.search_service import SearchService
+from core.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from core.utils.template_renderer import template_renderer
 
 router = APIRouter()
 
 
-@router.post("/create/", response_model=ResumeRead)
+@router.post("/create/", response_model=ResumeJobRead, status_code=202)
 async def create_resume(data: ResumeCreate, session: SessionDep):
     return await ResumeService.create(data=data, session=session)
 
-@router.get("/user/{user_id}/", response_model=list[ResumeRead])
-async def list_user_resumes(user_id: int, session: SessionDep):
-    return await ResumeService.list_by_user(user_id=user_id, session=session)
+@router.post("/batch/", response_model=ResumeBatchRead, status_code=202)
+async def create_resume_batch(data: ResumeBatchCreate, session: SessionDep):
+    return await ResumeService.create_batch(items=data.items, session=session)
+
+@router.post("/import/", response_model=ResumeJobRead, status_code=202)
+async def import_resume(
+        session: SessionDep,
+        user_id: int = Form(...),
+        title: str | None = Form(None),
+        file: UploadFile = File(...),
+):
+    # Пользователя проверяем до сохранения и разбора файла и вызова агента
+    await ResumeService.ensure_user_exists(user_id, session)
+    data = await ImportService.build_resume(file=file, user_id=user_id, title=title)
+    return await ResumeService.create(data=data, session=session)
+
+@router.get("/templates/", response_model=list[str])
+async def list_templates():
+    return template_renderer.available()
+
+@router.get("/user/{user_id}/", response_model=Page[ResumeSummary])
+async def list_user_resumes(
+        user_id: int,
+        session: SessionDep,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: str | None = None,
+):
+    return await ResumeService.list_by_user(user_id=user_id, session=session, limit=limit, cursor=cursor)
+
+@router.get("/search/", response_model=Page[ResumeSearchHit])
+async def search_resumes(
+        session: SessionDep,
+        q: str | None = Query(None, max_length=200),
+        skills: list[str] = Query([]),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: str | None = None,
+):
+    return await SearchService.search(session=session, query=q, skills=skills, limit=limit, cursor=cursor)
 
 @router.get("/get/{resume_id}/", response_model=ResumeRead)
-async def get_resume(resume_id: int, session: SessionDep):
-    return await ResumeService.get_by_id(resume_id=resume_id, session=session)
+async def get_resume(resume_id: int, session: SessionDep, loading: Loading = Loading.WITH_LATEST_VERSION):
+    return await ResumeService.get_by_id(resume_id=resume_id, session=session, loading=loading)
+
+@router.get("/{resume_id}/versions/{version_id}/download/{kind}/")
+async def download_resume_file(resume_id: int, version_id: int, kind: ResumeFileKind, session: SessionDep):
+    return await ResumeService.download(resume_id=resume_id, version_id=version_id, kind=kind, session=session)
 
-@router.patch("/update/{resume_id}/", response_model=ResumeRead)
+@router.patch("/update/{resume_id}/", response_model=ResumeJobRead, status_code=202)
 async def update_resume(resume_id: int, data: ResumeUpdate, session: SessionDep):
     return await ResumeService.update(resume_id=resume_id, data=data, session=session)
 
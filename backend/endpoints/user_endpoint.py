@@ -1,26 +1,35 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 
-from core.schemas.user_schema import UserRead, UserCreate, UserUpdate
+from core.schemas.pagination_schema import Page
+from core.schemas.user_schema import UserRead, UserCreate, UserUpdate, UserSummary
 from core.db.db import SessionDep
+from core.db.loading import Loading
 from core.services.user_service import UserService
+from core.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter()
 
 
-@router.get("/", response_model=list[UserRead])
-async def get_all_users(session: SessionDep):
-    users = await UserService.all(session=session)
-    return users
+@router.get("/", response_model=Page[UserSummary])
+async def get_all_users(
+        session: SessionDep,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: str | None = None,
+):
+    return await UserService.all(session=session, limit=limit, cursor=cursor)
 
 @router.post("/create/", response_model=UserRead)
 async def create(user_data: UserCreate, session: SessionDep):
     return await UserService.create(user_data=user_data, session=session)
 
-@router.get("/get/{telegram_id}/", response_model=UserRead)
-async def get_user_by_telegram_id(telegram_id: int, session: SessionDep):
-    return await UserService.get_by_telegram_id(telegram_id=telegram_id, session=session)
+@router.get("/get/{telegram_id}/", response_model=UserRead | UserSummary)
+async def get_user_by_telegram_id(telegram_id: int, session: SessionDep, loading: Loading = Loading.SUMMARY):
+    user = await UserService.get_by_telegram_id(telegram_id=telegram_id, session=session, loading=loading)
+    # В режиме summary резюме не загружались — в ответе нет и поля resumes, а не пустой список
+    schema = UserSummary if loading == Loading.SUMMARY else UserRead
+    return schema.model_validate(user)
 
-@router.patch("/update/{user_id}/", response_model=UserRead)
+@router.patch("/update/{user_id}/", response_model=UserSummary)
 async def update_user(user_id: int, user_data: UserUpdate, session: SessionDep):
     return await UserService.update(user_id=user_id, user_data=user_data, session=session)
 
@@ -1,12 +1,55 @@
+import os
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
+from sqlalchemy import text
 from backend.endpoints.user_endpoint import router as user_rt
 from backend.endpoints.resume_endpoint import router as resume_rt
+from backend.endpoints.job_endpoint import router as job_rt
+from backend.endpoints.metrics_endpoint import router as metrics_rt
+from backend.metrics_middleware import MetricsMiddleware
+from core.db import db
+from core.utils.agents.gpt_agent import get_resume_agent
+from core.utils.browser_pool import browser_pool
+from core.utils.jobs.worker import build_worker_pool
+from core.utils.resume_import.extractor import document_extractor
+from core.utils.storage import storage
+from core.utils.template_renderer import template_renderer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Воркеры внутри процесса API нужны для локальной разработки и in-memory очереди,
+    # в docker-compose генерацию выполняет отдельный сервис worker.
+    app.state.resume_agent = get_resume_agent()
+    template_renderer.precompile()
+    # Первое соединение пула: недоступная БД или неверный DB_URL видны при старте, а не на первом запросе
+    async with db.engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+    inline_workers = int(os.getenv("JOB_INLINE_WORKERS", 0))
+    pool = build_worker_pool(concurrency=inline_workers) if inline_workers else None
+
+    if pool:
+        await pool.start()
+    yield
+    if pool:
+        await pool.stop()
+        # Встроенные воркеры запускают браузер при первом рендере — закрываем его, как и отдельный worker
+        await browser_pool.stop()
+    document_extractor.shutdown()
+    await storage.close()
+    await db.engine.dispose()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(router=user_rt, prefix="/api/v1/users", tags=['users'])
 app.include_router(router=resume_rt, prefix="/api/v1/resume", tags=['resume'])
+app.include_router(router=job_rt, prefix="/api/v1/jobs", tags=['jobs'])
+app.include_router(router=metrics_rt, tags=['metrics'])
 
 @app.get("/")
 async def root():
@@ -14,4 +57,4 @@ async def root():
     return {"message": "Hello World"}
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0")
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0")
@@ -0,0 +1,50 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.utils.metrics import metrics, request_scope
+
+
+class MetricsMiddleware:
+    """Считает запросы к БД, Redis, агентам и записи файлов в рамках HTTP-запроса.
+
+    Итог пишется в метрики процесса (/metrics) с шаблоном маршрута в качестве
+    метки и отдаётся клиенту в заголовке Server-Timing.
+
+    Чистый ASGI, а не BaseHTTPMiddleware: у того call_next возвращается, как только
+    отправлены заголовки, и тело StreamingResponse (скачивание файлов, SSE задач)
+    выполнялось уже вне области подсчёта. Здесь область закрывается после последнего
+    куска тела, поэтому в /metrics попадают полная длительность и все операции.
+    Заголовок Server-Timing уходит раньше тела и отражает только время до ответа.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        # Если приложение упало до заголовков, ServerErrorMiddleware ответит 500
+        status = 500
+
+        with request_scope() as request_metrics:
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", request_metrics.server_timing(time.perf_counter() - started))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                elapsed = time.perf_counter() - started
+                # Шаблон пути (/api/v1/resume/get/{resume_id}/), а не сам путь — иначе метки размножатся по id.
+                # Router дописывает route в тот же scope
+                route_path = getattr(scope.get("route"), "path", "unmatched")
+                metrics.observe_request(scope["method"], route_path, status, elapsed, request_metrics)
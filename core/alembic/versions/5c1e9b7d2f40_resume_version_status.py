@@ -0,0 +1,34 @@
+"""resume version status
+
+Revision ID: 5c1e9b7d2f40
+Revises: a372df46f46a
+Create Date: 2025-11-24 10:12:03.418250
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e9b7d2f40'
+down_revision: Union[str, Sequence[str], None] = 'a372df46f46a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+resume_version_status = sa.Enum('PENDING', 'READY', 'FAILED', name='resumeversionstatus')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    resume_version_status.create(op.get_bind(), checkfirst=True)
+    op.add_column('resume_version', sa.Column(
+        'status', resume_version_status, server_default='READY', nullable=False
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('resume_version', 'status')
+    resume_version_status.drop(op.get_bind(), checkfirst=True)
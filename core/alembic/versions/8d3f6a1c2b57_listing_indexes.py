@@ -0,0 +1,38 @@
+"""listing indexes
+
+Revision ID: 8d3f6a1c2b57
+Revises: 5c1e9b7d2f40
+Create Date: 2025-12-02 11:40:17.205163
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f6a1c2b57'
+down_revision: Union[str, Sequence[str], None] = '5c1e9b7d2f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# CREATE INDEX CONCURRENTLY не блокирует запись, но не работает внутри транзакции
+INDEXES = (
+    ('ix_resume_user_id_id', 'resume', ['user_id', 'id']),
+    ('ix_resume_version_resume_id', 'resume_version', ['resume_id']),
+    ('ix_profile_version_id', 'profile', ['version_id']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
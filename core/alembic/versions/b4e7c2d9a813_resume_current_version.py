@@ -0,0 +1,89 @@
+"""resume current version
+
+Revision ID: b4e7c2d9a813
+Revises: 8d3f6a1c2b57
+Create Date: 2025-12-05 16:22:48.730914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e7c2d9a813'
+down_revision: Union[str, Sequence[str], None] = '8d3f6a1c2b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('resume', sa.Column('current_version_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_resume_current_version_id', 'resume', 'resume_version',
+        ['current_version_id'], ['id'], ondelete='SET NULL'
+    )
+    # Гонка max(version)+1 до этой ревизии оставляла версии с одинаковым номером:
+    # с ними уникальный индекс не построится и останется INVALID. Первая по id копия
+    # сохраняет номер, остальные получают номера после последней версии резюме в порядке id
+    op.execute("""
+        WITH ranked AS (
+            SELECT id, resume_id,
+                   row_number() OVER (PARTITION BY resume_id, version ORDER BY id) AS copy,
+                   max(version) OVER (PARTITION BY resume_id) AS top
+            FROM resume_version
+        ), renumbered AS (
+            SELECT id, top + row_number() OVER (PARTITION BY resume_id ORDER BY id) AS version
+            FROM ranked
+            WHERE copy > 1
+        )
+        UPDATE resume_version SET version = renumbered.version
+        FROM renumbered
+        WHERE resume_version.id = renumbered.id
+    """)
+    op.execute("""
+        UPDATE resume SET current_version_id = latest.id
+        FROM (
+            SELECT DISTINCT ON (resume_id) resume_id, id
+            FROM resume_version
+            ORDER BY resume_id, version DESC, id DESC
+        ) AS latest
+        WHERE latest.resume_id = resume.id
+    """)
+
+    # autocommit_block сначала коммитит добавление колонки и заполнение указателя.
+    # Индекс строится без блокировки записи, затем становится ограничением.
+    # Уникальный (resume_id, version) покрывает и выборку по resume_id — отдельный индекс не нужен
+    with op.get_context().autocommit_block():
+        # INVALID-индекс от прерванного прошлого запуска мешает создать его заново
+        op.drop_index(
+            'uq_resume_version_resume_id_version', table_name='resume_version',
+            postgresql_concurrently=True, if_exists=True
+        )
+        op.create_index(
+            'uq_resume_version_resume_id_version', 'resume_version', ['resume_id', 'version'],
+            unique=True, postgresql_concurrently=True
+        )
+    op.execute(
+        'ALTER TABLE resume_version ADD CONSTRAINT uq_resume_version_resume_id_version '
+        'UNIQUE USING INDEX uq_resume_version_resume_id_version'
+    )
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_resume_version_resume_id', table_name='resume_version',
+            postgresql_concurrently=True, if_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_resume_version_resume_id', 'resume_version', ['resume_id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+    op.drop_constraint('uq_resume_version_resume_id_version', 'resume_version', type_='unique')
+    op.drop_constraint('fk_resume_current_version_id', 'resume', type_='foreignkey')
+    op.drop_column('resume', 'current_version_id')
@@ -0,0 +1,32 @@
+"""profile deltas
+
+Revision ID: d2a9f4e61c08
+Revises: b4e7c2d9a813
+Create Date: 2025-12-09 13:05:31.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a9f4e61c08'
+down_revision: Union[str, Sequence[str], None] = 'b4e7c2d9a813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Существующие профили — полные копии, то есть снимки
+    op.add_column('profile', sa.Column('is_snapshot', sa.Boolean(), server_default=sa.true(), nullable=False))
+    op.add_column('profile', sa.Column('delta', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Перед откатом дельты нужно развернуть в полные копии: python -m scripts.compact_profiles --expand
+    op.drop_column('profile', 'delta')
+    op.drop_column('profile', 'is_snapshot')
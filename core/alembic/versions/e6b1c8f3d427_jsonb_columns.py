@@ -0,0 +1,66 @@
+"""jsonb columns
+
+Revision ID: e6b1c8f3d427
+Revises: d2a9f4e61c08
+Create Date: 2025-12-12 10:48:09.541276
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b1c8f3d427'
+down_revision: Union[str, Sequence[str], None] = 'd2a9f4e61c08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSON_COLUMNS = (
+    ('profile', 'contacts'),
+    ('profile', 'skills'),
+    ('profile', 'experience'),
+    ('profile', 'education'),
+    ('profile', 'delta'),
+    ('resume_version', 'extra_info_json'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Смена типа переписывает таблицы под ACCESS EXCLUSIVE — запускать в окно обслуживания
+    for table, column in JSON_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=postgresql.JSONB(), existing_type=sa.JSON(),
+            postgresql_using=f'{column}::jsonb'
+        )
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_profile_skills', 'profile', ['skills'],
+            postgresql_using='gin', postgresql_ops={'skills': 'jsonb_path_ops'},
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_profile_position_trgm', 'profile', ['position'],
+            postgresql_using='gin', postgresql_ops={'position': 'gin_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_profile_position_trgm', table_name='profile', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_profile_skills', table_name='profile', postgresql_concurrently=True, if_exists=True)
+
+    for table, column in JSON_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=sa.JSON(), existing_type=postgresql.JSONB(),
+            postgresql_using=f'{column}::json'
+        )
@@ -0,0 +1,37 @@
+"""profile search index
+
+Revision ID: f3c5a7e9b120
+Revises: e6b1c8f3d427
+Create Date: 2025-12-16 12:31:54.906127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c5a7e9b120'
+down_revision: Union[str, Sequence[str], None] = 'e6b1c8f3d427'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Выражение должно совпадать с SEARCH_DOCUMENT в core/services/search_service.py
+SEARCH_DOCUMENT = (
+    "to_tsvector('simple'::regconfig, coalesce(position, '') || ' ' || coalesce(skills::text, ''))"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_profile_search_document '
+            f'ON profile USING gin (({SEARCH_DOCUMENT}))'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_profile_search_document')
@@ -1,18 +1,113 @@
 import os
+import time
+from dataclasses import dataclass
+from typing import Annotated, Optional
 
+from dotenv import load_dotenv
 from fastapi import Depends
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from typing import Annotated
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
-from dotenv import load_dotenv
+from core.utils.metrics import instrument_engine, metrics
 
 load_dotenv()
 
-DATABASE_URL = os.getenv("DB_URL")
-engine = create_async_engine(DATABASE_URL, echo=True, future=True, pool_pre_ping=True)
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    return default if value is None else value.lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class DatabaseSettings:
+    """Настройки движка и пула соединений (переменные окружения DB_*).
+
+    Пул на процесс: pool_size постоянных соединений плюс до max_overflow временных,
+    запрос ждёт свободное соединение не дольше pool_timeout секунд. Сумма по всем
+    процессам (API, воркеры) должна укладываться в max_connections Postgres.
+    pool_size=0 отключает пул (NullPool) — для PgBouncer в режиме transaction,
+    вместе с statement_cache_size=0.
+    """
+    url: str
+    echo: bool = False
+    pool_size: int = 20
+    max_overflow: int = 10
+    pool_timeout: float = 10.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_cache_size: int = 500
+    command_timeout: Optional[float] = 30.0
+
+    @classmethod
+    def from_env(cls) -> "DatabaseSettings":
+        return cls(
+            url=os.getenv("DB_URL"),
+            echo=_env_flag("DB_ECHO", False),
+            pool_size=int(os.getenv("DB_POOL_SIZE", 20)),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", 10)),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", 10)),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", 1800)),
+            pool_pre_ping=_env_flag("DB_POOL_PRE_PING", True),
+            statement_cache_size=int(os.getenv("DB_STATEMENT_CACHE_SIZE", 500)),
+            command_timeout=float(os.getenv("DB_COMMAND_TIMEOUT", 30)) or None,
+        )
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Пул, который отдаёт в метрики время получения соединения и таймауты ожидания."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            metrics.observe_pool_checkout(time.perf_counter() - started, timed_out)
+
+
+def build_engine(settings: DatabaseSettings) -> AsyncEngine:
+    """Создать движок по настройкам; соединения открываются лениво, при первом запросе."""
+    options = {"echo": settings.echo}
+    if settings.pool_size > 0:
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.pool_size,
+            max_overflow=settings.max_overflow,
+            pool_timeout=settings.pool_timeout,
+            pool_recycle=settings.pool_recycle,
+            pool_pre_ping=settings.pool_pre_ping,
+        )
+    else:
+        options["poolclass"] = NullPool
+
+    if make_url(settings.url).get_driver_name() == "asyncpg":
+        # prepared_statement_cache_size — кэш подготовленных выражений SQLAlchemy на соединение,
+        # statement_cache_size — собственный кэш asyncpg; за PgBouncer оба должны быть 0
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.statement_cache_size,
+            "statement_cache_size": settings.statement_cache_size,
+            "command_timeout": settings.command_timeout,
+        }
+
+    engine = create_async_engine(settings.url, **options)
+    instrument_engine(engine)
+    return engine
+
+
+settings = DatabaseSettings.from_env()
+engine = build_engine(settings)
+
 
 async def get_session() -> None:
+    # AsyncSession берёт соединение из пула только на первом запросе к БД
     async with AsyncSession(engine, expire_on_commit=False) as session:
         yield session
 
-SessionDep = Annotated[AsyncSession, Depends(get_session)]
\ No newline at end of file
+# scope="function": сессия закрывается и соединение возвращается в пул сразу после
+# обработчика, а не после отправки ответа (в том числе потокового)
+SessionDep = Annotated[AsyncSession, Depends(get_session, scope="function")]
@@ -0,0 +1,60 @@
+from enum import Enum
+
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from core.models.resume import Resume
+from core.models.resume_version import ResumeVersion
+from core.models.user import User
+
+
+class Loading(str, Enum):
+    """Какую часть графа пользователь → резюме → версии → профиль читать вместе с объектом.
+
+    Связи моделей объявлены с lazy="raise": всё, что нужно ответу, сервис
+    запрашивает явно одним из профилей, а случайное обращение к незагруженной
+    связи падает сразу, а не превращается в лишние запросы.
+    """
+    SUMMARY = "summary"  # только сам объект, коллекции пустые
+    WITH_LATEST_VERSION = "with_latest_version"  # у каждого резюме только последняя версия с профилем
+    FULL = "full"  # все версии с профилями
+
+
+def latest_version_only():
+    """Условие для Resume.versions: только версия, на которую указывает Resume.current_version_id."""
+    return ResumeVersion.id == (
+        select(Resume.current_version_id)
+        .where(Resume.id == ResumeVersion.resume_id)
+        .scalar_subquery()
+    )
+
+
+def resume_options(loading: Loading) -> list:
+    if loading == Loading.SUMMARY:
+        return [raiseload(Resume.versions)]
+
+    versions = Resume.versions
+    if loading == Loading.WITH_LATEST_VERSION:
+        versions = versions.and_(latest_version_only())
+    return [selectinload(versions).selectinload(ResumeVersion.profile)]
+
+
+def user_options(loading: Loading) -> list:
+    if loading == Loading.SUMMARY:
+        return [raiseload(User.resumes)]
+    return [selectinload(User.resumes).options(*resume_options(loading))]
+
+
+def mark_collections_empty(*instances) -> None:
+    """Считать незагруженные коллекции объектов (Resume.versions, User.resumes) пустыми.
+
+    Loading.SUMMARY коллекции не читает, а ответ и обратные связи ждут список,
+    а не ошибку lazy="raise". Значение ставится как загруженное из БД: запроса
+    нет, и сессия не считает это изменением. Уже загруженные коллекции не трогаются.
+    """
+    for instance in instances:
+        state = inspect(instance)
+        for key in ("versions", "resumes"):
+            if key in state.mapper.relationships and key in state.unloaded:
+                set_committed_value(instance, key, [])
@@ -0,0 +1,65 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+_current: ContextVar[Optional["QueryCounter"]] = ContextVar("query_counter", default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+    """Счётчик SQL-запросов, выполненных в текущем контексте (запросе, задаче).
+
+    Считает через событие before_cursor_execute движка; контекст хранится в
+    ContextVar, поэтому параллельные запросы не смешиваются. COMMIT/ROLLBACK
+    не проходят через курсор и в счёт не попадают.
+    """
+
+    def __init__(self, budget: Optional[int] = None, label: str = ""):
+        self.budget = budget
+        self.label = label
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def check(self) -> None:
+        if self.budget is not None and self.count > self.budget:
+            queries = "\n".join(f"  {statement}" for statement in self.statements)
+            raise QueryBudgetExceeded(
+                f"{self.label or 'block'} executed {self.count} queries, budget is {self.budget}:\n{queries}"
+            )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = _current.get()
+    if counter is not None:
+        counter.statements.append(" ".join(statement.split()))
+
+
+def install(engine: AsyncEngine) -> None:
+    """Подписать движок на подсчёт запросов (идемпотентно)."""
+    if not event.contains(engine.sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+
+
+@contextmanager
+def count_queries(budget: Optional[int] = None, label: str = "") -> Iterator[QueryCounter]:
+    """Посчитать запросы внутри блока и бросить QueryBudgetExceeded, если их больше budget.
+
+        with count_queries(budget=4, label="PATCH /resume/update/") as counter:
+            ...
+    """
+    counter = QueryCounter(budget, label)
+    token = _current.set(counter)
+    try:
+        yield counter
+    finally:
+        _current.reset(token)
+    counter.check()
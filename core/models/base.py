@@ -1,6 +1,10 @@
+from sqlalchemy import JSON
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import DeclarativeBase
 
+# В Postgres — JSONB (GIN-индексы, операторы @> и ||), в остальных СУБД — обычный JSON
+JSONB = JSON().with_variant(postgresql.JSONB(), "postgresql")
+
 
 class Base(DeclarativeBase):
     pass
-
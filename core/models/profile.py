@@ -1,22 +1,35 @@
 from sqlalchemy.orm import mapped_column, Mapped, relationship
-from sqlalchemy import String, Text, JSON, ForeignKey
-from core.models.base import Base
+from sqlalchemy import String, Text, ForeignKey, Index, true
+from core.models.base import Base, JSONB
 
 
 class Profile(Base):
     __tablename__ = "profile"
+    # Поиск по навыкам (skills @> '["Python"]') и по подстроке должности (pg_trgm)
+    __table_args__ = (
+        Index("ix_profile_skills", "skills", postgresql_using="gin", postgresql_ops={"skills": "jsonb_path_ops"}),
+        Index(
+            "ix_profile_position_trgm", "position",
+            postgresql_using="gin", postgresql_ops={"position": "gin_trgm_ops"}
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str | None] = mapped_column(String(255), nullable=True, default=None)
     position: Mapped[str | None] = mapped_column(String(255), nullable=True, default=None)
-    contacts: Mapped[dict | None] = mapped_column(JSON, nullable=True, default=None)
+    contacts: Mapped[dict | None] = mapped_column(JSONB, nullable=True, default=None)
     summary: Mapped[str | None] = mapped_column(Text, nullable=True, default=None)
-    skills: Mapped[list[str]] = mapped_column(JSON, nullable=True, default=None)
-    experience: Mapped[list[dict]] = mapped_column(JSON, nullable=True, default=None)
-    education: Mapped[list[dict]] = mapped_column(JSON, nullable=True, default=None)
+    skills: Mapped[list[str]] = mapped_column(JSONB, nullable=True, default=None)
+    experience: Mapped[list[dict]] = mapped_column(JSONB, nullable=True, default=None)
+    education: Mapped[list[dict]] = mapped_column(JSONB, nullable=True, default=None)
 
-    version_id: Mapped[int] = mapped_column(ForeignKey("resume_version.id", ondelete="CASCADE"))
-    version: Mapped["ResumeVersion"] = relationship(back_populates="profile")
+    # При PROFILE_STORAGE=delta не-снимок хранит в delta только изменённые поля,
+    # остальные колонки пустые (см. core.utils.profile_store)
+    is_snapshot: Mapped[bool] = mapped_column(default=True, server_default=true(), nullable=False)
+    delta: Mapped[dict | None] = mapped_column(JSONB, nullable=True, default=None)
+
+    version_id: Mapped[int] = mapped_column(ForeignKey("resume_version.id", ondelete="CASCADE"), index=True)
+    version: Mapped["ResumeVersion"] = relationship(back_populates="profile", lazy="raise")
 
     def __repr__(self) -> str:
         return f"Profile(name={self.name!r}, position={self.position!r}, version_id={self.version_id!r})"
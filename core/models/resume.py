@@ -1,7 +1,7 @@
 from datetime import datetime
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import DateTime, ForeignKey, func, Enum as SqlEnum
+from sqlalchemy import DateTime, ForeignKey, Index, func, Enum as SqlEnum
 
 from typing import List
 
@@ -15,6 +15,8 @@ class ResumeCreationMode(str, Enum):
 
 class Resume(Base):
     __tablename__ = "resume"
+    # Список резюме пользователя листается по (user_id, id) — индекс покрывает и фильтр, и курсор
+    __table_args__ = (Index("ix_resume_user_id_id", "user_id", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str]
@@ -32,12 +34,28 @@ class Resume(Base):
     )
 
     user_id: Mapped[int] = mapped_column(ForeignKey("tg_user.telegram_id", ondelete="CASCADE"))
-    user: Mapped["User"] = relationship(back_populates="resumes")
+    user: Mapped["User"] = relationship(back_populates="resumes", lazy="raise")
+
+    # Последняя созданная версия: указатель обновляется вместе со вставкой версии,
+    # чтобы не искать максимум по всем версиям резюме
+    current_version_id: Mapped[int | None] = mapped_column(
+        ForeignKey("resume_version.id", ondelete="SET NULL", use_alter=True, name="fk_resume_current_version_id"),
+        nullable=True,
+        default=None
+    )
+    # Версия вставляется после резюме, поэтому указатель пишется отдельным UPDATE (post_update)
+    current_version: Mapped["ResumeVersion | None"] = relationship(
+        foreign_keys=[current_version_id],
+        post_update=True,
+        lazy="raise"
+    )
 
     versions: Mapped[List["ResumeVersion"]] = relationship(
         back_populates="resume",
-        lazy="selectin",
-        cascade="all, delete-orphan"
+        foreign_keys="ResumeVersion.resume_id",
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
 
     def __repr__(self) -> str:
@@ -46,4 +64,5 @@ class Resume(Base):
                 f"title={self.title!r}, "
                 f"creation_mode={self.creation_mode!r}, "
                 f"created_at={self.created_at!r}, "
-                f"user_id={self.user_id!r})")
\ No newline at end of file
+                f"user_id={self.user_id!r}, "
+                f"current_version_id={self.current_version_id!r})")
\ No newline at end of file
@@ -1,20 +1,42 @@
 from datetime import datetime
 
-from sqlalchemy import JSON, DateTime, func, ForeignKey
+from sqlalchemy import DateTime, func, ForeignKey, UniqueConstraint, Enum as SqlEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from core.models.base import Base
+from core.models.base import Base, JSONB
+from enum import Enum
 
+class ResumeVersionStatus(str, Enum):
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+
+class ResumeFileKind(str, Enum):
+    HTML = "html"
+    PDF = "pdf"
+    IMAGE = "image"
 
 class ResumeVersion(Base):
     __tablename__ = "resume_version"
+    # Номер версии уникален в резюме: параллельные правки не получат одинаковый номер.
+    # Индекс заодно обслуживает выборку версий по resume_id
+    __table_args__ = (UniqueConstraint("resume_id", "version", name="uq_resume_version_resume_id_version"),)
+    # created_at нужен в ответе сразу после вставки — забираем его через RETURNING, а не отдельным SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True)
     version: Mapped[int]
-    extra_info_json: Mapped[dict | None] = mapped_column(JSON, default=None)
+    extra_info_json: Mapped[dict | None] = mapped_column(JSONB, default=None)
+    # Ключи файлов в core.utils.storage (относительно корня хранилища), а не пути на диске
     path_to_html: Mapped[str | None] = mapped_column(default=None)
     path_to_image: Mapped[str | None] = mapped_column(default=None)
     path_to_pdf: Mapped[str | None] = mapped_column(default=None)
+    status: Mapped[ResumeVersionStatus] = mapped_column(
+        SqlEnum(ResumeVersionStatus),
+        default=ResumeVersionStatus.PENDING,
+        server_default=ResumeVersionStatus.READY.name,
+        nullable=False
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -22,9 +44,17 @@ class ResumeVersion(Base):
     )
 
     resume_id: Mapped[int] = mapped_column(ForeignKey("resume.id", ondelete="CASCADE"))
-    resume: Mapped["Resume"] = relationship(back_populates="versions")
+    resume: Mapped["Resume"] = relationship(back_populates="versions", foreign_keys=[resume_id], lazy="raise")
+
+    profile: Mapped["Profile"] = relationship(
+        back_populates="version",
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
 
-    profile: Mapped["Profile"] = relationship(back_populates="version", lazy="selectin")
+    def path_to(self, kind: ResumeFileKind) -> str | None:
+        return getattr(self, f"path_to_{kind.value}")
 
     def __repr__(self) -> str:
         return (f""
@@ -34,5 +64,6 @@ class ResumeVersion(Base):
                 f"path_to_html={self.path_to_html!r}, "
                 f"path_to_image={self.path_to_image!r}, "
                 f"path_to_pdf={self.path_to_pdf!r}, "
+                f"status={self.status!r}, "
                 f"created_at={self.created_at!r}, "
                 f"resume_id={self.resume_id!r})")
@@ -23,10 +23,13 @@ class User(Base):
         nullable=True
     )
 
+    # Что подгружать вместе с пользователем, решает запрос (core.db.loading);
+    # удаление каскадом делает сама БД (ondelete="CASCADE")
     resumes: Mapped[List["Resume"]] = relationship(
         back_populates="user",
-        lazy="selectin",
-        cascade="all, delete-orphan"
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
 
     def __repr__(self) -> str:
@@ -0,0 +1,61 @@
+from datetime import datetime, UTC
+from enum import Enum
+from uuid import uuid4
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class JobAction(str, Enum):
+    CREATE_RESUME = "create_resume"
+    EDIT_RESUME = "edit_resume"
+    RENDER_ARTIFACTS = "render_artifacts"
+
+
+class GenerationJob(BaseModel):
+    id: str = Field(default_factory=lambda: uuid4().hex)
+    action: JobAction
+    user_id: int
+    resume_id: int
+    version_id: int
+    version: int
+    source_version: int | None = None
+    instructions: str | None = None
+    batch_id: str | None = None
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = 0
+    error: str | None = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+
+class JobRead(BaseModel):
+    id: str
+    action: JobAction
+    resume_id: int
+    version_id: int
+    version: int
+    batch_id: str | None = None
+    status: JobStatus
+    attempts: int
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BatchRead(BaseModel):
+    """Состояние пачки задач из POST /resume/batch/."""
+    batch_id: str
+    total: int
+    counts: dict[JobStatus, int]
+    # Готовые резюме за минуту от создания пачки до последней завершённой задачи
+    resumes_per_minute: float | None = None
+    jobs: list[JobRead]
@@ -31,3 +31,14 @@ class ProfileRead(ProfileBase):
     version_id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ClassifiedFragments(BaseModel):
+    """Ответ агента, разобравшего фрагменты импортированного резюме по полям профиля."""
+    name: str | None = None
+    position: str | None = None
+    summary: str | None = None
+    skills: list[str] | None = None
+    experience: list[dict] | None = None
+    education: list[dict] | None = None
+    extra: dict[str, str] | None = None
@@ -1,12 +1,17 @@
 
+import os
 from datetime import datetime, UTC
-from pydantic import BaseModel, ConfigDict
+from enum import Enum
+
+from pydantic import BaseModel, ConfigDict, Field
 
 from core import ResumeVersion, Profile
 from core.models.resume import ResumeCreationMode
 from core.schemas.profile_schema import ProfileCreate, ProfileUpdate
 from core.schemas.resume_version_schema import ResumeVersionCreate, ResumeVersionUpdate, ResumeVersionRead
 
+MAX_BATCH_SIZE = int(os.getenv("RESUME_BATCH_MAX_ITEMS", 500))
+
 
 class ResumeBase(BaseModel):
     title: str
@@ -18,16 +23,63 @@ class ResumeCreate(ResumeBase, ResumeVersionCreate, ProfileCreate):
     resume_id: int | None = None
     version: int | None = None
     version_id: int | None = None
+    template: str | None = None
+    polish: bool = False
 
 class ResumeUpdate(ResumeVersionUpdate, ProfileUpdate):
     title: str | None = None
     creation_mode: ResumeCreationMode | None = None
 
+class ResumeSummary(ResumeBase):
+    """Резюме без версий и профилей — для списков."""
+    id: int
+    user_id: int
+    current_version_id: int | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ResumeSearchHit(ResumeSummary):
+    """Найденное резюме: должность и навыки текущей версии и релевантность."""
+    position: str | None = None
+    skills: list[str] | None = None
+    rank: float
+
+
 class ResumeRead(ResumeBase):
     id: int
     user_id: int
+    current_version_id: int | None = None
     versions: list["ResumeVersionRead"] = []
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class ResumeJobRead(BaseModel):
+    resume: ResumeRead
+    job_id: str | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ResumeBatchCreate(BaseModel):
+    items: list[ResumeCreate] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class ResumeBatchItemStatus(str, Enum):
+    QUEUED = "queued"
+    REJECTED = "rejected"
+
+
+class ResumeBatchItem(BaseModel):
+    """Результат по одному элементу пачки; index — позиция в запросе."""
+    index: int
+    status: ResumeBatchItemStatus
+    resume: ResumeSummary | None = None
+    job_id: str | None = None
+    error: str | None = None
+
+
+class ResumeBatchRead(BaseModel):
+    batch_id: str
+    items: list[ResumeBatchItem]
@@ -1,6 +1,7 @@
 from datetime import datetime, UTC
 from pydantic import BaseModel, ConfigDict
 
+from core.models.resume_version import ResumeVersionStatus
 from core.schemas.profile_schema import ProfileRead
 
 
@@ -29,6 +30,7 @@ class ResumeVersionRead(ResumeVersionBase):
     id: int
     resume_id: int
     created_at: datetime
+    status: ResumeVersionStatus
     profile: ProfileRead | None = None
 
     model_config = ConfigDict(from_attributes=True)
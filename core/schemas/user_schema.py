@@ -16,6 +16,13 @@ class UserUpdate(BaseModel):
     name: str | None = None
     last_seen: datetime | None = None
 
+class UserSummary(UserBase):
+    """Пользователь без резюме — для списков, чтобы не тянуть весь граф версий."""
+    telegram_id: int
+    last_seen: datetime | None
+
+    model_config = ConfigDict(from_attributes=True)
+
 class UserRead(UserBase):
     telegram_id: int
     last_seen: datetime | None
@@ -0,0 +1,107 @@
+import os
+import tempfile
+from pathlib import Path
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+
+from core.models.resume import ResumeCreationMode
+from core.schemas.resume_schema import ResumeCreate
+from core.utils.agents.gpt_agent import get_resume_agent
+from core.utils.metrics import track
+from core.utils.resume_import.extractor import SUPPORTED_EXTENSIONS, document_extractor
+from core.utils.resume_import.segmenter import segment
+
+MAX_IMPORT_BYTES = int(os.getenv("MAX_IMPORT_MB", 10)) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class ImportService:
+
+    @staticmethod
+    async def save_upload(file: UploadFile) -> Path:
+        """Сохранить загрузку во временный файл по частям, не держа весь документ в памяти."""
+        extension = Path(file.filename or "").suffix.lower()
+        if extension not in SUPPORTED_EXTENSIONS:
+            raise HTTPException(status_code=400, detail="Only PDF and DOCX files can be imported")
+
+        size = 0
+        with tempfile.NamedTemporaryFile(suffix=extension, delete=False) as tmp_file:
+            path = Path(tmp_file.name)
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_IMPORT_BYTES:
+                    tmp_file.close()
+                    path.unlink(missing_ok=True)
+                    raise HTTPException(status_code=413, detail="File is too large")
+                with track("file"):
+                    await run_in_threadpool(tmp_file.write, chunk)
+        return path
+
+    @staticmethod
+    def merge_classified(fields: dict, classified: dict) -> dict:
+        """Дополнить распознанные эвристиками поля ответом агента, не перезаписывая их.
+
+        classified уже проверен по схеме ClassifiedFragments (см. ResumeServiceAgent.classify_fragments).
+        """
+        for key in ("name", "position"):
+            if classified.get(key) and not fields.get(key):
+                fields[key] = classified[key]
+
+        if classified.get("summary"):
+            fields["summary"] = " ".join(filter(None, [fields.get("summary"), classified["summary"]]))
+
+        if classified.get("skills"):
+            fields["skills"] = list(dict.fromkeys([*fields.get("skills", []), *classified["skills"]]))
+
+        for key in ("experience", "education"):
+            if classified.get(key):
+                fields[key] = [*fields.get(key, []), *classified[key]]
+
+        return fields
+
+    @staticmethod
+    async def parse(path: str | Path) -> tuple[dict, dict]:
+        """Разобрать документ в поля профиля и extra (секции без отдельного поля)."""
+        try:
+            text = await document_extractor.extract(path)
+        except Exception as e:
+            # Битый или обрезанный файл: pdfplumber и python-docx бросают каждый свои исключения
+            logger.warning(f"Failed to extract imported document: {e!r}")
+            raise HTTPException(status_code=422, detail="Cannot read document")
+        if not text.strip():
+            raise HTTPException(status_code=422, detail="Document has no extractable text")
+
+        segmented = segment(text)
+        fields, extra = segmented.fields, {}
+
+        if segmented.unclassified:
+            logger.info(f"Import: {len(segmented.unclassified)} fragments need the agent")
+            try:
+                classified = await get_resume_agent().classify_fragments(fields, segmented.unclassified)
+            except Exception as e:
+                # Без агента импорт всё равно полезен: нераспознанный текст сохраняется как есть
+                logger.error(f"Failed to classify imported fragments: {e}")
+                classified = {"extra": {"Нераспознанный текст": "\n\n".join(segmented.unclassified)}}
+
+            fields = ImportService.merge_classified(fields, classified)
+            extra = classified.get("extra") or {}
+
+        return fields, extra
+
+    @staticmethod
+    async def build_resume(file: UploadFile, user_id: int, title: str | None) -> ResumeCreate:
+        path = await ImportService.save_upload(file)
+        try:
+            fields, extra = await ImportService.parse(path)
+        finally:
+            path.unlink(missing_ok=True)
+
+        return ResumeCreate(
+            **fields,
+            title=title or Path(file.filename).stem,
+            user_id=user_id,
+            creation_mode=ResumeCreationMode.IMPORTED,
+            extra_info_json={"source": file.filename, **({"extra": extra} if extra else {})},
+        )
@@ -0,0 +1,76 @@
+import json
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+
+from core.schemas.job_schema import GenerationJob, JobStatus
+from core.utils.jobs.job_queue import job_queue
+from core.utils.jobs.job_stream import job_stream
+
+
+class JobService:
+    @staticmethod
+    async def get(job_id: str) -> GenerationJob:
+        job = await job_queue.get(job_id)
+
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+
+        return job
+
+    @staticmethod
+    async def batch(batch_id: str) -> dict:
+        jobs = await job_queue.batch(batch_id)
+
+        if jobs is None:
+            raise HTTPException(status_code=404, detail="Batch not found")
+
+        counts = dict.fromkeys(JobStatus, 0)
+        for job in jobs:
+            counts[job.status] += 1
+
+        resumes_per_minute = None
+        done = [job for job in jobs if job.status == JobStatus.DONE]
+        if done:
+            started = min(job.created_at for job in jobs)
+            elapsed = (max(job.updated_at for job in done) - started).total_seconds()
+            resumes_per_minute = len(done) / elapsed * 60 if elapsed > 0 else None
+
+        return {
+            "batch_id": batch_id,
+            "total": len(jobs),
+            "counts": counts,
+            "resumes_per_minute": resumes_per_minute,
+            "jobs": jobs,
+        }
+
+    @staticmethod
+    def format_sse(event: str, data: dict, event_id: str | None = None) -> str:
+        message = ""
+        if event_id:
+            message += f"id: {event_id}\n"
+        message += f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        return message
+
+    @staticmethod
+    async def stream(job_id: str, last_event_id: str | None = None) -> AsyncIterator[str]:
+        """Server-Sent Events с прогрессом генерации.
+
+        Первое событие (status) уходит сразу, не дожидаясь модели, дальше идут
+        куски HTML по мере генерации (delta — готовый текст, склеивается как есть)
+        и финальное done/failed. start (новая попытка задачи) и reset (новая
+        попытка модели) означают, что накопленный HTML нужно выбросить.
+        """
+        job = await JobService.get(job_id)
+
+        yield JobService.format_sse("status", {"status": job.status, "attempts": job.attempts})
+
+        if job.status in (JobStatus.DONE, JobStatus.FAILED) and not await job_stream.exists(job_id):
+            yield JobService.format_sse("done" if job.status == JobStatus.DONE else "failed", {"error": job.error})
+            return
+
+        async for event_id, event, data in job_stream.listen(job_id, last_id=last_event_id or "0-0"):
+            if event == "ping":
+                yield ": ping\n\n"
+                continue
+            yield JobService.format_sse(event, data, event_id=event_id)
@@ -1,200 +1,658 @@
 import json
 import os
+from typing import AsyncIterator
+from uuid import uuid4
 
-from fastapi import HTTPException
-from typing import Sequence
-from pathlib import Path
+from fastapi import HTTPException, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from loguru import logger
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, raiseload, selectinload
 
 from core import ResumeVersion, Resume, User, Profile
+from core.db.db import engine
+from core.db.loading import Loading, mark_collections_empty, resume_options
+from core.models.resume_version import ResumeFileKind, ResumeVersionStatus
+from core.models.resume import ResumeCreationMode
+from core.schemas.job_schema import GenerationJob, JobAction
 from core.schemas.profile_schema import ProfileBase
-from core.schemas.resume_schema import ResumeCreate, ResumeUpdate, ResumeBase
+from core.schemas.resume_schema import ResumeCreate, ResumeUpdate, ResumeBase, ResumeBatchItemStatus
 from core.schemas.resume_version_schema import ResumeVersionBase
-from core.utils.agents.gpt_agent import ResumeServiceAgent
-from core.utils.redis_cache import redis_cache
+from core.services.search_service import SearchService
+from core.utils.agents.gpt_agent import get_resume_agent
+from core.utils.artifact_store import artifact_store
+from core.utils.browser_pool import RENDER_OPTIONS, RenderError, browser_pool
+from core.utils.html_binding import BOUND_FIELDS, BindingError, field_changes
+from core.utils.jobs.job_queue import job_queue
+from core.utils.jobs.job_stream import job_stream
+from core.utils.pagination import decode_cursor, encode_cursor, page_of
+from core.utils.profile_store import profile_store
+from core.utils.storage import InvalidStorageKey, storage
+from core.utils.template_renderer import template_renderer
+
+POLISH_INSTRUCTIONS = (
+    "Улучши формулировки и оформление резюме: сделай текст лаконичнее и убедительнее, "
+    "не добавляя фактов, которых нет в профиле."
+)
+
+DOWNLOAD_MEDIA_TYPES = {
+    ResumeFileKind.HTML: ("text/html; charset=utf-8", "html"),
+    ResumeFileKind.PDF: ("application/pdf", "pdf"),
+    ResumeFileKind.IMAGE: ("image/png", "png"),
+}
 
 
 class ResumeService:
 
     @staticmethod
-    async def create_resume_version(
+    def create_resume_version(
             resume_data: ResumeCreate | ResumeUpdate,
-            session: AsyncSession,
-            resume_id: int,
+            resume: Resume,
             version: int = 1,
+            base_profile: dict | None = None,
+            with_profile: bool = True,
     ) -> ResumeVersion:
-        async def create_version_object(resume_data, resume_id, version) -> ResumeVersion:
-            version_data = ResumeVersionBase(
-                **resume_data.model_dump(exclude={"version", "resume_id"}),
-                version=version,
-                resume_id=resume_id
-            )
-            return ResumeVersion(**version_data.model_dump(exclude_none=True))
-
-        async def handle_profile_update(resume_data, session, resume_id, version_model) -> Profile:
-            last_profile = await session.scalar(
-                select(Profile)
-                .where(ResumeVersion.resume_id == resume_id)
-                .order_by(Profile.id.desc())
-            )
-
-            profile = ProfileBase(**resume_data.model_dump(exclude_none=True))
-
-            if not last_profile:
-                profile_model = Profile(**profile.model_dump(exclude_none=True), version_id=version_model.id)
-                session.add(profile_model)
-            else:
-                profile_dict = {column.name: getattr(last_profile, column.name)
-                                for column in Profile.__table__.columns}
-
-                profile_data = {
-                    key: profile.model_dump().get(key) if profile.model_dump().get(
-                        key) is not None else profile_dict.get(
-                        key)
-                    for key in profile_dict.keys() | profile.model_dump().keys()
-                }
-
-                profile_data.pop("version_id")
-                profile_data.pop("id")
+        """Добавить к резюме версию с профилем в статусе PENDING и сделать её текущей.
+
+        Профиль версии — base_profile (поля профиля предыдущей версии, см.
+        profile_store.materialize) с наложенными на него непустыми полями resume_data;
+        хранится он полной копией или дельтой в зависимости от режима profile_store.
+        С with_profile=False профиль создаёт вызывающий код после flush (profile_store.carry_forward).
+        Метод не обращается к БД: версия, профиль и новый current_version_id попадают
+        в сессию через связи резюме и сохраняются общим коммитом вызывающего кода.
+        Сама генерация HTML выполняется воркером (см. run_generation_job).
+        """
+        version_data = ResumeVersionBase(
+            **resume_data.model_dump(exclude={"version", "resume_id"}),
+            version=version,
+            resume_id=resume.id
+        )
+        version_model = ResumeVersion(**version_data.model_dump(exclude_none=True))
+
+        if with_profile:
+            profile_data = ResumeService.profile_changes(resume_data)
+            if base_profile is not None:
+                profile_data = {**base_profile, **profile_data}
+            version_model.profile = profile_store.build(version, profile_data, base_profile)
+        # Через обратную связь: коллекция versions не загружается, если её нет в сессии
+        version_model.resume = resume
+        resume.current_version = version_model
+        return version_model
 
-                logger.info(f"Last profile: {profile_data}")
-                profile_model = Profile(**profile_data, version_id=version_model.id)
-                session.add(profile_model)
+    @staticmethod
+    def profile_changes(resume_data: ResumeCreate | ResumeUpdate) -> dict:
+        return ProfileBase(**resume_data.model_dump(exclude_none=True)).model_dump(exclude_none=True)
 
-            await session.flush()
-            return profile_model
+    @staticmethod
+    async def enqueue_generation(
+            action: JobAction,
+            user_id: int,
+            version_model: ResumeVersion,
+            instructions: str | None = None,
+            source_version: int | None = None,
+    ) -> GenerationJob:
+        job = GenerationJob(
+            action=action,
+            user_id=user_id,
+            resume_id=version_model.resume_id,
+            version_id=version_model.id,
+            version=version_model.version,
+            instructions=instructions,
+            source_version=source_version,
+        )
+        return await job_queue.enqueue(job)
 
+    @staticmethod
+    async def run_generation_job(job: GenerationJob) -> None:
         async def process_resume_service_call(resume_service, action, **kwargs) -> str:
             try:
-                if action == "create_resume":
+                if action == JobAction.CREATE_RESUME:
                     return await resume_service.create_resume(**kwargs)
-                elif action == "edit_resume":
+                elif action == JobAction.EDIT_RESUME:
                     return await resume_service.edit_resume(**kwargs)
             except Exception as e:
                 logger.error(f"Error in {action}: {e}")
                 raise
 
-        try:
-            version_model = await create_version_object(resume_data, resume_id, version)
-            session.add(version_model)
-            await session.flush()
-
-            profile_model = await handle_profile_update(resume_data, session, resume_id, version_model)
+        async def publish_delta(delta: str) -> None:
+            await job_stream.publish_delta(job.id, delta)
 
-            path_to_instructions = os.path.join(Path(__file__).parent.parent, "utils/agents/agent_instructions")
-            resume_service = ResumeServiceAgent(redis_client=redis_cache, instruction_dir=path_to_instructions)
+        async def publish_reset() -> None:
+            await job_stream.publish_reset(job.id)
 
-            profile_dict = {column.name: getattr(profile_model, column.name)
-                            for column in Profile.__table__.columns}
+        await job_stream.publish(job.id, "start", {"attempt": job.attempts})
 
-            profile_dict.pop("version_id")
-            profile_dict.pop("id")
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            version_model = await session.get(
+                ResumeVersion, job.version_id, options=[selectinload(ResumeVersion.profile)]
+            )
+            if not version_model:
+                raise Exception(f"Resume version {job.version_id} does not exist")
+
+            if job.action == JobAction.RENDER_ARTIFACTS:
+                # Ошибка рендера здесь пробрасывается, чтобы пул воркеров повторил задачу
+                await ResumeService.render_artifacts(job, version_model)
+                await session.commit()
+                await job_stream.publish(job.id, "done", {
+                    "version_id": job.version_id,
+                    "path_to_pdf": version_model.path_to_pdf,
+                    "path_to_image": version_model.path_to_image,
+                })
+                return
+
+            profile_dict = await profile_store.materialize(session, version_model)
 
             logger.info(profile_dict)
 
-            if isinstance(resume_data, ResumeCreate):
-                version_model.path_to_html = await process_resume_service_call(
+            resume_service = get_resume_agent()
+
+            if job.action == JobAction.CREATE_RESUME:
+                path_to_html = await process_resume_service_call(
                     resume_service,
-                    action="create_resume",
-                    user_id=resume_data.user_id,
-                    resume_id=resume_id,
-                    input_resume=json.dumps(profile_dict)
+                    action=job.action,
+                    user_id=job.user_id,
+                    resume_id=job.resume_id,
+                    input_resume=json.dumps(profile_dict),
+                    on_delta=publish_delta,
+                    on_reset=publish_reset
                 )
-            elif isinstance(resume_data, ResumeUpdate):
-                resume = await session.scalar(select(Resume).where(Resume.id == resume_id))
-                version_model.path_to_html = await process_resume_service_call(
+            else:
+                path_to_html = await process_resume_service_call(
                     resume_service,
-                    action="edit_resume",
-                    user_id=resume.user_id,
-                    instruction={"json": json.dumps(profile_dict), "prompt": resume_data.instructions},
-                    version=resume.versions[-1].version,
-                    resume_id=resume.id
+                    action=job.action,
+                    user_id=job.user_id,
+                    instruction={"json": json.dumps(profile_dict), "prompt": job.instructions},
+                    version=job.source_version,
+                    new_version=job.version,
+                    resume_id=job.resume_id,
+                    on_delta=publish_delta,
+                    on_reset=publish_reset
                 )
 
+            version_model.path_to_html = path_to_html
+            version_model.status = ResumeVersionStatus.READY
             await session.commit()
 
-            await session.refresh(version_model)
-            await session.refresh(profile_model)
-
-            return version_model
+            # HTML уже готов, поэтому ошибка рендера PDF/PNG не валит генерацию
+            try:
+                await ResumeService.render_artifacts(job, version_model)
+                await session.commit()
+            except RenderError as e:
+                logger.error(f"Failed to render artifacts for version {job.version_id}: {e}")
+
+        await job_stream.publish(job.id, "done", {
+            "version_id": job.version_id,
+            "path_to_html": path_to_html,
+            "path_to_pdf": version_model.path_to_pdf,
+            "path_to_image": version_model.path_to_image,
+        })
 
-        except Exception as e:
-            logger.error(f"Error in create_resume_version: {e}")
-            await session.rollback()
+    @staticmethod
+    async def render_artifacts(job: GenerationJob, version_model: ResumeVersion) -> None:
+        """Получить PDF и PNG-превью сохранённого HTML версии: из хранилища артефактов или через пул браузеров."""
+        html_code = await storage.read_text(version_model.path_to_html)
+        if html_code is None:
+            raise RenderError(f"HTML of version {version_model.id} is missing in storage")
+
+        key = artifact_store.make_key(html_code, RENDER_OPTIONS)
+        previous_key = artifact_store.key_from_path(version_model.path_to_pdf) if version_model.path_to_pdf else None
+        # Ссылка ставится до проверки файлов, чтобы их не удалил release другой версии;
+        # повтор задачи ставит ту же ссылку (версия, ключ) второй раз без эффекта
+        await artifact_store.acquire(key, version_model.id)
+        try:
+            paths = await artifact_store.get(key)
+            if paths is None:
+                result = await browser_pool.render(html_code)
+                logger.info(f"Rendered version {version_model.id} in {result.latency * 1000:.0f} ms")
+                paths = await artifact_store.put(key, pdf=result.pdf, png=result.png)
+                await job_stream.publish(job.id, "rendered", {"render_ms": round(result.latency * 1000)})
+            else:
+                await job_stream.publish(job.id, "rendered", {"render_ms": 0, "cached": True})
+        except Exception:
+            if previous_key != key:
+                await artifact_store.release(key, version_model.id)
             raise
 
+        if previous_key and previous_key != key:
+            await artifact_store.release(previous_key, version_model.id)
+
+        version_model.path_to_pdf = paths.pdf
+        version_model.path_to_image = paths.png
+
+    @staticmethod
+    async def fail_generation_job(job: GenerationJob, error: Exception) -> None:
+        if job.action == JobAction.RENDER_ARTIFACTS:
+            # HTML версии готов, не удалось только получить PDF/PNG
+            await job_stream.publish(job.id, "failed", {"version_id": job.version_id, "error": str(error)})
+            return
+
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            await session.execute(
+                update(ResumeVersion)
+                .where(ResumeVersion.id == job.version_id)
+                .values(status=ResumeVersionStatus.FAILED)
+            )
+            await session.commit()
+
+        await job_stream.publish(job.id, "failed", {"version_id": job.version_id, "error": str(error)})
+
     @staticmethod
-    async def create(data: ResumeCreate, session: AsyncSession) -> Resume:
-        user_exists = await session.scalar(select(User).where(User.telegram_id == data.user_id))
+    async def ensure_user_exists(user_id: int, session: AsyncSession) -> None:
+        # Только ключ: сама модель User подтянула бы через selectin все резюме пользователя
+        user_exists = await session.scalar(select(User.telegram_id).where(User.telegram_id == user_id))
 
         if not user_exists:
             raise HTTPException(status_code=404, detail="User does not exist")
 
+    @staticmethod
+    async def create(data: ResumeCreate, session: AsyncSession) -> dict:
+        await ResumeService.ensure_user_exists(data.user_id, session)
+
+        if data.creation_mode == ResumeCreationMode.TEMPLATE:
+            if data.template not in template_renderer.available():
+                raise HTTPException(status_code=400, detail=f"Unknown resume template: {data.template}")
+
         resume = ResumeBase(**data.model_dump(exclude={"user_id"}))
 
-        resume = Resume(**resume.model_dump(), user_id=data.user_id)
+        resume = Resume(**resume.model_dump(), user_id=data.user_id, versions=[])
         session.add(resume)
+        await session.flush()
+
+        version_model = ResumeService.create_resume_version(data, resume)
+
+        if data.creation_mode != ResumeCreationMode.TEMPLATE:
+            await session.commit()
+            SearchService.index(resume.id, version_model.profile)
+            job = await ResumeService.enqueue_generation(
+                JobAction.CREATE_RESUME, user_id=data.user_id, version_model=version_model
+            )
+            return {"resume": resume, "job_id": job.id}
+
+        # Стоковый шаблон рендерится сразу, LLM нужен только для необязательной полировки
+        profile = ProfileBase(**data.model_dump(exclude_none=True))
+        html_code = template_renderer.render(data.template, profile.model_dump())
+
+        version_model.path_to_html = await get_resume_agent().save_html(
+            user_id=data.user_id,
+            resume_id=resume.id,
+            version=version_model.version,
+            html_code=html_code,
+        )
+        version_model.extra_info_json = {**(version_model.extra_info_json or {}), "template": data.template}
+        version_model.status = ResumeVersionStatus.READY
+
+        polish_model = None
+        if data.polish:
+            polish_model = ResumeService.create_resume_version(
+                data, resume, version=version_model.version + 1,
+                base_profile=await profile_store.materialize(session, version_model),
+            )
         await session.commit()
-        await session.refresh(resume)
+        await profile_store.materialize_all(session, resume.versions)
+        SearchService.index(resume.id, resume.current_version.profile)
 
-        await ResumeService.create_resume_version(data, session, resume.id)
+        job = await ResumeService.enqueue_generation(
+            JobAction.RENDER_ARTIFACTS, user_id=data.user_id, version_model=version_model
+        )
+        if polish_model:
+            job = await ResumeService.enqueue_generation(
+                JobAction.EDIT_RESUME,
+                user_id=data.user_id,
+                version_model=polish_model,
+                instructions=POLISH_INSTRUCTIONS,
+                source_version=version_model.version,
+            )
 
-        return resume
+        return {"resume": resume, "job_id": job.id}
 
     @staticmethod
-    async def update(resume_id: int, data: ResumeUpdate, session: AsyncSession) -> Resume:
+    async def create_batch(items: list[ResumeCreate], session: AsyncSession) -> dict:
+        """Создать пачку резюме и поставить их генерацию в очередь.
+
+        Резюме, версии и профили всей пачки вставляются тремя многострочными INSERT,
+        указатели current_version_id — одним пакетным UPDATE, задачи ставятся в очередь
+        за один round trip. Элементы с несуществующим пользователем или неизвестным
+        шаблоном получают статус rejected и не мешают остальным. Одновременность
+        генерации ограничивает пул воркеров, частоту вызовов моделей — лимиты ModelRouter.
+        """
+        batch_id = uuid4().hex
+        known_users = set(await session.scalars(
+            select(User.telegram_id).where(User.telegram_id.in_({data.user_id for data in items}))
+        ))
+        templates = template_renderer.available()
+
+        results: list[dict | None] = [None] * len(items)
+        accepted: list[tuple[int, ResumeCreate]] = []
+        for index, data in enumerate(items):
+            if data.user_id not in known_users:
+                error = "User does not exist"
+            elif data.creation_mode == ResumeCreationMode.TEMPLATE and data.template not in templates:
+                error = f"Unknown resume template: {data.template}"
+            else:
+                accepted.append((index, data))
+                continue
+            results[index] = {"index": index, "status": ResumeBatchItemStatus.REJECTED, "error": error}
+
+        if not accepted:
+            return {"batch_id": batch_id, "items": results}
+
+        resume_rows = [
+            {**ResumeBase(**data.model_dump(exclude={"user_id"})).model_dump(), "user_id": data.user_id}
+            for _, data in accepted
+        ]
+        resume_ids = (await session.scalars(
+            insert(Resume).returning(Resume.id, sort_by_parameter_order=True), resume_rows
+        )).all()
+
+        # (позиция в запросе, id резюме, строка версии, профиль, поля задачи) для каждой версии пачки
+        plans = []
+        for (index, data), resume_id in zip(accepted, resume_ids):
+            profile_data = ResumeService.profile_changes(data)
+            for version_row, job_fields in await ResumeService._batch_versions(data, resume_id):
+                base = profile_data if version_row["version"] > 1 else None
+                profile = profile_store.build(version_row["version"], profile_data, base)
+                plans.append((index, resume_id, version_row, profile, job_fields))
+
+        # render_nulls: без него строки с разным набором NULL уходят разными INSERT
+        version_ids = (await session.scalars(
+            insert(ResumeVersion).returning(ResumeVersion.id, sort_by_parameter_order=True),
+            [version_row for _, _, version_row, _, _ in plans],
+            execution_options={"render_nulls": True},
+        )).all()
+        await session.execute(insert(Profile), [
+            {**profile_store.fields_of(profile), "is_snapshot": profile.is_snapshot, "delta": profile.delta,
+             "version_id": version_id}
+            for (_, _, _, profile, _), version_id in zip(plans, version_ids)
+        ], execution_options={"render_nulls": True})
+        # Текущая версия резюме — последняя из вставленных
+        current = {resume_id: version_id for (_, resume_id, _, _, _), version_id in zip(plans, version_ids)}
+        await session.execute(update(Resume), [
+            {"id": resume_id, "current_version_id": version_id} for resume_id, version_id in current.items()
+        ])
+        await session.commit()
+
+        jobs, item_jobs = [], {}
+        for (index, resume_id, version_row, profile, job_fields), version_id in zip(plans, version_ids):
+            SearchService.index(resume_id, profile)
+            job = GenerationJob(
+                user_id=items[index].user_id,
+                resume_id=resume_id,
+                version_id=version_id,
+                version=version_row["version"],
+                **job_fields,
+            )
+            jobs.append(job)
+            item_jobs[index] = job
+        # В пачку (и в её скорость) входит только последняя задача резюме — та, что отдаётся клиенту
+        for job in item_jobs.values():
+            job.batch_id = batch_id
+        await job_queue.enqueue_many(jobs)
+
+        for (index, _), resume_row, resume_id in zip(accepted, resume_rows, resume_ids):
+            results[index] = {
+                "index": index,
+                "status": ResumeBatchItemStatus.QUEUED,
+                "resume": {**resume_row, "id": resume_id, "current_version_id": current[resume_id]},
+                "job_id": item_jobs[index].id,
+            }
+        return {"batch_id": batch_id, "items": results}
+
+    @staticmethod
+    async def _batch_versions(data: ResumeCreate, resume_id: int) -> list[tuple[dict, dict]]:
+        """Строки версий нового резюме из пачки и поля их задач — как в create, но без ORM-объектов."""
+        def version_row(version: int, **values) -> dict:
+            row = ResumeVersionBase(
+                **data.model_dump(exclude={"version", "resume_id"}), version=version, resume_id=resume_id
+            ).model_dump()
+            return {**row, "status": ResumeVersionStatus.PENDING, **values}
+
+        if data.creation_mode != ResumeCreationMode.TEMPLATE:
+            return [(version_row(1), {"action": JobAction.CREATE_RESUME})]
+
+        profile = ProfileBase(**data.model_dump(exclude_none=True))
+        html_code = template_renderer.render(data.template, profile.model_dump())
+        path_to_html = await get_resume_agent().save_html(
+            user_id=data.user_id, resume_id=resume_id, version=1, html_code=html_code
+        )
+        versions = [(
+            version_row(
+                1,
+                path_to_html=path_to_html,
+                extra_info_json={**(data.extra_info_json or {}), "template": data.template},
+                status=ResumeVersionStatus.READY,
+            ),
+            {"action": JobAction.RENDER_ARTIFACTS},
+        )]
+        if data.polish:
+            versions.append((
+                version_row(2),
+                {"action": JobAction.EDIT_RESUME, "instructions": POLISH_INSTRUCTIONS, "source_version": 1},
+            ))
+        return versions
+
+    @staticmethod
+    async def latest_ready_version(resume: Resume, session: AsyncSession) -> ResumeVersion | None:
+        """Последняя готовая версия: обычно это текущая, иначе — одна строка по индексу (resume_id, version)."""
+        if resume.current_version and resume.current_version.status == ResumeVersionStatus.READY:
+            return resume.current_version
+
+        return await session.scalar(
+            select(ResumeVersion)
+            .options(joinedload(ResumeVersion.profile))
+            .where(ResumeVersion.resume_id == resume.id, ResumeVersion.status == ResumeVersionStatus.READY)
+            .order_by(ResumeVersion.version.desc())
+            .limit(1)
+        )
+
+    @staticmethod
+    async def update(resume_id: int, data: ResumeUpdate, session: AsyncSession) -> dict:
+        # Нужна только текущая версия с профилем; в ответ попадёт одна новая версия.
+        # Строка резюме блокируется до коммита — параллельные правки получат номера по очереди
         resume = await session.scalar(
             select(Resume)
-            .options(joinedload(Resume.versions).joinedload(ResumeVersion.profile))
+            .options(
+                joinedload(Resume.current_version).joinedload(ResumeVersion.profile),
+                raiseload(Resume.versions),
+            )
             .where(Resume.id == resume_id)
+            .with_for_update(of=Resume)
         )
         if not resume:
             raise HTTPException(status_code=404, detail="Resume not found")
+        mark_collections_empty(resume)
 
-        max_version = max(resume.versions, key=lambda version: version.version)
-        await ResumeService.create_resume_version(
-            data, session, resume_id=resume.id, version=max_version.version + 1
-        )
+        current_version = resume.current_version
+        source_version = await ResumeService.latest_ready_version(resume, session)
+        if current_version is None or source_version is None:
+            raise HTTPException(status_code=409, detail="Resume has not been generated yet")
 
-        update_data = data.model_dump(exclude_none=True)
+        update_data = data.model_dump(exclude_none=True, include={"title", "creation_mode"})
         for field, value in update_data.items():
             setattr(resume, field, value)
-        await session.commit()
-        await session.refresh(resume)
 
-        return resume
+        server_merge = profile_store.merges_on_server(session, current_version.profile)
+        version_model = ResumeService.create_resume_version(
+            data, resume, version=current_version.version + 1,
+            base_profile=None if server_merge else await profile_store.materialize(session, current_version),
+            with_profile=not server_merge,
+        )
+        # Восстанавливает поля профиля и в самом объекте, если он хранится дельтой
+        await profile_store.materialize(session, source_version)
+        changes = ResumeService.local_field_changes(data, source_version.profile)
+        if changes is not None:
+            try:
+                version_model.path_to_html = await get_resume_agent().apply_field_update(
+                    user_id=resume.user_id,
+                    resume_id=resume.id,
+                    version=source_version.version,
+                    new_version=version_model.version,
+                    changes=changes,
+                )
+                version_model.status = ResumeVersionStatus.READY
+            except BindingError as e:
+                logger.info(f"Field update for resume {resume.id} needs the agent: {e}")
+                changes = None
+
+        try:
+            if server_merge:
+                await session.flush()
+                await profile_store.carry_forward(
+                    session, current_version.id, version_model, ResumeService.profile_changes(data)
+                )
+            await session.commit()
+        except IntegrityError:
+            # Уникальный (resume_id, version) — на случай записи в обход блокировки
+            raise HTTPException(status_code=409, detail="Resume is being updated concurrently, try again")
+        await profile_store.materialize_all(session, [version_model])
+        SearchService.index(resume.id, version_model.profile)
+
+        if changes is None:
+            job = await ResumeService.enqueue_generation(
+                JobAction.EDIT_RESUME,
+                user_id=resume.user_id,
+                version_model=version_model,
+                instructions=data.instructions,
+                source_version=source_version.version,
+            )
+        else:
+            job = await ResumeService.enqueue_generation(
+                JobAction.RENDER_ARTIFACTS, user_id=resume.user_id, version_model=version_model
+            )
+
+        return {"resume": resume, "job_id": job.id}
 
     @staticmethod
-    async def get_by_id(resume_id: int, session: AsyncSession) -> Resume:
-        resume = await session.get(Resume, resume_id)
+    def local_field_changes(data: ResumeUpdate, profile: Profile | None) -> dict | None:
+        """Изменения полей профиля, которые можно отрисовать без LLM, или None, если нужен агент."""
+        if data.instructions or profile is None:
+            return None
+
+        update_data = data.model_dump(exclude_none=True, exclude={"title", "creation_mode"})
+        if set(update_data) - BOUND_FIELDS:
+            return None
+
+        old_data = {field: getattr(profile, field) for field in update_data}
+        return field_changes(old_data, update_data)
+
+    @staticmethod
+    async def get_by_id(resume_id: int, session: AsyncSession, loading: Loading = Loading.FULL) -> Resume:
+        resume = await session.get(Resume, resume_id, options=resume_options(loading))
 
         if not resume:
             raise HTTPException(status_code=404, detail="Resume not found")
+        if loading == Loading.SUMMARY:
+            mark_collections_empty(resume)
 
+        await profile_store.materialize_all(session, resume.versions)
         return resume
 
     @staticmethod
-    async def list_by_user(user_id: int, session: AsyncSession) -> Sequence[Resume]:
-        results = await session.scalars(
-            select(Resume).where(Resume.user_id == user_id)
+    async def list_by_user(user_id: int, session: AsyncSession, limit: int, cursor: str | None = None) -> dict:
+        """Страница резюме пользователя, новые сначала (keyset по индексу (user_id, id))."""
+        before = decode_cursor(cursor, id=int).get("id")
+
+        query = (
+            select(Resume)
+            .where(Resume.user_id == user_id)
+            .order_by(Resume.id.desc())
+            .limit(limit + 1)
         )
-        resumes = results.all()
+        if before is not None:
+            query = query.where(Resume.id < before)
 
-        if not resumes:
+        resumes = (await session.scalars(query)).all()
+
+        if not resumes and cursor is None:
             raise HTTPException(status_code=404, detail="User has no resumes yet")
 
-        return resumes
+        return page_of(resumes, limit, lambda resume: encode_cursor(id=resume.id))
+
+    @staticmethod
+    async def download(resume_id: int, version_id: int, kind: ResumeFileKind, session: AsyncSession) -> Response:
+        """Отдать файл версии потоком из хранилища, не читая его в память целиком.
+
+        Если PDF/PNG вытеснены из хранилища артефактов, а HTML на месте, ставит
+        повторный рендер и возвращает 202 с job_id — файл появится по тому же адресу.
+        """
+        row = (await session.execute(
+            select(ResumeVersion, Resume.user_id)
+            .join(Resume, Resume.id == ResumeVersion.resume_id)
+            .where(ResumeVersion.id == version_id, ResumeVersion.resume_id == resume_id)
+        )).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Resume version not found")
+        version_model, user_id = row
+
+        path = version_model.path_to(kind)
+        chunks = await ResumeService._open_stream(path) if path else None
+        if chunks is not None:
+            media_type, extension = DOWNLOAD_MEDIA_TYPES[kind]
+            return StreamingResponse(chunks, media_type=media_type, headers={
+                "Content-Disposition": f'attachment; filename="resume_{resume_id}_v{version_model.version}.{extension}"',
+            })
+
+        if kind == ResumeFileKind.HTML or not version_model.path_to_html:
+            raise HTTPException(status_code=404, detail=f"Resume {kind.value} is not ready")
+
+        job = await ResumeService.enqueue_generation(
+            JobAction.RENDER_ARTIFACTS, user_id=user_id, version_model=version_model
+        )
+        return JSONResponse({"job_id": job.id}, status_code=202)
+
+    @staticmethod
+    async def _open_stream(path: str) -> AsyncIterator[bytes] | None:
+        """Начать чтение файла до ответа клиенту: отсутствие файла должно стать 404/202, а не оборванным телом."""
+        stream = storage.stream(path)
+        try:
+            first = await anext(stream, b"")
+        except (FileNotFoundError, InvalidStorageKey):
+            # Путь за пределами хранилища (старая запись из другого контейнера) — файла для нас нет
+            return None
+
+        async def chunks() -> AsyncIterator[bytes]:
+            try:
+                yield first
+                async for chunk in stream:
+                    yield chunk
+            finally:
+                await stream.aclose()
+
+        return chunks()
 
     @staticmethod
     async def delete(resume_id: int, session: AsyncSession) -> None:
-        resume = await ResumeService.get_by_id(resume_id, session)
+        resume = await ResumeService.get_by_id(resume_id, session, loading=Loading.SUMMARY)
 
         if not resume:
             raise HTTPException(status_code=404, detail="Resume not found")
 
+        # Версии и профили удалит каскад в БД, из них нужны только ссылки на артефакты
+        artifact_refs = await ResumeService.artifact_refs(session, ResumeVersion.resume_id == resume_id)
+
+        user_id = resume.user_id
         await session.delete(resume)
         await session.commit()
+        SearchService.forget(resume_id)
+
+        await ResumeService.release_artifacts(artifact_refs)
+        # Горячий HTML, его индекс и история агента в Redis удалённому резюме больше не нужны
+        resume_agent = get_resume_agent()
+        await resume_agent.html_store.forget_resume(user_id, resume_id)
+        await resume_agent.clear_agent_session(user_id, resume_id)
+
+    @staticmethod
+    async def artifact_refs(session: AsyncSession, *criteria) -> list[tuple[str, int]]:
+        """Пары (ключ артефакта, id версии) для версий, подходящих под criteria."""
+        rows = await session.execute(
+            select(ResumeVersion.path_to_pdf, ResumeVersion.id)
+            .where(*criteria, ResumeVersion.path_to_pdf.is_not(None))
+        )
+        return [(artifact_store.key_from_path(path), version_id) for path, version_id in rows]
+
+    @staticmethod
+    async def release_artifacts(artifact_refs: list[tuple[str, int]]) -> None:
+        for key, version_id in artifact_refs:
+            await artifact_store.release(key, version_id)
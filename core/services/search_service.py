@@ -0,0 +1,109 @@
+from sqlalchemy import Float, cast, func, literal, literal_column, or_, select, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core import Profile, Resume
+from core.schemas.resume_schema import ResumeSummary
+from core.utils.pagination import decode_cursor, encode_cursor, page_of
+from core.utils.search_index import search_index
+
+# Должно совпадать с выражением индекса ix_profile_search_document (миграция f3c5a7e9b120),
+# иначе планировщик не возьмёт индекс
+SEARCH_DOCUMENT = literal_column(
+    "to_tsvector('simple'::regconfig, coalesce(profile.position, '') || ' ' || coalesce(profile.skills::text, ''))"
+)
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
+
+class SearchService:
+    """Поиск резюме по должности и навыкам текущей версии.
+
+    На Postgres — полнотекстовый индекс по должности и навыкам плюс триграммы
+    по должности (опечатки, части слов), фильтр по навыкам через jsonb @>.
+    На других СУБД — InvertedIndex в памяти процесса.
+    """
+
+    @staticmethod
+    async def search(
+            session: AsyncSession,
+            query: str | None,
+            skills: list[str] | None,
+            limit: int,
+            cursor: str | None = None,
+    ) -> dict:
+        after = decode_cursor(cursor, rank=float, id=int)
+        after = (float(after["rank"]), after["id"]) if after else None
+
+        if session.bind.dialect.name == "postgresql":
+            hits = await SearchService._search_postgres(session, query, skills, limit + 1, after)
+        else:
+            hits = await SearchService._search_memory(session, query, skills, limit + 1, after)
+
+        return page_of(hits, limit, lambda hit: encode_cursor(rank=hit["rank"], id=hit["id"]))
+
+    @staticmethod
+    async def _search_postgres(
+            session: AsyncSession, query: str | None, skills: list[str] | None, limit: int, after
+    ) -> list[dict]:
+        filters = []
+        if query:
+            ts_query = func.plainto_tsquery(SEARCH_CONFIG, query)
+            rank = cast(func.ts_rank(SEARCH_DOCUMENT, ts_query) + func.similarity(Profile.position, query), Float)
+            filters.append(or_(SEARCH_DOCUMENT.op("@@")(ts_query), Profile.position.op("%")(query)))
+        else:
+            rank = cast(literal(0.0), Float)
+        if skills:
+            filters.append(Profile.skills.op("@>")(literal(skills, postgresql.JSONB)))
+        if after is not None:
+            filters.append(tuple_(rank, Resume.id) < tuple_(*after))
+
+        rows = await session.execute(
+            select(Resume, Profile.position, Profile.skills, rank.label("rank"))
+            .join(Profile, Profile.version_id == Resume.current_version_id)
+            .where(*filters)
+            .order_by(rank.desc(), Resume.id.desc())
+            .limit(limit)
+        )
+        return [SearchService._hit(resume, position, skills, rank) for resume, position, skills, rank in rows]
+
+    @staticmethod
+    async def _search_memory(
+            session: AsyncSession, query: str | None, skills: list[str] | None, limit: int, after
+    ) -> list[dict]:
+        if not search_index.loaded:
+            rows = await session.execute(
+                select(Resume.id, Profile.position, Profile.skills)
+                .join(Profile, Profile.version_id == Resume.current_version_id)
+            )
+            for resume_id, position, resume_skills in rows:
+                search_index.add(resume_id, position, resume_skills)
+            search_index.loaded = True
+
+        found = search_index.search(query, skills, limit=limit, after=after)
+        if not found:
+            return []
+        resumes = {
+            resume.id: resume
+            for resume in await session.scalars(
+                select(Resume).where(Resume.id.in_([document.resume_id for _, document in found]))
+            )
+        }
+        return [
+            SearchService._hit(resumes[document.resume_id], document.position, document.skills, rank)
+            for rank, document in found
+            if document.resume_id in resumes
+        ]
+
+    @staticmethod
+    def _hit(resume: Resume, position: str | None, skills: list[str] | None, rank: float) -> dict:
+        return {**ResumeSummary.model_validate(resume).model_dump(), "position": position, "skills": skills, "rank": rank}
+
+    @staticmethod
+    def index(resume_id: int, profile: Profile | None) -> None:
+        """Обновить запасной индекс после новой версии (если он уже построен в этом процессе)."""
+        if search_index.loaded and profile is not None:
+            search_index.add(resume_id, profile.position, profile.skills)
+
+    @staticmethod
+    def forget(resume_id: int) -> None:
+        search_index.remove(resume_id)
@@ -1,47 +1,58 @@
 from fastapi import HTTPException
-from typing import Sequence
 
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.db.loading import Loading, mark_collections_empty, user_options
+from core.models.resume import Resume
+from core.models.resume_version import ResumeVersion
 from core.models.user import User
 from core.schemas.user_schema import UserCreate, UserUpdate
+from core.services.resume_service import ResumeService
+from core.utils.pagination import decode_cursor, encode_cursor, page_of
+from core.utils.profile_store import profile_store
 
 
 class UserService:
     @staticmethod
     async def create(user_data: UserCreate, session: AsyncSession) -> User:
         user_exists = await session.scalar(
-            select(User).where(User.telegram_id == user_data.telegram_id)
+            select(User.telegram_id).where(User.telegram_id == user_data.telegram_id)
         )
 
         if user_exists:
             raise HTTPException(status_code=409, detail="User already exists")
 
-        user = User(**user_data.model_dump())
+        # У нового пользователя резюме нет — коллекция сразу загружена пустой
+        user = User(**user_data.model_dump(), resumes=[])
 
         session.add(user)
         await session.commit()
-        await session.refresh(user)
 
         return user
 
 
     @staticmethod
-    async def get_by_telegram_id(telegram_id: int, session: AsyncSession) -> User:
+    async def get_by_telegram_id(
+            telegram_id: int, session: AsyncSession, loading: Loading = Loading.SUMMARY
+    ) -> User:
         user = await session.scalar(
-            select(User).where(User.telegram_id == telegram_id)
+            select(User).options(*user_options(loading)).where(User.telegram_id == telegram_id)
         )
 
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
+        if loading == Loading.SUMMARY:
+            mark_collections_empty(user)
 
+        await profile_store.materialize_all(
+            session, [version for resume in user.resumes for version in resume.versions]
+        )
         return user
 
     @staticmethod
     async def update(user_id: int, user_data: UserUpdate, session: AsyncSession) -> User:
-        user = await session.get(User, user_id)
+        user = await session.get(User, user_id, options=user_options(Loading.SUMMARY))
 
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
@@ -51,7 +62,6 @@ class UserService:
             setattr(user, attr, value)
 
         await session.commit()
-        await session.refresh(user)
         return user
 
     @staticmethod
@@ -61,15 +71,28 @@ class UserService:
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
+        # Резюме и версии удалит каскад, ссылки версий на общие PDF/PNG снимаем сами
+        artifact_refs = await ResumeService.artifact_refs(
+            session, ResumeVersion.resume_id.in_(select(Resume.id).where(Resume.user_id == user_id))
+        )
+
         await session.delete(user)
         await session.commit()
 
+        await ResumeService.release_artifacts(artifact_refs)
+
     @staticmethod
-    async def all(session: AsyncSession) -> Sequence[User]:
-        result = await session.scalars(select(User))
-        users = result.all()
+    async def all(session: AsyncSession, limit: int, cursor: str | None = None) -> dict:
+        """Страница пользователей по возрастанию telegram_id (keyset по первичному ключу)."""
+        after = decode_cursor(cursor, telegram_id=int).get("telegram_id")
+
+        query = select(User).order_by(User.telegram_id).limit(limit + 1)
+        if after is not None:
+            query = query.where(User.telegram_id > after)
+
+        users = (await session.scalars(query)).all()
 
-        if not users:
+        if not users and cursor is None:
             raise HTTPException(status_code=404, detail="There are no users yet")
 
-        return users
\ No newline at end of file
+        return page_of(users, limit, lambda user: encode_cursor(telegram_id=user.telegram_id))
\ No newline at end of file
@@ -0,0 +1,97 @@
+import os
+import threading
+from pathlib import Path
+from typing import Union
+
+from agents import Agent, ModelSettings
+
+AGENT_ROLES = {
+    "Resume Creator": "resume_creator_agent_instructions.txt",
+    "Resume Editor": "resume_editor_agent_instructions.txt",
+    "Resume Patcher": "resume_patch_agent_instructions.txt",
+    "Resume Importer": "resume_import_agent_instructions.txt",
+}
+
+# Патчер возвращает только изменённые секции, а импортёр — только нераспознанные фрагменты,
+# поэтому им хватает меньшего лимита
+AGENT_MAX_TOKENS = {
+    "Resume Patcher": 2048,
+    "Resume Importer": 4096,
+}
+
+
+class AgentRegistry:
+    """Процессный реестр инструкций и готовых объектов Agent.
+
+    Инструкции читаются с диска один раз, Agent собирается один раз на пару
+    (роль, модель). С hot_reload=True перед выдачей проверяется mtime файла
+    инструкций, и при изменении агенты этой роли пересобираются (удобно в dev).
+    """
+
+    def __init__(
+            self,
+            instruction_dir: Union[str, Path],
+            roles: dict[str, str] | None = None,
+            hot_reload: bool = False,
+    ):
+        self.instruction_dir = Path(instruction_dir)
+        self.roles = roles or AGENT_ROLES
+        self.hot_reload = hot_reload
+
+        self._instructions: dict[str, tuple[float, str]] = {}
+        self._agents: dict[tuple[str, str], tuple[float, Agent]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, filename: str) -> Path:
+        return self.instruction_dir / filename
+
+    def instructions(self, filename: str) -> str:
+        cached = self._instructions.get(filename)
+        if cached and not self.hot_reload:
+            return cached[1]
+
+        path = self._path(filename)
+        mtime = os.stat(path).st_mtime
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with self._lock:
+            with open(path, "r", encoding="utf-8") as file:
+                text = file.read()
+            self._instructions[filename] = (mtime, text)
+        return text
+
+    def instructions_for(self, role: str) -> str:
+        return self.instructions(self.roles[role])
+
+    @staticmethod
+    def build_agent(name: str, instructions: str, agent_model: str = "gpt-5", max_tokens: int = 8192) -> Agent:
+        return Agent(
+            name=name,
+            instructions=instructions,
+            model=agent_model,
+            model_settings=ModelSettings(
+                max_tokens=max_tokens,
+                store=True,
+            ),
+        )
+
+    def get(self, role: str, model: str) -> Agent:
+        instructions = self.instructions_for(role)
+        mtime = self._instructions[self.roles[role]][0]
+
+        cached = self._agents.get((role, model))
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        agent = self.build_agent(
+            role, instructions, agent_model=model, max_tokens=AGENT_MAX_TOKENS.get(role, 8192)
+        )
+        self._agents[(role, model)] = (mtime, agent)
+        return agent
+
+    def warm_up(self, models: list[str]) -> None:
+        """Заранее прочитать инструкции и собрать агентов для всех ролей и моделей."""
+        for role in self.roles:
+            for model in models:
+                self.get(role, model)
@@ -1,12 +1,94 @@
 import json
 import os
 from pathlib import Path
-from typing import Optional, Union
+from functools import lru_cache, partial
+from typing import Awaitable, Callable, Optional, TypeVar, Union
 
-from agents import Agent, Runner, ModelSettings
-from agents.extensions.memory.redis_session import RedisSession
+from agents import Agent, Runner
 from dotenv import load_dotenv
-from openai import RateLimitError
+from loguru import logger
+from openai.types.responses import ResponseTextDeltaEvent
+
+from core.schemas.profile_schema import ClassifiedFragments
+from core.utils.agents.agent_registry import AgentRegistry
+from core.utils.agents.json_stream import JsonStringFieldDecoder
+from core.utils.agents.llm_cache import LLMResultCache
+from core.utils.agents.model_router import ModelRouter
+from core.utils.agents.rate_limiter import build_limiters, parse_model_limits
+from core.utils.agents.redis_session import RedisSession
+from core.utils.html_binding import BindingError, render_fields
+from core.utils.html_patch import apply_patches, parse_patch_output
+from core.utils.html_store import HtmlStore
+from core.utils.metrics import track
+
+load_dotenv()
+
+INSTRUCTIONS_DIR = Path(__file__).parent / "agent_instructions"
+DEFAULT_MODELS = ["gpt-5", "gpt-5-chat-latest", "gpt-5.1", "gpt-5.1-chat-latest"]
+
+SESSION_PREFIX = "agents:session:"
+SESSION_TTL = 60 * 60 * 24 * 7
+
+DeltaCallback = Callable[[str], Awaitable[None]]
+ResetCallback = Callable[[], Awaitable[None]]
+T = TypeVar("T")
+
+
+class _AttemptStream:
+    def __init__(self):
+        self.decoder = JsonStringFieldDecoder("html_code")
+        self.pending: list[str] = []
+
+
+class _StreamRelay:
+    """Поток дельт одного вызова агента, в котором попыток моделей может быть несколько.
+
+    В эфир (on_delta) идёт одна попытка — ведущая; параллельные попытки хеджа
+    копят раскодированный текст у себя. Если ведущая упала, эфир забирает
+    первая попытка, приславшая следующий кусок; если первой закончила попытка
+    хеджа, она забирает эфир целиком. Смена ведущей начинается с on_reset,
+    после чего отдаётся всё накопленное новой ведущей.
+    """
+
+    def __init__(self, on_delta: DeltaCallback, on_reset: Optional[ResetCallback]):
+        self.on_delta = on_delta
+        self.on_reset = on_reset
+        self.owner: Optional[_AttemptStream] = None
+        self.winner: Optional[_AttemptStream] = None
+
+    def open(self) -> _AttemptStream:
+        return _AttemptStream()
+
+    async def _take(self, stream: _AttemptStream) -> None:
+        self.owner = stream
+        if self.on_reset:
+            await self.on_reset()
+        if stream.pending:
+            text, stream.pending = "".join(stream.pending), []
+            await self.on_delta(text)
+
+    async def feed(self, stream: _AttemptStream, chunk: str) -> None:
+        text = stream.decoder.feed(chunk)
+        if text:
+            stream.pending.append(text)
+        if self.owner is None and self.winner is None:
+            await self._take(stream)
+        elif self.owner is stream and stream.pending:
+            text, stream.pending = "".join(stream.pending), []
+            await self.on_delta(text)
+
+    def fail(self, stream: _AttemptStream) -> None:
+        if self.owner is stream:
+            self.owner = None
+
+    async def finish(self, stream: _AttemptStream) -> bool:
+        """Отметить попытку успешной; True, если она первая и её ответ — итоговый."""
+        if self.winner is not None:
+            return False
+        self.winner = stream
+        if self.owner is not stream:
+            await self._take(stream)
+        return True
 
 
 class ResumeServiceAgent:
@@ -14,147 +96,297 @@ class ResumeServiceAgent:
             self,
             redis_client,
             instruction_dir: Union[str, Path],
-            backup_models: list[str] = ["gpt-5","gpt-5-chat-latest","gpt-5.1","gpt-5.1-chat-latest"]
+            backup_models: list[str] = DEFAULT_MODELS,
+            llm_cache: Optional[LLMResultCache] = None,
+            agent_registry: Optional[AgentRegistry] = None,
+            model_router: Optional[ModelRouter] = None,
+            runner=Runner,
+            patch_edits: bool = True,
+            html_store: Optional[HtmlStore] = None,
     ):
-        load_dotenv()
-
         self.redis_client = redis_client
-        self.openai_api_key = os.getenv("OPENAI_API_KEY")
-        os.environ["OPENAI_API_KEY"] = self.openai_api_key
-
         self.instruction_dir = Path(instruction_dir)
 
         self.backup_models = backup_models
+        self.llm_cache = llm_cache or LLMResultCache(redis_client)
+        self.agent_registry = agent_registry or AgentRegistry(self.instruction_dir)
+        self.model_router = model_router or ModelRouter(backup_models)
+        self.runner = runner
+        self.patch_edits = patch_edits
+        self.html_store = html_store or HtmlStore(redis_client)
+
+    async def _run_agent(
+            self,
+            agent: Agent,
+            input_data: str,
+            session,
+            on_delta: Optional[DeltaCallback] = None
+    ) -> str:
+        """Запустить агента; если передан on_delta — в потоковом режиме, отдавая сырые куски ответа по мере генерации."""
+        if on_delta is None:
+            result = await self.runner.run(agent, input=input_data, session=session)
+            return result.final_output
+
+        result = self.runner.run_streamed(agent, input=input_data, session=session)
+        async for event in result.stream_events():
+            if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                await on_delta(event.data.delta)
+
+        return result.final_output
+
+    @staticmethod
+    def _session_id(user_id: int, resume_id: int) -> str:
+        # История агента своя у каждого резюме: задачи пачки одного пользователя идут параллельно
+        return f"resume_session:{user_id}:{resume_id}"
+
+    async def _session(self, user_id: int, resume_id: int) -> RedisSession:
+        session_id = self._session_id(user_id, resume_id)
+        index_key = HtmlStore.index_key(user_id)
+        # Регистрируем ключ в индексе пользователя, чтобы clear_user_session нашёл его без SCAN;
+        # срок индекса задаёт HtmlStore.put, здесь он ставится, только если его ещё нет
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.sadd(index_key, f"{SESSION_PREFIX}{session_id}")
+            pipe.expire(index_key, SESSION_TTL, nx=True)
+            await pipe.execute()
+        return RedisSession(session_id, redis_client=self.redis_client, prefix=SESSION_PREFIX, ttl=SESSION_TTL)
+
+    @staticmethod
+    def _html_code(final_output: str) -> str:
+        html_code = json.loads(final_output)["html_code"]
+        if not isinstance(html_code, str) or not html_code.strip():
+            raise ValueError("Agent returned empty html_code")
+        return html_code
+
+    @staticmethod
+    def _classified_fragments(final_output: str) -> dict:
+        # Поле не того типа (skills строкой, experience объектом) — сбой модели, а не данные для профиля
+        return ClassifiedFragments.model_validate_json(final_output).model_dump(exclude_none=True)
+
+    async def _cached_run(
+            self,
+            role: str,
+            cache_payload: str | dict,
+            input_data: str,
+            parse: Callable[[str], T],
+            session=None,
+            on_delta: Optional[DeltaCallback] = None,
+            on_reset: Optional[ResetCallback] = None
+    ) -> T:
+        """Вернуть разобранный parse ответ агента роли role из кэша или запустить его через роутер моделей.
+
+        В кэш попадает только ответ, который parse разобрал без ошибки: битый или
+        обрезанный ответ считается сбоем модели (роутер перейдёт к следующей), а не
+        сохраняется на неделю под ключом, который будут получать все повторы.
+
+        В потоковом режиме on_delta получает уже раскодированный текст поля html_code
+        ответа одной попытки (см. _StreamRelay), а on_reset вызывается, когда в эфир
+        выходит другая попытка и показанное до этого нужно выбросить. Хеджирование
+        при этом работает так же, как без потока.
+        """
+        instructions = self.agent_registry.instructions_for(role)
+        kind = role.lower().replace(" ", "_")
+        cache_keys = {
+            model_name: self.llm_cache.make_key(kind, model_name, cache_payload, instructions)
+            for model_name in self.backup_models
+        }
 
-    def _initialize_agent(self, name: str, instructions: str, agent_model: str = "gpt-5") -> Agent:
-        return Agent(
-            name=name,
-            instructions=instructions,
-            model=agent_model,
-            model_settings=ModelSettings(
-                max_tokens=8192,
-                store=True,
-            ),
-        )
-
-    def _load_instructions(self, filename: str) -> str:
-        filepath = self.instruction_dir / filename
-        with open(filepath, "r", encoding="utf-8") as file:
-            return file.read()
-
-    async def create_resume(self, user_id: int, resume_id: int, input_resume: Optional[str] = None) -> str:
-        await ResumeServiceAgent.clear_user_session(self, user_id)
-        session = RedisSession(
-            f"resume_session:{user_id}",
-            redis_client=self.redis_client,
-            ttl=60 * 60 * 24 * 7
-        )
-
-        last_error = None
-
-        for model_name in self.backup_models:
+        cached_output = await self.llm_cache.get(list(cache_keys.values()))
+        if cached_output is not None:
             try:
-                agent = self._initialize_agent(
-                    "Resume Creator",
-                    self._load_instructions("resume_creator_agent_instructions.txt"),
-                    agent_model=model_name,
-                )
-                result = await Runner.run(agent, input=input_resume, session=session)
-                await self.redis_client.set(f"resume:html:{user_id}:1", result.final_output)
-
-                save_path = os.path.join(
-                        Path(__file__).parent.parent.parent.parent,
-                        f"resume_files/{user_id}/resume_{resume_id}/html/"
-                    )
-
-                os.makedirs(
-                    save_path, exist_ok=True
-                )
-
-                html_path = os.path.join(save_path,
-                                         f"resume_html_{user_id}_v1.html")
-
-                with open(html_path, "w", encoding="utf-8") as file:
-                    file.write(json.loads(result.final_output)["html_code"])
-
-                return html_path
-
+                result = parse(cached_output)
             except Exception as e:
-                last_error = e
-                continue
-
-        raise last_error
-
-    async def edit_resume(self, user_id: int, instruction: dict, version: int, resume_id: int) -> Optional[str]:
-        save_path = os.path.join(
-            Path(__file__).parent.parent.parent.parent,
-            f"resume_files/{user_id}/resume_{resume_id}/html/"
+                logger.warning(f"Dropping unparsable cached {kind} output: {e}")
+                await self.llm_cache.delete(list(cache_keys.values()))
+            else:
+                if on_delta:
+                    relay = _StreamRelay(on_delta, on_reset=None)
+                    await relay.feed(relay.open(), cached_output)
+                return result
+
+        relay = _StreamRelay(on_delta, on_reset) if on_delta else None
+        streamed: list[T] = []
+
+        async def attempt(model_name: str) -> T:
+            agent = self.agent_registry.get(role, model_name)
+            stream = relay.open() if relay else None
+            try:
+                with track("agent"):
+                    output = await self._run_agent(
+                        agent, input_data, session, partial(relay.feed, stream) if relay else None
+                    )
+                result = parse(output)
+            except BaseException:
+                if relay:
+                    relay.fail(stream)
+                raise
+            await self.llm_cache.set(cache_keys[model_name], output)
+            if relay and await relay.finish(stream):
+                streamed.append(result)
+            return result
+
+        result = await self.model_router.run(attempt)
+        # При одновременном завершении роутер может вернуть не ту попытку, что ушла в эфир
+        return streamed[0] if streamed else result
+
+    async def _patch_resume(self, html_code: str, input_data: str, cache_payload: dict) -> Optional[str]:
+        """Получить у агента патч изменённых секций и применить его к html_code.
+
+        Возвращает None, если агент сам попросил полную перегенерацию.
+        Бросает PatchApplyError, если патч не удалось применить, и ошибку последней
+        модели, если ни одна не вернула разбираемый патч.
+        """
+        patches = await self._cached_run("Resume Patcher", cache_payload, input_data, parse_patch_output)
+        if patches is None:
+            return None
+
+        return apply_patches(html_code, patches)
+
+    async def create_resume(
+            self,
+            user_id: int,
+            resume_id: int,
+            input_resume: Optional[str] = None,
+            on_delta: Optional[DeltaCallback] = None,
+            on_reset: Optional[ResetCallback] = None
+    ) -> str:
+        # Новое резюме начинает разговор с агентом с чистого листа
+        await self.clear_agent_session(user_id, resume_id)
+        session = await self._session(user_id, resume_id)
+
+        html_code = await self._cached_run(
+            "Resume Creator", input_resume, input_resume, self._html_code, session, on_delta, on_reset
         )
+        return await self.html_store.put(user_id, resume_id, 1, html_code)
 
-        path_exists = os.path.exists(save_path)
-
-        if not path_exists:
-            raise Exception("Path does not exist")
-
-        resume_html = await self.redis_client.get(f"resume:html:{user_id}:{version}")
-        if resume_html is None:
-            raise Exception("HTML code does not exist in Redis. Please, create resume first.")
-
-        session = RedisSession(
-            f"resume_session:{user_id}",
-            redis_client=self.redis_client,
-            ttl=60 * 60 * 24 * 7,
-        )
+    async def edit_resume(
+            self,
+            user_id: int,
+            instruction: dict,
+            version: int,
+            resume_id: int,
+            new_version: Optional[int] = None,
+            on_delta: Optional[DeltaCallback] = None,
+            on_reset: Optional[ResetCallback] = None
+    ) -> Optional[str]:
+        new_version = new_version or version + 1
+
+        html_code = await self.html_store.get(user_id, resume_id, version)
+        if html_code is None:
+            raise Exception("HTML code does not exist. Please, create resume first.")
+
+        session = await self._session(user_id, resume_id)
 
         data = {
-            "html_code": json.loads(resume_html).get("html_code", json.loads(resume_html)),
+            "html_code": html_code,
             "user_request": json.dumps(instruction)
         }
         input_data = json.dumps(data)
 
-        last_error = None
+        cache_payload = {
+            "html_sha256": self.llm_cache.hash_text(html_code),
+            "user_request": instruction,
+        }
 
-        for model_name in self.backup_models:
+        new_html = None
+        if self.patch_edits:
             try:
-                agent = self._initialize_agent(
-                    "Resume Editor",
-                    self._load_instructions("resume_editor_agent_instructions.txt"),
-                    agent_model=model_name,
-                )
+                new_html = await self._patch_resume(html_code, input_data, cache_payload)
+            except Exception as e:
+                # Неприменимый патч, битый ответ или сбой всех моделей патчера —
+                # правку ещё может выполнить полная перегенерация
+                logger.warning(f"Patch edit failed, falling back to full regeneration: {e}")
 
-                result = await Runner.run(agent, input=input_data, session=session)
-                await self.redis_client.set(f"resume:html:{user_id}:{version + 1}", result.final_output)
+            if new_html is not None and on_delta:
+                await on_delta(new_html)
 
-                html_path = os.path.join(save_path,
-                                         f"resume_html_{user_id}_v{version + 1}.html")
+        if new_html is None:
+            new_html = await self._cached_run(
+                "Resume Editor", cache_payload, input_data, self._html_code, session, on_delta, on_reset
+            )
 
-                with open(html_path, "w", encoding="utf-8") as file:
-                    file.write(json.loads(result.final_output)["html_code"])
+        return await self.html_store.put(user_id, resume_id, new_version, new_html)
+
+    async def apply_field_update(
+            self,
+            user_id: int,
+            resume_id: int,
+            version: int,
+            new_version: int,
+            changes: dict
+    ) -> str:
+        """Перерисовать изменённые поля профиля в HTML версии version без вызова LLM.
+
+        Бросает BindingError, если в документе нет нужной разметки data-field.
+        """
+        html_code = await self.html_store.get(user_id, resume_id, version)
+        if html_code is None:
+            raise BindingError("HTML code of the source version does not exist")
+
+        return await self.save_html(user_id, resume_id, new_version, render_fields(html_code, changes))
+
+    async def save_html(self, user_id: int, resume_id: int, version: int, html_code: str) -> str:
+        """Сохранить готовый HTML (шаблон или локальная правка) так же, как ответ агента."""
+        return await self.html_store.put(user_id, resume_id, version, html_code)
+
+    async def classify_fragments(self, profile: dict, fragments: list[str]) -> dict:
+        """Разобрать по полям профиля фрагменты импортированного резюме, которые не распознали эвристики."""
+        payload = {"profile": profile, "fragments": fragments}
+        input_data = json.dumps(payload, ensure_ascii=False)
+
+        return await self._cached_run("Resume Importer", payload, input_data, self._classified_fragments)
+
+    async def clear_agent_session(self, user_id: int, resume_id: int) -> None:
+        key = f"{SESSION_PREFIX}{self._session_id(user_id, resume_id)}"
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.unlink(key)
+            pipe.srem(HtmlStore.index_key(user_id), key)
+            await pipe.execute()
 
-                return html_path
+    async def clear_user_session(self, user_id: int) -> None:
+        """Удаление сессий пользователя после завершения работы.
+
+        Истории агента по всем резюме и горячий HTML удаляются по индексу пользователя
+        (см. HtmlStore.forget_user); HTML версий остаётся в хранилище и читается оттуда.
+        """
+        # Общая на пользователя история до разделения сессий по резюме
+        await self.redis_client.unlink(
+            f"{SESSION_PREFIX}resume_session:{user_id}",
+            f"{SESSION_PREFIX}resume_session:{user_id}:messages",
+        )
+        await self.html_store.forget_user(user_id)
 
-            except RateLimitError as e:
-                last_error = e
-                continue
 
-        raise last_error
+@lru_cache(maxsize=1)
+def get_resume_agent() -> ResumeServiceAgent:
+    """Один ResumeServiceAgent на процесс с заранее собранными агентами."""
+    from core.utils.html_store import html_store
+    from core.utils.redis_cache import redis_cache
 
-    async def clear_user_session(self, user_id: int) -> None:
-        """Удаление сессий пользователя после завершения работы."""
-        redis_keys = [
-            f"agents:session:resume_session:{user_id}",
-            f"agents:session:resume_session:{user_id}:messages",
-        ]
-        for key in redis_keys:
-            await self.redis_client.delete(key)
-
-        cursor = 0
-        while True:
-            cursor, keys = await self.redis_client.scan(cursor, match=f"resume:html:{user_id}*", count=100)
-            if keys:
-                await self.redis_client.delete(*keys)
-            if cursor == 0:
-                break
+    registry = AgentRegistry(
+        INSTRUCTIONS_DIR,
+        hot_reload=os.getenv("AGENT_INSTRUCTIONS_HOT_RELOAD", "0") == "1",
+    )
+    registry.warm_up(DEFAULT_MODELS)
+
+    hedge_after = os.getenv("MODEL_HEDGE_AFTER")
+    # Лимиты провайдера: "gpt-5=500,gpt-5.1=300" (вызовов в минуту / одновременных), "*" — для остальных моделей
+    limiters = build_limiters(
+        DEFAULT_MODELS,
+        rpm=parse_model_limits(os.getenv("MODEL_RPM_LIMITS")),
+        max_concurrency=parse_model_limits(os.getenv("MODEL_CONCURRENCY_LIMITS")),
+    )
+    router = ModelRouter(
+        DEFAULT_MODELS, hedge_after=float(hedge_after) if hedge_after else None, limiters=limiters
+    )
+
+    return ResumeServiceAgent(
+        redis_client=redis_cache,
+        html_store=html_store,
+        instruction_dir=INSTRUCTIONS_DIR,
+        agent_registry=registry,
+        model_router=router,
+        patch_edits=os.getenv("RESUME_PATCH_EDITS", "1") == "1",
+    )
 
 
 async def main():
@@ -0,0 +1,75 @@
+import re
+from typing import Optional
+
+ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class JsonStringFieldDecoder:
+    """Потоковое извлечение строкового поля из JSON-ответа модели.
+
+    Модель отдаёт ответ вида {"html_code": "..."} кусками, и куски режут JSON
+    где угодно: посреди ключа, escape-последовательности или \\uXXXX. Декодер
+    копит начало ответа до значения поля, а дальше отдаёт из каждого куска уже
+    раскодированный текст значения. Всё после закрывающей кавычки игнорируется.
+    """
+
+    def __init__(self, field: str):
+        self._field_start = re.compile(rf'"{re.escape(field)}"\s*:\s*"')
+        self._buffer = ""
+        self._in_value = False
+        self._closed = False
+        self._high_surrogate: Optional[str] = None
+
+    def feed(self, chunk: str) -> str:
+        if self._closed:
+            return ""
+        self._buffer += chunk
+
+        if not self._in_value:
+            match = self._field_start.search(self._buffer)
+            if match is None:
+                return ""
+            self._in_value = True
+            self._buffer = self._buffer[match.end():]
+
+        return self._decode()
+
+    def _decode(self) -> str:
+        text, buffer, i = [], self._buffer, 0
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self._closed = True
+                i = len(buffer)
+                break
+            if char != "\\":
+                text.append(char)
+                i += 1
+                continue
+
+            # Незаконченная escape-последовательность ждёт следующего куска
+            if i + 1 >= len(buffer):
+                break
+            kind = buffer[i + 1]
+            if kind != "u":
+                text.append(ESCAPES.get(kind, kind))
+                i += 2
+                continue
+            if i + 6 > len(buffer):
+                break
+            text.append(self._code_point(buffer[i + 2:i + 6]))
+            i += 6
+
+        self._buffer = buffer[i:]
+        return "".join(text)
+
+    def _code_point(self, digits: str) -> str:
+        code = int(digits, 16)
+        if 0xD800 <= code < 0xDC00:
+            self._high_surrogate = chr(code)
+            return ""
+        if 0xDC00 <= code < 0xE000 and self._high_surrogate:
+            pair, self._high_surrogate = self._high_surrogate + chr(code), None
+            return pair.encode("utf-16", "surrogatepass").decode("utf-16")
+        return chr(code)
+
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import time
+from typing import Optional
+
+from redis.asyncio import Redis
+
+
+class LLMResultCache:
+    """Content-addressed кэш ответов агентов в Redis.
+
+    Ключ — sha256 от нормализованного входа, хэша инструкций, модели и типа агента,
+    поэтому повторный запрос с теми же данными отдаёт сохранённый final_output
+    без обращения к LLM. Размер ограничен max_entries: порядок обращений хранится
+    в sorted set, при переполнении вытесняются самые давно использованные записи.
+    """
+
+    def __init__(
+            self,
+            redis_client: Redis,
+            prefix: str = "llm_cache:",
+            ttl: Optional[int] = 60 * 60 * 24 * 7,
+            max_entries: int = 10_000,
+    ):
+        self.redis_client = redis_client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    @property
+    def _lru_key(self) -> str:
+        return f"{self.prefix}lru"
+
+    @property
+    def _stats_key(self) -> str:
+        return f"{self.prefix}stats"
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def normalize(payload: str | dict) -> str:
+        """Привести вход к каноничному JSON, чтобы порядок ключей не влиял на хэш."""
+        if isinstance(payload, str):
+            try:
+                payload = json.loads(payload)
+            except json.JSONDecodeError:
+                return payload
+        return json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+    def make_key(self, kind: str, model: str, payload: str | dict, instructions: str) -> str:
+        digest = self.hash_text(json.dumps(
+            {
+                "kind": kind,
+                "model": model,
+                "instructions": self.hash_text(instructions),
+                "input": self.normalize(payload),
+            },
+            sort_keys=True,
+        ))
+        return f"{self.prefix}{digest}"
+
+    async def get(self, keys: list[str]) -> Optional[str]:
+        """Вернуть первый найденный результат среди ключей (по одному на модель)."""
+        if not keys:
+            return None
+
+        values = await self.redis_client.mget(keys)
+        for key, value in zip(keys, values):
+            if value is not None:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.zadd(self._lru_key, {key: time.time()})
+                    pipe.hincrby(self._stats_key, "hits", 1)
+                    await pipe.execute()
+                return value.decode("utf-8") if isinstance(value, bytes) else value
+
+        await self.redis_client.hincrby(self._stats_key, "misses", 1)
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.set(key, value, ex=self.ttl)
+            pipe.zadd(self._lru_key, {key: time.time()})
+            pipe.zcard(self._lru_key)
+            *_, size = await pipe.execute()
+
+        if size > self.max_entries:
+            await self._evict(size - self.max_entries)
+
+    async def delete(self, keys: list[str]) -> None:
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.unlink(*keys)
+            pipe.zrem(self._lru_key, *keys)
+            await pipe.execute()
+
+    async def _evict(self, count: int) -> None:
+        evicted = await self.redis_client.zpopmin(self._lru_key, count)
+        keys = [key for key, _ in evicted]
+        if keys:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.unlink(*keys)
+                pipe.hincrby(self._stats_key, "evictions", len(keys))
+                await pipe.execute()
+
+    async def stats(self) -> dict[str, int]:
+        raw = await self.redis_client.hgetall(self._stats_key)
+        stats = {
+            (key.decode() if isinstance(key, bytes) else key): int(value)
+            for key, value in raw.items()
+        }
+        return {"hits": 0, "misses": 0, "evictions": 0, **stats}
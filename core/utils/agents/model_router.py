@@ -0,0 +1,231 @@
+import asyncio
+import statistics
+import time
+from collections import deque
+from contextlib import nullcontext
+from enum import Enum
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from loguru import logger
+
+from core.utils.agents.rate_limiter import ModelRateLimiter
+
+T = TypeVar("T")
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class ModelStats:
+    """Скользящее окно вызовов одной модели и состояние её circuit breaker."""
+
+    def __init__(self, window_seconds: float, max_samples: int):
+        self.window_seconds = window_seconds
+        self.samples: deque[tuple[float, float, bool]] = deque(maxlen=max_samples)
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+
+    def prune(self, now: float) -> None:
+        while self.samples and now - self.samples[0][0] > self.window_seconds:
+            self.samples.popleft()
+
+    def record(self, now: float, latency: float, ok: bool) -> None:
+        self.samples.append((now, latency, ok))
+        self.consecutive_failures = 0 if ok else self.consecutive_failures + 1
+
+    @property
+    def calls(self) -> int:
+        return len(self.samples)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, _, ok in self.samples if not ok) / len(self.samples)
+
+    def latency(self, percentile: int) -> Optional[float]:
+        latencies = sorted(latency for _, latency, ok in self.samples if ok)
+        if not latencies:
+            return None
+        if len(latencies) == 1:
+            return latencies[0]
+        return statistics.quantiles(latencies, n=100, method="inclusive")[percentile - 1]
+
+
+class ModelRouter:
+    """Выбор модели для вызова агента.
+
+    Для каждой модели в скользящем окне считаются доля ошибок и p50/p95 латентности.
+    Модель с высокой долей ошибок (или серией ошибок подряд) отключается circuit breaker'ом
+    на open_seconds, после чего пропускается один пробный вызов (half-open).
+    Вызовы идут сначала в самую быструю здоровую модель; если задан hedge_after,
+    то при задержке ответа параллельно запускается следующая модель и берётся
+    первый успешный результат.
+
+    Если для модели задан ModelRateLimiter, вызов ждёт свободного слота и токена,
+    а модели, упёршиеся в лимит, при выборе пропускаются вперёд других, пока те свободны.
+    """
+
+    def __init__(
+            self,
+            models: list[str],
+            window_seconds: float = 300,
+            max_samples: int = 200,
+            min_calls: int = 5,
+            error_rate_threshold: float = 0.5,
+            consecutive_failures_threshold: int = 3,
+            open_seconds: float = 60,
+            hedge_after: Optional[float] = None,
+            limiters: Optional[dict[str, ModelRateLimiter]] = None,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        if not models:
+            raise ValueError("ModelRouter needs at least one model")
+        self.models = list(models)
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.consecutive_failures_threshold = consecutive_failures_threshold
+        self.open_seconds = open_seconds
+        self.hedge_after = hedge_after
+        self.limiters = limiters or {}
+        self.clock = clock
+
+        self.stats = {model: ModelStats(window_seconds, max_samples) for model in self.models}
+
+    def _is_available(self, model: str, now: float) -> bool:
+        stats = self.stats[model]
+        if stats.state == CircuitState.OPEN and now - stats.opened_at >= self.open_seconds:
+            stats.state = CircuitState.HALF_OPEN
+        if stats.state == CircuitState.HALF_OPEN:
+            return not stats.probe_in_flight
+        return stats.state == CircuitState.CLOSED
+
+    def ordered_models(self) -> list[str]:
+        """Доступные модели от самой быстрой по p50; модели без успешных вызовов — после них,
+        сначала те, что реже ошибались, затем в исходном порядке. Модели, упёршиеся
+        в лимит вызовов, идут после всех свободных.
+
+        Если все цепи разомкнуты, возвращается исходный список, чтобы запрос не падал без попытки.
+        """
+        now = self.clock()
+        for stats in self.stats.values():
+            stats.prune(now)
+
+        available = [model for model in self.models if self._is_available(model, now)]
+        if not available:
+            return list(self.models)
+
+        def sort_key(model: str) -> tuple[bool, bool, float, float, int]:
+            stats = self.stats[model]
+            p50 = stats.latency(50)
+            limiter = self.limiters.get(model)
+            throttled = limiter is not None and not limiter.ready()
+            return throttled, p50 is None, p50 or 0.0, stats.error_rate, self.models.index(model)
+
+        return sorted(available, key=sort_key)
+
+    def record(self, model: str, latency: float, ok: bool) -> None:
+        now = self.clock()
+        stats = self.stats[model]
+        stats.prune(now)
+
+        if stats.state == CircuitState.HALF_OPEN:
+            stats.probe_in_flight = False
+            if ok:
+                # Ошибки до размыкания больше не показательны — начинаем окно заново
+                stats.samples.clear()
+                stats.state = CircuitState.CLOSED
+                logger.info(f"Circuit for {model} closed")
+            stats.record(now, latency, ok)
+            if not ok:
+                self._open(model, now)
+            return
+
+        stats.record(now, latency, ok)
+
+        if not ok and (
+                stats.consecutive_failures >= self.consecutive_failures_threshold
+                or (stats.calls >= self.min_calls and stats.error_rate >= self.error_rate_threshold)
+        ):
+            self._open(model, now)
+
+    def _open(self, model: str, now: float) -> None:
+        stats = self.stats[model]
+        stats.state = CircuitState.OPEN
+        stats.opened_at = now
+        logger.warning(f"Circuit for {model} opened (error rate {stats.error_rate:.0%})")
+
+    def snapshot(self) -> dict[str, dict]:
+        return {
+            model: {
+                "state": stats.state.value,
+                "calls": stats.calls,
+                "error_rate": stats.error_rate,
+                "p50": stats.latency(50),
+                "p95": stats.latency(95),
+                "in_flight": self.limiters[model].in_flight if model in self.limiters else None,
+            }
+            for model, stats in self.stats.items()
+        }
+
+    async def _attempt(self, model: str, call: Callable[[str], Awaitable[T]]) -> T:
+        stats = self.stats[model]
+        if stats.state == CircuitState.HALF_OPEN:
+            stats.probe_in_flight = True
+
+        started: Optional[float] = None
+        try:
+            # Ожидание лимита не входит в латентность модели
+            async with self.limiters.get(model) or nullcontext():
+                started = self.clock()
+                result = await call(model)
+        except asyncio.CancelledError:
+            stats.probe_in_flight = False
+            raise
+        except Exception:
+            if started is None:
+                # Лимитер не пустил вызов — модель не вызывалась, в её статистику записывать нечего
+                stats.probe_in_flight = False
+            else:
+                self.record(model, self.clock() - started, ok=False)
+            raise
+        self.record(model, self.clock() - started, ok=True)
+        return result
+
+    async def run(self, call: Callable[[str], Awaitable[T]], hedge: bool = True) -> T:
+        """Вызвать call(model) для моделей по порядку до первого успеха."""
+        models = self.ordered_models()
+        hedge_after = self.hedge_after if hedge else None
+        last_error: Optional[Exception] = None
+
+        pending: set[asyncio.Task] = set()
+        index = 0
+        try:
+            while index < len(models) or pending:
+                if not pending:
+                    pending.add(asyncio.create_task(self._attempt(models[index], call)))
+                    index += 1
+
+                timeout = hedge_after if hedge_after is not None and index < len(models) else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    logger.info(f"Hedging request to {models[index]} after {hedge_after}s")
+                    pending.add(asyncio.create_task(self._attempt(models[index], call)))
+                    index += 1
+                    continue
+
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise last_error
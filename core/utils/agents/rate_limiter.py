@@ -0,0 +1,108 @@
+import asyncio
+import time
+from typing import Callable, Optional
+
+
+class ModelRateLimiter:
+    """Лимиты провайдера для одной модели.
+
+    Не больше max_concurrency вызовов одновременно и не больше rpm запусков в минуту
+    (token bucket ёмкостью burst, по умолчанию — секундная норма). Вызов, упёршийся
+    в лимит, ждёт своей очереди, а не получает 429 от провайдера.
+    """
+
+    def __init__(
+            self,
+            rpm: Optional[float] = None,
+            max_concurrency: Optional[int] = None,
+            burst: Optional[float] = None,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rpm = rpm
+        self.max_concurrency = max_concurrency
+        self.capacity = burst or max(1.0, (rpm or 0) / 60)
+        self.clock = clock
+
+        self.tokens = self.capacity
+        self.updated_at = clock()
+        self.in_flight = 0
+        # Вошедшие в лимитер, включая ещё ждущих слот или токен
+        self.pending = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        if self.rpm:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rpm / 60)
+        self.updated_at = now
+
+    def ready(self) -> bool:
+        """Можно ли запустить вызов прямо сейчас, не вставая в очередь за уже ждущими."""
+        self._refill()
+        if self.max_concurrency and self.pending >= self.max_concurrency:
+            return False
+        return not self.rpm or self.tokens - (self.pending - self.in_flight) >= 1
+
+    async def _take_token(self) -> None:
+        if not self.rpm:
+            return
+        # Ждущие встают в очередь на замке, поэтому токены достаются в порядке прихода
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) * 60 / self.rpm)
+
+    async def __aenter__(self) -> "ModelRateLimiter":
+        self.pending += 1
+        try:
+            if self._semaphore:
+                await self._semaphore.acquire()
+            try:
+                await self._take_token()
+            except BaseException:
+                if self._semaphore:
+                    self._semaphore.release()
+                raise
+        except BaseException:
+            self.pending -= 1
+            raise
+        self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.in_flight -= 1
+        self.pending -= 1
+        if self._semaphore:
+            self._semaphore.release()
+
+
+def parse_model_limits(value: Optional[str]) -> dict[str, float]:
+    """Разобрать строку вида "gpt-5=500,gpt-5.1=300" в словарь модель -> число."""
+    limits = {}
+    for item in (value or "").split(","):
+        if not item.strip():
+            continue
+        model, _, limit = item.partition("=")
+        limits[model.strip()] = float(limit)
+    return limits
+
+
+def build_limiters(
+        models: list[str],
+        rpm: dict[str, float],
+        max_concurrency: dict[str, float],
+) -> dict[str, ModelRateLimiter]:
+    """Лимитеры для моделей, у которых задан хотя бы один лимит; "*" задаёт значение по умолчанию."""
+    limiters = {}
+    for model in models:
+        model_rpm = rpm.get(model, rpm.get("*"))
+        model_concurrency = max_concurrency.get(model, max_concurrency.get("*"))
+        if model_rpm or model_concurrency:
+            limiters[model] = ModelRateLimiter(
+                rpm=model_rpm, max_concurrency=int(model_concurrency) if model_concurrency else None
+            )
+    return limiters
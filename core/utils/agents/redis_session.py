@@ -1,7 +1,9 @@
-import threading
 import json
-import redis
-from typing import Optional, List
+from typing import List, Optional
+
+from redis.asyncio import Redis
+
+from core.utils.redis_cache import redis_cache
 
 
 class RedisSession:
@@ -9,103 +11,78 @@ class RedisSession:
 
     Хранит историю сообщений в Redis списке.
     Каждая сессия = отдельный ключ (List).
+
+    Работает на redis.asyncio поверх общего пула соединений процесса
+    (core.utils.redis_cache), поэтому сессия ничего не открывает и не закрывает сама:
+    объект дешёвый, его можно создавать на каждый вызов агента. Каждая операция —
+    один round trip без потоков и блокировок.
     """
 
     def __init__(
         self,
         session_id: str,
-        redis_url: str = "redis://localhost:6379",
+        redis_client: Optional[Redis] = None,
         prefix: str = "agent_session:",
         ttl: Optional[int] = 60 * 60 * 24 * 7,  # 7 дней по умолчанию
     ):
         """
         Args:
             session_id: уникальный идентификатор сессии
-            redis_url: URL к Redis (redis://localhost:6379)
+            redis_client: клиент redis.asyncio, по умолчанию общий redis_cache
             prefix: префикс ключей (для изоляции)
             ttl: время жизни ключа (в секундах)
         """
         self.session_id = session_id
-        self.redis_url = redis_url
+        self.redis = redis_client if redis_client is not None else redis_cache
         self.prefix = prefix
         self.ttl = ttl
-        self._lock = threading.Lock()
-
-        # Подключение к Redis
-        self.redis = redis.from_url(redis_url, decode_responses=True)
 
     def _key(self) -> str:
         """Сформировать ключ Redis для текущей сессии."""
         return f"{self.prefix}{self.session_id}"
 
+    @staticmethod
+    def _loads(raw) -> Optional[dict]:
+        try:
+            return json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return None
+
     # ---------------------------------------------------------------------
     # Основные методы
     # ---------------------------------------------------------------------
 
     async def get_items(self, limit: Optional[int] = None) -> List[dict]:
-        """Получить историю сообщений для сессии."""
-        def _get_items_sync():
-            with self._lock:
-                key = self._key()
-                total = self.redis.llen(key)
-                if total == 0:
-                    return []
-                start = max(total - limit, 0) if limit else 0
-                raw_items = self.redis.lrange(key, start, -1)
-                items = []
-                for raw in raw_items:
-                    try:
-                        items.append(json.loads(raw))
-                    except json.JSONDecodeError:
-                        continue
-                return items
-
-        import asyncio
-        return await asyncio.to_thread(_get_items_sync)
+        """Получить историю сообщений для сессии (последние limit, если задан)."""
+        if limit is not None and limit <= 0:
+            return []
+        # Отрицательный start — последние limit элементов без отдельного LLEN
+        raw_items = await self.redis.lrange(self._key(), -limit if limit else 0, -1)
+        return [item for item in map(self._loads, raw_items) if item is not None]
 
     async def add_items(self, items: List[dict]) -> None:
         """Добавить новые элементы в историю."""
         if not items:
             return
 
-        def _add_items_sync():
-            with self._lock:
-                key = self._key()
-                pipe = self.redis.pipeline()
-                for item in items:
-                    pipe.rpush(key, json.dumps(item))
-                if self.ttl:
-                    pipe.expire(key, self.ttl)
-                pipe.execute()
-
-        import asyncio
-        await asyncio.to_thread(_add_items_sync)
+        key = self._key()
+        # Один RPUSH со всеми элементами и EXPIRE — в одном round trip
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, *(json.dumps(item) for item in items))
+            if self.ttl:
+                pipe.expire(key, self.ttl)
+            await pipe.execute()
 
     async def pop_item(self) -> Optional[dict]:
         """Удалить и вернуть последнее сообщение."""
-        def _pop_item_sync():
-            with self._lock:
-                key = self._key()
-                raw = self.redis.rpop(key)
-                if not raw:
-                    return None
-                try:
-                    return json.loads(raw)
-                except json.JSONDecodeError:
-                    return None
-
-        import asyncio
-        return await asyncio.to_thread(_pop_item_sync)
+        raw = await self.redis.rpop(self._key())
+        if not raw:
+            return None
+        return self._loads(raw)
 
     async def clear_session(self) -> None:
         """Удалить все сообщения из истории."""
-        def _clear_sync():
-            with self._lock:
-                self.redis.delete(self._key())
-
-        import asyncio
-        await asyncio.to_thread(_clear_sync)
+        await self.redis.unlink(self._key())
 
-    def close(self) -> None:
-        """Закрыть соединение с Redis."""
-        self.redis.close()
+    async def close(self) -> None:
+        """Ничего не делает: пул соединений общий и закрывается вместе с процессом."""
@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import WatchError
+
+from core.utils.redis_cache import redis_cache
+from core.utils.storage import StorageBackend, storage as default_storage
+
+PDF_NAME = "resume.pdf"
+PNG_NAME = "preview.png"
+# Сколько живёт отметка «артефакт удаляется», если удаливший процесс упал посреди удаления
+DELETE_TIMEOUT = 60
+
+
+@dataclass
+class ArtifactPaths:
+    key: str
+    pdf: str
+    png: str
+
+
+class ArtifactStore:
+    """Content-addressed хранилище отрендеренных PDF/PNG.
+
+    Ключ — sha256 от HTML и параметров рендера, поэтому одинаковый документ
+    (повторный рендер, откат на старую версию, копия резюме) рендерится один раз,
+    а версии ссылаются на общие файлы artifacts/<ab>/<key>/ в файловом хранилище.
+    Для каждого ключа в Redis хранится множество id ссылающихся версий: когда оно
+    пустеет, файлы удаляются. Ссылки ставятся и снимаются транзакциями WATCH/MULTI,
+    так что версия не получит артефакт, который уже удаляется. Если суммарный размер превышает max_bytes, давно не
+    использованные артефакты вытесняются из хранилища, счётчик ссылок при этом
+    сохраняется — путь детерминирован, и повторный рендер восстановит файлы на месте.
+    """
+
+    def __init__(
+            self,
+            redis_client: Redis,
+            storage: Optional[StorageBackend] = None,
+            root: str = "artifacts",
+            prefix: str = "artifacts:",
+            max_bytes: int = 1024 * 1024 * 1024,
+    ):
+        self.redis_client = redis_client
+        self.storage = storage or default_storage
+        self.root = root
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+
+    def _refs_key(self, key: str) -> str:
+        return f"{self.prefix}refs:{key}"
+
+    def _deleting_key(self, key: str) -> str:
+        return f"{self.prefix}deleting:{key}"
+
+    @property
+    def _lru_key(self) -> str:
+        return f"{self.prefix}lru"
+
+    @property
+    def _sizes_key(self) -> str:
+        return f"{self.prefix}sizes"
+
+    @property
+    def _stats_key(self) -> str:
+        return f"{self.prefix}stats"
+
+    @staticmethod
+    def make_key(html: str, options: dict) -> str:
+        digest = hashlib.sha256(html.encode("utf-8"))
+        digest.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _dir(self, key: str) -> str:
+        return f"{self.root}/{key[:2]}/{key}/"
+
+    def paths(self, key: str) -> ArtifactPaths:
+        directory = self._dir(key)
+        return ArtifactPaths(key=key, pdf=f"{directory}{PDF_NAME}", png=f"{directory}{PNG_NAME}")
+
+    @staticmethod
+    def key_from_path(path: str) -> str:
+        return PurePosixPath(path).parent.name
+
+    async def get(self, key: str) -> Optional[ArtifactPaths]:
+        paths = self.paths(key)
+        if not all(await asyncio.gather(self.storage.exists(paths.pdf), self.storage.exists(paths.png))):
+            await self.redis_client.hincrby(self._stats_key, "misses", 1)
+            return None
+
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.zadd(self._lru_key, {key: time.time()})
+            pipe.hincrby(self._stats_key, "hits", 1)
+            await pipe.execute()
+        return paths
+
+    async def put(self, key: str, pdf: bytes, png: bytes) -> ArtifactPaths:
+        paths = self.paths(key)
+        # Запись атомарна на уровне хранилища, читатели не увидят недописанный артефакт
+        await asyncio.gather(self.storage.write(paths.pdf, pdf), self.storage.write(paths.png, png))
+
+        size = len(pdf) + len(png)
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.hget(self._sizes_key, key)
+            pipe.hset(self._sizes_key, key, size)
+            pipe.zadd(self._lru_key, {key: time.time()})
+            previous, *_ = await pipe.execute()
+
+        total = await self.redis_client.hincrby(self._stats_key, "bytes", size - int(previous or 0))
+        if total > self.max_bytes:
+            await self._evict(total - self.max_bytes)
+        return paths
+
+    async def acquire(self, key: str, version_id: int) -> None:
+        """Отметить, что версия ссылается на артефакт; повторный вызов для той же версии ничего не меняет.
+
+        Вызывается до get/put: артефакт со ссылкой release не удалит, а если удаление
+        уже идёт, acquire дождётся его конца, и get честно скажет, что файлов нет.
+        """
+        refs_key, deleting_key = self._refs_key(key), self._deleting_key(key)
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(deleting_key)
+                    if await pipe.exists(deleting_key):
+                        await pipe.reset()
+                        await asyncio.sleep(0.05)
+                        continue
+                    pipe.multi()
+                    pipe.sadd(refs_key, version_id)
+                    await pipe.execute()
+                    return
+                except WatchError:
+                    continue
+
+    async def release(self, key: str, version_id: int) -> None:
+        """Снять ссылку версии на артефакт; артефакт без ссылок удаляется."""
+        refs_key, deleting_key = self._refs_key(key), self._deleting_key(key)
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(refs_key)
+                    if not await pipe.sismember(refs_key, version_id):
+                        return
+                    last = await pipe.scard(refs_key) == 1
+                    pipe.multi()
+                    pipe.srem(refs_key, version_id)
+                    if last:
+                        # Пока стоит отметка, acquire ждёт: файлы не удалятся из-под новой ссылки
+                        pipe.set(deleting_key, 1, ex=DELETE_TIMEOUT)
+                    await pipe.execute()
+                    break
+                except WatchError:
+                    continue
+
+        if last:
+            try:
+                await self._remove([key])
+            finally:
+                await self.redis_client.delete(deleting_key)
+
+    async def _remove(self, keys: list[str], evicted: bool = False) -> None:
+        sizes = await self.redis_client.hmget(self._sizes_key, keys)
+        await asyncio.gather(*(self.storage.delete_prefix(self._dir(key)) for key in keys))
+
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.hdel(self._sizes_key, *keys)
+            pipe.zrem(self._lru_key, *keys)
+            pipe.hincrby(self._stats_key, "bytes", -sum(int(size or 0) for size in sizes))
+            if evicted:
+                pipe.hincrby(self._stats_key, "evictions", len(keys))
+            await pipe.execute()
+
+    async def _evict(self, overflow: int) -> None:
+        freed = 0
+        while freed < overflow:
+            evicted = await self.redis_client.zpopmin(self._lru_key, 1)
+            if not evicted:
+                break
+            keys = [key.decode() if isinstance(key, bytes) else key for key, _ in evicted]
+            sizes = await self.redis_client.hmget(self._sizes_key, keys)
+            freed += sum(int(size or 0) for size in sizes)
+            await self._remove(keys, evicted=True)
+
+    async def stats(self) -> dict[str, int]:
+        raw = await self.redis_client.hgetall(self._stats_key)
+        stats = {
+            (key.decode() if isinstance(key, bytes) else key): int(value)
+            for key, value in raw.items()
+        }
+        return {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0, **stats}
+
+
+artifact_store = ArtifactStore(
+    redis_cache,
+    max_bytes=int(os.getenv("ARTIFACT_STORE_MAX_MB", 1024)) * 1024 * 1024,
+)
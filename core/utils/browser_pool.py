@@ -0,0 +1,192 @@
+import asyncio
+import os
+import statistics
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from loguru import logger
+
+A4_VIEWPORT = {"width": 794, "height": 1123}
+
+# Всё, что влияет на итоговые файлы, — часть ключа в хранилище артефактов
+RENDER_OPTIONS = {"format": "A4", "viewport": A4_VIEWPORT, "device_scale_factor": 1, "print_background": True}
+
+
+class RenderError(Exception):
+    """HTML не удалось отрисовать в PDF/PNG."""
+
+
+@dataclass
+class RenderResult:
+    pdf: bytes
+    png: bytes
+    latency: float
+
+
+class BrowserPool:
+    """Пул тёплых контекстов headless Chromium для рендера резюме в PDF и PNG.
+
+    Браузер запускается один раз на процесс, контексты создаются заранее и
+    переиспользуются между рендерами: на запрос открывается только новая
+    страница. Число одновременных рендеров ограничено размером пула.
+    Контекст пересоздаётся после max_uses рендеров или после ошибки/таймаута,
+    упавший браузер перезапускается при следующем рендере.
+    """
+
+    def __init__(
+            self,
+            size: int = 2,
+            render_timeout: float = 30.0,
+            max_uses: int = 100,
+            max_samples: int = 500,
+    ):
+        self.size = size
+        self.render_timeout = render_timeout
+        self.max_uses = max_uses
+
+        self._playwright = None
+        self._browser = None
+        self._contexts: asyncio.Queue = asyncio.Queue()
+        self._uses: dict[int, int] = {}
+        self._lock = asyncio.Lock()
+
+        self.latencies: deque[float] = deque(maxlen=max_samples)
+        self.renders = 0
+        self.failures = 0
+        self.timeouts = 0
+
+    async def start(self) -> None:
+        async with self._lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+
+            # Импорт здесь, а не на уровне модуля: браузер нужен только воркеру, API его не запускает
+            from playwright.async_api import async_playwright
+
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(
+                args=["--no-sandbox", "--disable-dev-shm-usage"]
+            )
+
+            self._contexts = asyncio.Queue()
+            self._uses.clear()
+            for _ in range(self.size):
+                self._contexts.put_nowait(await self._new_context())
+            logger.info(f"Browser pool started with {self.size} contexts")
+
+    async def stop(self) -> None:
+        async with self._lock:
+            if self._browser is not None:
+                await self._browser.close()
+                self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+            self._uses.clear()
+
+    async def _new_context(self):
+        context = await self._browser.new_context(
+            viewport=RENDER_OPTIONS["viewport"], device_scale_factor=RENDER_OPTIONS["device_scale_factor"]
+        )
+        self._uses[id(context)] = 0
+        return context
+
+    async def _replace(self, context) -> None:
+        self._uses.pop(id(context), None)
+        stale = context.browser is not self._browser
+        try:
+            await context.close()
+        except Exception as e:
+            logger.warning(f"Failed to close browser context: {e}")
+
+        if stale:
+            # Контекст от перезапущенного браузера — новый пул уже собран в start()
+            return
+        if self._browser is not None and self._browser.is_connected():
+            self._contexts.put_nowait(await self._new_context())
+        else:
+            # Браузер упал — пул соберётся заново при следующем acquire
+            self._browser = None
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator:
+        if self._browser is None or not self._browser.is_connected():
+            await self.start()
+
+        context = await self._contexts.get()
+        healthy = False
+        try:
+            yield context
+            healthy = True
+        finally:
+            self._uses[id(context)] = self._uses.get(id(context), 0) + 1
+            reusable = healthy and context.browser is self._browser and self._uses[id(context)] < self.max_uses
+            if reusable:
+                self._contexts.put_nowait(context)
+            else:
+                await self._replace(context)
+
+    async def _render(self, context, html: str) -> tuple[bytes, bytes]:
+        page = await context.new_page()
+        try:
+            await page.set_content(html, wait_until="load")
+            pdf = await page.pdf(
+                format=RENDER_OPTIONS["format"],
+                print_background=RENDER_OPTIONS["print_background"],
+                prefer_css_page_size=True,
+            )
+            png = await page.screenshot(type="png", full_page=False)
+            return pdf, png
+        finally:
+            await page.close()
+
+    async def render(self, html: str, timeout: Optional[float] = None) -> RenderResult:
+        started = time.monotonic()
+        try:
+            async with self.acquire() as context:
+                pdf, png = await asyncio.wait_for(
+                    self._render(context, html), timeout=timeout or self.render_timeout
+                )
+        except asyncio.TimeoutError as e:
+            self.timeouts += 1
+            raise RenderError(f"Render timed out after {timeout or self.render_timeout}s") from e
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failures += 1
+            raise RenderError(str(e)) from e
+
+        latency = time.monotonic() - started
+        self.renders += 1
+        self.latencies.append(latency)
+        return RenderResult(pdf=pdf, png=png, latency=latency)
+
+    def latency(self, percentile: int) -> Optional[float]:
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return None
+        if len(latencies) == 1:
+            return latencies[0]
+        return statistics.quantiles(latencies, n=100, method="inclusive")[percentile - 1]
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "idle": self._contexts.qsize(),
+            "renders": self.renders,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "p50": self.latency(50),
+            "p95": self.latency(95),
+        }
+
+
+browser_pool = BrowserPool(
+    size=int(os.getenv("RENDER_POOL_SIZE", 2)),
+    render_timeout=float(os.getenv("RENDER_TIMEOUT", 30)),
+    max_uses=int(os.getenv("RENDER_CONTEXT_MAX_USES", 100)),
+)
@@ -0,0 +1,134 @@
+import re
+from html import escape
+
+from core.utils.html_patch import locate
+
+# Поля профиля, которые в HTML размечены data-field и могут перерисовываться без LLM
+BOUND_FIELDS = {"name", "position", "contacts", "skills"}
+
+_FIRST_TAG = re.compile(r"<([a-zA-Z][a-zA-Z0-9-]*)(\s[^<>]*)?>")
+_HREF = re.compile(r'href="([a-z]+:)?[^"]*"')
+_URL = re.compile(r"https?://[^\s\"'<>]+", re.IGNORECASE)
+_DOMAIN = re.compile(r"[a-z0-9-]+(\.[a-z0-9-]+)+(/[^\s\"'<>]*)?", re.IGNORECASE)
+_EMAIL = re.compile(r"[^\s@\"'<>]+@[^\s@\"'<>]+\.[^\s@\"'<>]+")
+
+
+class BindingError(Exception):
+    """Изменение нельзя отрисовать локально — нужен агент."""
+
+
+def _replace_inner(html: str, spans: list[tuple[int, int]], render, rewrite_tag=None) -> str:
+    for start, end in sorted(spans, reverse=True):
+        try:
+            inner_start = html.index(">", start, end) + 1
+            inner_end = html.rindex("</", start, end)
+        except ValueError:
+            # Самозакрывающийся или оборванный элемент: вставить содержимое некуда
+            raise BindingError("Bound element has no closing tag") from None
+        if inner_end < inner_start:
+            raise BindingError("Bound element has no closing tag")
+        start_tag = html[start:inner_start]
+        if rewrite_tag:
+            start_tag = rewrite_tag(start_tag)
+        html = html[:start] + start_tag + render(html[inner_start:inner_end]) + html[inner_end:]
+    return html
+
+
+def _rewrite_href(value: str):
+    """Обновить ссылку контакта (mailto:, tel:, http) вместе с его текстом.
+
+    Значение должно подходить к виду ссылки: email для mailto:, номер для tel:,
+    адрес сайта для остальных. Иначе (например, «@nick» вместо ссылки на
+    профиль) бросается BindingError — как переделать ссылку, решит агент.
+    """
+    value = value.strip()
+
+    def rewrite(start_tag: str) -> str:
+        def replace(match: re.Match) -> str:
+            scheme = match.group(1) or ""
+            if scheme == "mailto:":
+                if not _EMAIL.fullmatch(value):
+                    raise BindingError(f"Contact {value!r} is not an email")
+                return f'href="mailto:{escape(value)}"'
+            if scheme == "tel:":
+                digits = re.sub(r"[^0-9+]", "", value)
+                if not re.search(r"[0-9]", digits):
+                    raise BindingError(f"Contact {value!r} is not a phone number")
+                return f'href="tel:{digits}"'
+            if _URL.fullmatch(value):
+                return f'href="{escape(value)}"'
+            if _DOMAIN.fullmatch(value):
+                return f'href="https://{escape(value)}"'
+            raise BindingError(f"Contact {value!r} is not a link")
+        return _HREF.sub(replace, start_tag)
+    return rewrite
+
+
+def _render_list(items: list[str]):
+    def render(inner: str) -> str:
+        match = _FIRST_TAG.search(inner)
+        if not match:
+            raise BindingError("Bound list has no item template")
+        tag, attrs = match.group(1), match.group(2) or ""
+        return "".join(f"<{tag}{attrs}>{escape(str(item))}</{tag}>" for item in items)
+    return render
+
+
+def _render_text(value):
+    return lambda _: escape(str(value))
+
+
+def field_changes(old: dict, new: dict) -> dict:
+    """Оставить только реально изменённые значения из new.
+
+    Для contacts сравнение идёт по ключам: удалённый контакт попадает в результат как None.
+    """
+    changes = {}
+    for key, value in new.items():
+        if old.get(key) == value:
+            continue
+        if key == "contacts" and isinstance(value, dict) and isinstance(old.get(key), dict):
+            old_contacts = old[key]
+            value = {
+                **{contact: None for contact in old_contacts if contact not in value},
+                **{contact: item for contact, item in value.items() if old_contacts.get(contact) != item},
+            }
+        changes[key] = value
+    return changes
+
+
+def render_fields(html: str, changes: dict) -> str:
+    """Перерисовать размеченные data-field элементы под новые значения полей профиля.
+
+    name/position заменяют текст элемента, contacts.<ключ> — текст конкретного контакта,
+    skills — содержимое списка по шаблону первого элемента. Если для изменения нет
+    разметки (новый контакт, удалённое поле, старое резюме без data-field) —
+    бросается BindingError.
+    """
+    unsupported = set(changes) - BOUND_FIELDS
+    if unsupported:
+        raise BindingError(f"Fields {sorted(unsupported)} cannot be rendered locally")
+
+    replacements: list[tuple] = []
+    for field, value in changes.items():
+        if value is None:
+            raise BindingError(f"Removing {field!r} changes the layout")
+
+        if field == "contacts":
+            for key, contact in value.items():
+                if contact is None:
+                    raise BindingError(f"Removing contact {key!r} changes the layout")
+                replacements.append((f"contacts.{key}", _render_text(contact), _rewrite_href(str(contact))))
+        elif field == "skills":
+            replacements.append((field, _render_list(value), None))
+        else:
+            replacements.append((field, _render_text(value), None))
+
+    # Перерисовываем по одному полю и пересчитываем позиции, т.к. длина документа меняется
+    for field, render, rewrite_tag in replacements:
+        spans = locate(html, "data-field").get(field)
+        if not spans:
+            raise BindingError(f"No data-field marker for {field!r}")
+        html = _replace_inner(html, spans, render, rewrite_tag)
+
+    return html
@@ -0,0 +1,147 @@
+import json
+from html.parser import HTMLParser
+from typing import Optional
+
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+
+class PatchApplyError(Exception):
+    """Патч нельзя применить к документу — нужна полная перегенерация."""
+
+
+class _ElementLocator(HTMLParser):
+    """Находит в исходной строке границы элементов с заданным атрибутом.
+
+    HTMLParser отдаёт позиции как (строка, колонка), поэтому они
+    переводятся в абсолютные смещения по заранее посчитанным началам строк.
+    """
+
+    def __init__(self, source: str, attribute: str):
+        super().__init__(convert_charrefs=False)
+        self.source = source
+        self.attribute = attribute
+        # HTMLParser считает строки только по "\n"; splitlines() резал бы ещё по \r, \x0b,
+        # \u2028 и т. п., и смещения после такого символа в тексте уезжали бы
+        self.line_offsets = [0]
+        for line in source.split("\n")[:-1]:
+            self.line_offsets.append(self.line_offsets[-1] + len(line) + 1)
+
+        self.stack: list[tuple[str, Optional[str], int]] = []
+        self.elements: dict[str, list[tuple[int, int]]] = {}
+        self.unbalanced = False
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self.line_offsets[line - 1] + column
+
+    def _found(self, value: str, start: int, end: int) -> None:
+        self.elements.setdefault(value, []).append((start, end))
+
+    def handle_starttag(self, tag, attrs):
+        start = self._offset()
+        value = dict(attrs).get(self.attribute)
+        if tag in VOID_ELEMENTS:
+            if value is not None:
+                self._found(value, start, start + len(self.get_starttag_text()))
+            return
+        self.stack.append((tag, value, start))
+
+    def handle_startendtag(self, tag, attrs):
+        start = self._offset()
+        value = dict(attrs).get(self.attribute)
+        if value is not None:
+            self._found(value, start, start + len(self.get_starttag_text()))
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS:
+            return
+        if not any(open_tag == tag for open_tag, _, _ in self.stack):
+            self.unbalanced = True
+            return
+
+        end = self.source.index(">", self._offset()) + 1
+        while self.stack:
+            open_tag, value, start = self.stack.pop()
+            if value is not None:
+                self._found(value, start, end)
+            if open_tag == tag:
+                break
+            self.unbalanced = True
+
+
+def locate(html: str, attribute: str) -> dict[str, list[tuple[int, int]]]:
+    """Вернуть {значение атрибута: [(начало, конец), ...]} для всех элементов с атрибутом."""
+    locator = _ElementLocator(html, attribute)
+    locator.feed(html)
+    locator.close()
+    return locator.elements
+
+
+def is_balanced(html: str) -> bool:
+    locator = _ElementLocator(html, "data-section")
+    locator.feed(html)
+    locator.close()
+    return not locator.unbalanced and not locator.stack
+
+
+def apply_patches(html: str, patches: list[dict], attribute: str = "data-section") -> str:
+    """Применить список замен вида {"section": ..., "html": ...} к документу.
+
+    Каждая секция должна встречаться в документе ровно один раз, а новый фрагмент —
+    быть сбалансированным и (если он не пустой) сохранять тот же data-section,
+    чтобы следующий патч мог найти эту секцию снова. Пустой html удаляет секцию.
+    """
+    if not patches:
+        raise PatchApplyError("Patch is empty")
+
+    elements = locate(html, attribute)
+    replacements: list[tuple[int, int, str]] = []
+
+    for patch in patches:
+        section = patch.get("section")
+        fragment = patch.get("html")
+        if not section or fragment is None:
+            raise PatchApplyError(f"Malformed patch: {patch}")
+
+        spans = elements.get(section, [])
+        if len(spans) != 1:
+            raise PatchApplyError(f"Section {section!r} found {len(spans)} times")
+
+        if fragment:
+            if not is_balanced(fragment):
+                raise PatchApplyError(f"Replacement for {section!r} is not balanced HTML")
+            if section not in locate(fragment, attribute):
+                raise PatchApplyError(f"Replacement for {section!r} lost its {attribute} marker")
+
+        start, end = spans[0]
+        replacements.append((start, end, fragment))
+
+    replacements.sort()
+    for (_, previous_end, _), (next_start, _, _) in zip(replacements, replacements[1:]):
+        if next_start < previous_end:
+            raise PatchApplyError("Patches overlap")
+
+    for start, end, fragment in reversed(replacements):
+        html = html[:start] + fragment + html[end:]
+
+    return html
+
+
+def parse_patch_output(final_output: str) -> Optional[list[dict]]:
+    """Разобрать ответ агента-патчера: список патчей или None, если он просит полную перегенерацию."""
+    try:
+        data = json.loads(final_output)
+    except json.JSONDecodeError as e:
+        raise PatchApplyError(f"Patch is not valid JSON: {e}") from e
+
+    if not isinstance(data, dict):
+        raise PatchApplyError("Patch is not a JSON object")
+    if data.get("mode") == "full":
+        return None
+    patches = data.get("patches")
+    if not isinstance(patches, list):
+        raise PatchApplyError("Patch has no patches list")
+    return patches
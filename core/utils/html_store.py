@@ -0,0 +1,175 @@
+import os
+import zlib
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from core.utils.redis_cache import redis_cache
+from core.utils.storage import StorageBackend, storage as default_storage
+
+try:
+    import zstandard
+except ImportError:  # zstd — необязательная зависимость, без неё сжимаем zlib
+    zstandard = None
+
+CODEC_RAW = b"r"
+CODEC_ZLIB = b"z"
+CODEC_ZSTD = b"s"
+
+
+class HtmlStore:
+    """Хранилище HTML версий резюме.
+
+    Каждая версия пишется в файловое хранилище (ключ <user>/resume_<id>/html/...) и
+    сжатой в Redis под ключом resume:html:{user_id}:{resume_id}:{version}. Горячими
+    в Redis остаются только keep_versions последних версий резюме и не дольше ttl —
+    более старые читаются из хранилища, прозрачно для вызывающего кода. Первый байт значения —
+    кодек (zstd, zlib или без сжатия), поэтому смена кодека не ломает старые записи.
+    Ключи пользователя регистрируются в множестве resume:html_keys:{user_id}, чтобы
+    удалять их без SCAN (см. forget_user); туда же ResumeServiceAgent кладёт ключи
+    историй агента по резюме пользователя. Индекс и множество горячих версий
+    resume:html_hot:{resume_id} живут столько же, сколько HTML (ttl от последней записи),
+    и не остаются в Redis навсегда после ухода пользователя.
+    """
+
+    def __init__(
+            self,
+            redis_client: Redis,
+            storage: Optional[StorageBackend] = None,
+            prefix: str = "resume:html:",
+            keep_versions: int = 3,
+            ttl: Optional[int] = 60 * 60 * 24 * 30,
+            codec: Optional[bytes] = None,
+            level: int = 6,
+    ):
+        self.redis_client = redis_client
+        self.storage = storage or default_storage
+        self.prefix = prefix
+        self.keep_versions = max(keep_versions, 1)
+        self.ttl = ttl
+        self.codec = codec or (CODEC_ZSTD if zstandard else CODEC_ZLIB)
+        self.level = level
+
+    def key(self, user_id: int, resume_id: int, version: int) -> str:
+        return f"{self.prefix}{user_id}:{resume_id}:{version}"
+
+    @staticmethod
+    def index_key(user_id: int) -> str:
+        # Вне префикса resume:html:, чтобы не попадать в SCAN по HTML-ключам
+        return f"resume:html_keys:{user_id}"
+
+    @staticmethod
+    def _hot_key(resume_id: int) -> str:
+        return f"resume:html_hot:{resume_id}"
+
+    @property
+    def _stats_key(self) -> str:
+        return "resume:html_stats"
+
+    @staticmethod
+    def path(user_id: int, resume_id: int, version: int) -> str:
+        """Ключ файла версии в хранилище (он же значение ResumeVersion.path_to_html)."""
+        return f"{user_id}/resume_{resume_id}/html/resume_html_{user_id}_v{version}.html"
+
+    def compress(self, html_code: str) -> bytes:
+        raw = html_code.encode("utf-8")
+        if self.codec == CODEC_ZSTD:
+            return CODEC_ZSTD + zstandard.ZstdCompressor(level=self.level).compress(raw)
+        if self.codec == CODEC_ZLIB:
+            return CODEC_ZLIB + zlib.compress(raw, self.level)
+        return CODEC_RAW + raw
+
+    @staticmethod
+    def decompress(payload: bytes) -> str:
+        codec, body = payload[:1], payload[1:]
+        if codec == CODEC_ZSTD:
+            return zstandard.ZstdDecompressor().decompress(body).decode("utf-8")
+        if codec == CODEC_ZLIB:
+            return zlib.decompress(body).decode("utf-8")
+        return body.decode("utf-8")
+
+    async def put(self, user_id: int, resume_id: int, version: int, html_code: str) -> str:
+        """Сохранить HTML версии в хранилище и в Redis; вернуть ключ файла."""
+        path = self.path(user_id, resume_id, version)
+        await self.storage.write_text(path, html_code)
+
+        key = self.key(user_id, resume_id, version)
+        payload = self.compress(html_code)
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.set(key, payload, ex=self.ttl)
+            pipe.sadd(self.index_key(user_id), key, self._hot_key(resume_id))
+            pipe.zadd(self._hot_key(resume_id), {key: version})
+            # Всё, кроме keep_versions старших версий, остаётся только на диске
+            pipe.zrange(self._hot_key(resume_id), 0, -self.keep_versions - 1)
+            pipe.zremrangebyrank(self._hot_key(resume_id), 0, -self.keep_versions - 1)
+            if self.ttl:
+                pipe.expire(self._hot_key(resume_id), self.ttl)
+                pipe.expire(self.index_key(user_id), self.ttl)
+            pipe.hincrby(self._stats_key, "raw_bytes", len(html_code.encode("utf-8")))
+            pipe.hincrby(self._stats_key, "stored_bytes", len(payload))
+            cold_keys = (await pipe.execute())[3]
+
+        if cold_keys:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.unlink(*cold_keys)
+                pipe.srem(self.index_key(user_id), *cold_keys)
+                await pipe.execute()
+        return path
+
+    async def get(self, user_id: int, resume_id: int, version: int) -> Optional[str]:
+        """HTML версии из Redis, а если его там уже нет — из хранилища; None, если нет нигде."""
+        payload = await self.redis_client.get(self.key(user_id, resume_id, version))
+        if payload is not None:
+            await self.redis_client.hincrby(self._stats_key, "hits", 1)
+            return self.decompress(payload)
+
+        html_code = await self.storage.read_text(self.path(user_id, resume_id, version))
+        if html_code is None:
+            await self.redis_client.hincrby(self._stats_key, "misses", 1)
+            return None
+
+        await self.redis_client.hincrby(self._stats_key, "disk_reads", 1)
+        return html_code
+
+    async def forget_resume(self, user_id: int, resume_id: int) -> None:
+        """Убрать из Redis горячие версии резюме и их записи в индексе пользователя (файлы не трогаются)."""
+        hot_key = self._hot_key(resume_id)
+        keys = await self.redis_client.zrange(hot_key, 0, -1)
+
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.unlink(hot_key, *keys)
+            pipe.srem(self.index_key(user_id), hot_key, *keys)
+            await pipe.execute()
+
+    async def forget_user(self, user_id: int) -> None:
+        """Убрать из Redis все ключи из индекса пользователя (файлы в хранилище остаются).
+
+        Из индекса удаляются только прочитанные ключи, так что ключ, записанный
+        параллельно, не потеряется.
+        """
+        index_key = self.index_key(user_id)
+        keys = await self.redis_client.smembers(index_key)
+        if not keys:
+            return
+
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.unlink(*keys)
+            pipe.srem(index_key, *keys)
+            await pipe.execute()
+
+    async def stats(self) -> dict[str, int]:
+        raw = await self.redis_client.hgetall(self._stats_key)
+        stats = {
+            (key.decode() if isinstance(key, bytes) else key): int(value)
+            for key, value in raw.items()
+        }
+        stats = {"hits": 0, "misses": 0, "disk_reads": 0, "raw_bytes": 0, "stored_bytes": 0, **stats}
+        stats["bytes_saved"] = stats["raw_bytes"] - stats["stored_bytes"]
+        return stats
+
+
+html_store = HtmlStore(
+    redis_cache,
+    keep_versions=int(os.getenv("HTML_STORE_HOT_VERSIONS", 3)),
+    ttl=int(os.getenv("HTML_STORE_TTL_DAYS", 30)) * 60 * 60 * 24 or None,
+)
@@ -0,0 +1,328 @@
+import asyncio
+import heapq
+import os
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, UTC
+
+from redis.asyncio import Redis
+from redis.exceptions import WatchError
+
+from core.schemas.job_schema import GenerationJob
+from core.utils.redis_cache import redis_cache
+
+
+class BaseJobQueue(ABC):
+    """Очередь задач генерации резюме.
+
+    Задача хранится отдельно от очереди, чтобы статус можно было
+    запрашивать и после того, как воркер её забрал.
+
+    Доставка «хотя бы один раз»: dequeue переносит задачу в список обрабатываемых
+    воркером consumer, и она остаётся там до ack (или retry_later). Если воркер
+    умер, не подтвердив задачу, requeue_stale вернёт её в очередь, когда истечёт
+    его heartbeat. Отложенные повторы хранятся в самой очереди и переживают
+    перезапуск процесса; в очередь их возвращает promote_due.
+    """
+
+    @abstractmethod
+    async def enqueue(self, job: GenerationJob) -> GenerationJob:
+        """Сохранить задачу и поставить её в очередь."""
+
+    async def enqueue_many(self, jobs: list[GenerationJob]) -> list[GenerationJob]:
+        """Поставить в очередь несколько задач; задачи с batch_id попадают в batch()."""
+        for job in jobs:
+            await self.enqueue(job)
+        return jobs
+
+    @abstractmethod
+    async def dequeue(self, consumer: str, timeout: float = 1.0) -> GenerationJob | None:
+        """Забрать следующую задачу в обработку consumer или вернуть None по таймауту."""
+
+    @abstractmethod
+    async def ack(self, job: GenerationJob, consumer: str) -> None:
+        """Подтвердить, что consumer закончил с задачей (успешно или окончательно провалив её)."""
+
+    @abstractmethod
+    async def retry_later(self, job: GenerationJob, consumer: str, delay: float) -> None:
+        """Сохранить задачу, отложить её повтор на delay секунд и снять с consumer."""
+
+    @abstractmethod
+    async def promote_due(self) -> int:
+        """Вернуть в очередь отложенные задачи, время которых пришло; вернуть их число."""
+
+    @abstractmethod
+    async def heartbeat(self, consumers: list[str], ttl: float) -> None:
+        """Отметить, что consumers живы ещё ttl секунд."""
+
+    @abstractmethod
+    async def requeue_stale(self) -> int:
+        """Вернуть в очередь задачи воркеров, чей heartbeat истёк; вернуть их число."""
+
+    @abstractmethod
+    async def release(self, consumers: list[str]) -> int:
+        """Вернуть в очередь незавершённые задачи consumers (при штатной остановке)."""
+
+    @abstractmethod
+    async def get(self, job_id: str) -> GenerationJob | None:
+        """Получить задачу по id."""
+
+    @abstractmethod
+    async def save(self, job: GenerationJob) -> None:
+        """Обновить сохранённое состояние задачи."""
+
+    @abstractmethod
+    async def batch(self, batch_id: str) -> list[GenerationJob] | None:
+        """Задачи пачки в порядке постановки или None, если пачка неизвестна."""
+
+
+class InMemoryJobQueue(BaseJobQueue):
+    """Локальная очередь в памяти процесса (для тестов и разработки)."""
+
+    def __init__(self):
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._jobs: dict[str, GenerationJob] = {}
+        self._batches: dict[str, list[str]] = {}
+        self._processing: dict[str, list[str]] = {}
+        self._delayed: list[tuple[float, str]] = []
+
+    async def enqueue(self, job: GenerationJob) -> GenerationJob:
+        await self.save(job)
+        await self._queue.put(job.id)
+        return job
+
+    async def enqueue_many(self, jobs: list[GenerationJob]) -> list[GenerationJob]:
+        for job in jobs:
+            if job.batch_id:
+                self._batches.setdefault(job.batch_id, []).append(job.id)
+        return await super().enqueue_many(jobs)
+
+    async def dequeue(self, consumer: str, timeout: float = 1.0) -> GenerationJob | None:
+        try:
+            job_id = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._processing.setdefault(consumer, []).append(job_id)
+        return self._jobs.get(job_id)
+
+    async def ack(self, job: GenerationJob, consumer: str) -> None:
+        in_flight = self._processing.get(consumer, [])
+        if job.id in in_flight:
+            in_flight.remove(job.id)
+
+    async def retry_later(self, job: GenerationJob, consumer: str, delay: float) -> None:
+        await self.save(job)
+        heapq.heappush(self._delayed, (time.time() + delay, job.id))
+        await self.ack(job, consumer)
+
+    async def promote_due(self) -> int:
+        promoted = 0
+        while self._delayed and self._delayed[0][0] <= time.time():
+            _, job_id = heapq.heappop(self._delayed)
+            await self._queue.put(job_id)
+            promoted += 1
+        return promoted
+
+    async def heartbeat(self, consumers: list[str], ttl: float) -> None:
+        """Воркеры живут в том же процессе, что и очередь: умереть отдельно от неё они не могут."""
+
+    async def requeue_stale(self) -> int:
+        return 0
+
+    async def release(self, consumers: list[str]) -> int:
+        released = 0
+        for consumer in consumers:
+            for job_id in self._processing.pop(consumer, []):
+                await self._queue.put(job_id)
+                released += 1
+        return released
+
+    async def get(self, job_id: str) -> GenerationJob | None:
+        job = self._jobs.get(job_id)
+        return job.model_copy() if job else None
+
+    async def save(self, job: GenerationJob) -> None:
+        job.updated_at = datetime.now(UTC)
+        self._jobs[job.id] = job.model_copy()
+
+    async def batch(self, batch_id: str) -> list[GenerationJob] | None:
+        job_ids = self._batches.get(batch_id)
+        if job_ids is None:
+            return None
+        return [self._jobs[job_id].model_copy() for job_id in job_ids if job_id in self._jobs]
+
+
+class RedisJobQueue(BaseJobQueue):
+    """Очередь на Redis: список с id задач + JSON задачи под отдельным ключом.
+
+    Забранная задача атомарно (BLMOVE) переезжает в список jobs:processing:{consumer}
+    и удаляется оттуда только ack. Живые воркеры перечислены в множестве
+    jobs:consumers и продлевают ключ jobs:heartbeat:{consumer}; задачи воркера без
+    heartbeat requeue_stale возвращает в очередь. Отложенные повторы лежат в
+    sorted set jobs:delayed со временем запуска в score.
+    """
+
+    def __init__(
+            self,
+            redis_client: Redis,
+            queue_key: str = "jobs:queue",
+            prefix: str = "jobs:job:",
+            batch_prefix: str = "jobs:batch:",
+            ttl: int = 60 * 60 * 24,
+    ):
+        self.redis_client = redis_client
+        self.queue_key = queue_key
+        self.prefix = prefix
+        self.batch_prefix = batch_prefix
+        self.ttl = ttl
+        self.delayed_key = "jobs:delayed"
+        self.consumers_key = "jobs:consumers"
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}{job_id}"
+
+    @staticmethod
+    def _processing_key(consumer: str) -> str:
+        return f"jobs:processing:{consumer}"
+
+    @staticmethod
+    def _heartbeat_key(consumer: str) -> str:
+        return f"jobs:heartbeat:{consumer}"
+
+    @staticmethod
+    def _decode(value) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+
+    async def enqueue(self, job: GenerationJob) -> GenerationJob:
+        job.updated_at = datetime.now(UTC)
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.set(self._key(job.id), job.model_dump_json(), ex=self.ttl)
+            pipe.rpush(self.queue_key, job.id)
+            await pipe.execute()
+        return job
+
+    async def enqueue_many(self, jobs: list[GenerationJob]) -> list[GenerationJob]:
+        """Все задачи — одной транзакцией MULTI/EXEC: один round trip на любой размер пачки."""
+        if not jobs:
+            return jobs
+        now = datetime.now(UTC)
+        batches: dict[str, list[str]] = {}
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            for job in jobs:
+                job.updated_at = now
+                pipe.set(self._key(job.id), job.model_dump_json(), ex=self.ttl)
+                if job.batch_id:
+                    batches.setdefault(job.batch_id, []).append(job.id)
+            pipe.rpush(self.queue_key, *(job.id for job in jobs))
+            for batch_id, job_ids in batches.items():
+                pipe.rpush(f"{self.batch_prefix}{batch_id}", *job_ids)
+                pipe.expire(f"{self.batch_prefix}{batch_id}", self.ttl)
+            await pipe.execute()
+        return jobs
+
+    async def dequeue(self, consumer: str, timeout: float = 1.0) -> GenerationJob | None:
+        processing_key = self._processing_key(consumer)
+        job_id = await self.redis_client.blmove(self.queue_key, processing_key, timeout, "LEFT", "RIGHT")
+        if job_id is None:
+            return None
+
+        job = await self.get(self._decode(job_id))
+        if job is None:
+            # JSON задачи истёк по TTL — выполнять нечего
+            await self.redis_client.lrem(processing_key, 1, job_id)
+        return job
+
+    async def ack(self, job: GenerationJob, consumer: str) -> None:
+        await self.redis_client.lrem(self._processing_key(consumer), 1, job.id)
+
+    async def retry_later(self, job: GenerationJob, consumer: str, delay: float) -> None:
+        job.updated_at = datetime.now(UTC)
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.set(self._key(job.id), job.model_dump_json(), ex=self.ttl)
+            pipe.zadd(self.delayed_key, {job.id: time.time() + delay})
+            pipe.lrem(self._processing_key(consumer), 1, job.id)
+            await pipe.execute()
+
+    async def promote_due(self) -> int:
+        # WATCH/MULTI: несколько пулов могут опрашивать jobs:delayed одновременно,
+        # задача должна попасть в очередь ровно один раз
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(self.delayed_key)
+                due = await pipe.zrangebyscore(self.delayed_key, "-inf", time.time(), start=0, num=100)
+                if not due:
+                    return 0
+                pipe.multi()
+                pipe.zrem(self.delayed_key, *due)
+                pipe.rpush(self.queue_key, *due)
+                await pipe.execute()
+            except WatchError:
+                return 0
+        return len(due)
+
+    async def heartbeat(self, consumers: list[str], ttl: float) -> None:
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.sadd(self.consumers_key, *consumers)
+            for consumer in consumers:
+                pipe.set(self._heartbeat_key(consumer), 1, px=int(ttl * 1000))
+            await pipe.execute()
+
+    async def _move_back(self, consumer: str) -> int:
+        moved = 0
+        # LMOVE по одному элементу атомарен: задача всегда лежит ровно в одном из списков
+        while await self.redis_client.lmove(self._processing_key(consumer), self.queue_key, "RIGHT", "LEFT"):
+            moved += 1
+        return moved
+
+    async def requeue_stale(self) -> int:
+        consumers = [self._decode(consumer) for consumer in await self.redis_client.smembers(self.consumers_key)]
+        if not consumers:
+            return 0
+
+        alive = await self.redis_client.mget([self._heartbeat_key(consumer) for consumer in consumers])
+        requeued = 0
+        for consumer, heartbeat in zip(consumers, alive):
+            if heartbeat is not None:
+                continue
+            requeued += await self._move_back(consumer)
+            await self.redis_client.srem(self.consumers_key, consumer)
+        return requeued
+
+    async def release(self, consumers: list[str]) -> int:
+        released = 0
+        for consumer in consumers:
+            released += await self._move_back(consumer)
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.srem(self.consumers_key, *consumers)
+            pipe.unlink(*(self._heartbeat_key(consumer) for consumer in consumers))
+            await pipe.execute()
+        return released
+
+    async def get(self, job_id: str) -> GenerationJob | None:
+        raw = await self.redis_client.get(self._key(job_id))
+        if raw is None:
+            return None
+        return GenerationJob.model_validate_json(raw)
+
+    async def save(self, job: GenerationJob) -> None:
+        job.updated_at = datetime.now(UTC)
+        await self.redis_client.set(self._key(job.id), job.model_dump_json(), ex=self.ttl)
+
+    async def batch(self, batch_id: str) -> list[GenerationJob] | None:
+        job_ids = await self.redis_client.lrange(f"{self.batch_prefix}{batch_id}", 0, -1)
+        if not job_ids:
+            return None
+        raws = await self.redis_client.mget([
+            self._key(job_id.decode() if isinstance(job_id, bytes) else job_id) for job_id in job_ids
+        ])
+        return [GenerationJob.model_validate_json(raw) for raw in raws if raw is not None]
+
+
+def build_job_queue(backend: str | None = None) -> BaseJobQueue:
+    backend = backend or os.getenv("JOB_QUEUE_BACKEND", "redis")
+    if backend == "memory":
+        return InMemoryJobQueue()
+    return RedisJobQueue(redis_client=redis_cache)
+
+
+job_queue = build_job_queue()
@@ -0,0 +1,105 @@
+import json
+from typing import AsyncIterator, Optional
+
+from redis.asyncio import Redis
+
+from core.utils.redis_cache import redis_cache
+
+
+class JobStream:
+    """Поток прогресса задачи генерации в Redis Streams.
+
+    Воркер пишет в поток куски HTML (уже раскодированный текст, а не JSON
+    ответа модели) по мере их появления; событие reset означает, что
+    попытка модели сорвалась и HTML начнётся заново.
+    SSE-эндпоинт читает их через XREAD BLOCK. Id записей потока
+    используются как id событий SSE, поэтому клиент может переподключиться
+    с заголовком Last-Event-ID и не потерять уже сгенерированную часть.
+    """
+
+    FINAL_EVENTS = ("done", "failed")
+
+    def __init__(
+            self,
+            redis_client: Redis,
+            prefix: str = "jobs:stream:",
+            ttl: int = 60 * 60,
+            maxlen: int = 10_000,
+    ):
+        self.redis_client = redis_client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.maxlen = maxlen
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}{job_id}"
+
+    async def publish(self, job_id: str, event: str, data: Optional[dict] = None) -> None:
+        key = self._key(job_id)
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.xadd(
+                key,
+                {"event": event, "data": json.dumps(data or {}, ensure_ascii=False)},
+                maxlen=self.maxlen,
+                approximate=True,
+            )
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def exists(self, job_id: str) -> bool:
+        return bool(await self.redis_client.exists(self._key(job_id)))
+
+    async def publish_delta(self, job_id: str, delta: str) -> None:
+        await self.publish(job_id, "delta", {"delta": delta})
+
+    async def publish_reset(self, job_id: str, data: Optional[dict] = None) -> None:
+        """Начать ответ модели заново: записать событие reset и отрезать всё, что было до него.
+
+        Клиент, подключившийся позже (или с Last-Event-ID из прошлой попытки),
+        не получит куски ответа, который уже выброшен.
+        """
+        key = self._key(job_id)
+        entry_id = await self.redis_client.xadd(
+            key,
+            {"event": "reset", "data": json.dumps(data or {}, ensure_ascii=False)},
+            maxlen=self.maxlen,
+            approximate=True,
+        )
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.xtrim(key, minid=entry_id, approximate=False)
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def listen(
+            self,
+            job_id: str,
+            last_id: str = "0-0",
+            block_ms: int = 15_000,
+    ) -> AsyncIterator[tuple[str, str, dict]]:
+        """Читать события задачи, пока не придёт done/failed.
+
+        Если за block_ms новых событий нет — отдаётся служебное событие ping,
+        чтобы прокси не закрывали простаивающее соединение.
+        """
+        key = self._key(job_id)
+        while True:
+            response = await self.redis_client.xread({key: last_id}, block=block_ms)
+            if not response:
+                yield last_id, "ping", {}
+                continue
+
+            for _, entries in response:
+                for entry_id, fields in entries:
+                    last_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+                    fields = {
+                        (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+                        for k, v in fields.items()
+                    }
+                    event = fields["event"]
+                    yield last_id, event, json.loads(fields["data"])
+
+                    if event in self.FINAL_EVENTS:
+                        return
+
+
+job_stream = JobStream(redis_client=redis_cache)
@@ -0,0 +1,199 @@
+import asyncio
+import os
+import socket
+import time
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+from loguru import logger
+
+from core.schemas.job_schema import GenerationJob, JobStatus
+from core.utils.jobs.job_queue import BaseJobQueue
+from core.utils.metrics import metrics
+
+JobHandler = Callable[[GenerationJob], Awaitable[None]]
+FailureHandler = Callable[[GenerationJob, Exception], Awaitable[None]]
+
+
+class JobWorkerPool:
+    """Пул воркеров, выполняющих задачи генерации из очереди.
+
+    Количество одновременно выполняемых задач ограничено числом воркеров,
+    упавшая задача перезапускается с экспоненциальной задержкой,
+    пока не исчерпает max_attempts. Повтор откладывается в самой очереди
+    (retry_later), а не в памяти процесса, поэтому переживает перезапуск.
+
+    Каждый воркер — отдельный consumer очереди. Служебная задача пула раз в
+    секунду возвращает в очередь подошедшие повторы, продлевает heartbeat
+    своих воркеров и подбирает задачи воркеров, чей heartbeat истёк (упавший
+    процесс, деплой). При штатной остановке незавершённые задачи сразу
+    возвращаются в очередь.
+    """
+
+    def __init__(
+            self,
+            queue: BaseJobQueue,
+            handler: JobHandler,
+            on_failure: FailureHandler | None = None,
+            concurrency: int = 4,
+            max_attempts: int = 3,
+            retry_delay: float = 5.0,
+            heartbeat_ttl: float = 30.0,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.on_failure = on_failure
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.heartbeat_ttl = heartbeat_ttl
+
+        self.pool_id = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.consumers = [f"{self.pool_id}:{number}" for number in range(concurrency)]
+        self._tasks: list[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    async def start(self) -> None:
+        self._stopping.clear()
+        await self.queue.heartbeat(self.consumers, self.heartbeat_ttl)
+        self._tasks = [
+            asyncio.create_task(self._worker(consumer), name=f"job-worker-{number}")
+            for number, consumer in enumerate(self.consumers)
+        ]
+        self._tasks.append(asyncio.create_task(self._maintain(), name="job-pool-maintenance"))
+        logger.info(f"Started {self.concurrency} job workers ({self.pool_id})")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        try:
+            released = await self.queue.release(self.consumers)
+        except Exception as e:
+            # Не вышло — задачи подберёт requeue_stale другого пула, когда истечёт heartbeat
+            logger.error(f"Failed to release in-flight jobs: {e}")
+        else:
+            if released:
+                logger.info(f"Returned {released} in-flight jobs to the queue")
+
+    async def _maintain(self) -> None:
+        last_heartbeat = time.monotonic()
+        while not self._stopping.is_set():
+            await asyncio.sleep(1)
+            try:
+                await self.queue.promote_due()
+                if time.monotonic() - last_heartbeat >= self.heartbeat_ttl / 3:
+                    await self.queue.heartbeat(self.consumers, self.heartbeat_ttl)
+                    last_heartbeat = time.monotonic()
+                    requeued = await self.queue.requeue_stale()
+                    if requeued:
+                        logger.warning(f"Requeued {requeued} jobs of dead workers")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job pool maintenance failed: {e}")
+
+    async def _worker(self, consumer: str) -> None:
+        while not self._stopping.is_set():
+            job = None
+            try:
+                job = await self.queue.dequeue(consumer, timeout=1)
+                if job is not None:
+                    await self.process(job, consumer)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Сбой очереди или обработчика ошибок не должен останавливать воркер
+                logger.error(f"Worker {consumer} failed on job {job.id if job else None}: {e}")
+                if job is not None:
+                    await self._settle(job, consumer)
+                await asyncio.sleep(1)
+
+    async def _settle(self, job: GenerationJob, consumer: str) -> None:
+        """Снять с воркера задачу, на которой сломалась сама обработка: повторить позже или бросить."""
+        try:
+            if job.attempts < self.max_attempts:
+                await self.queue.retry_later(job, consumer, self._backoff(job))
+            else:
+                await self.queue.ack(job, consumer)
+        except Exception as e:
+            logger.error(f"Failed to settle job {job.id}, it will be requeued with the worker: {e}")
+
+    def _backoff(self, job: GenerationJob) -> float:
+        return self.retry_delay * 2 ** (job.attempts - 1)
+
+    async def process(self, job: GenerationJob, consumer: str) -> None:
+        job.status = JobStatus.RUNNING
+        job.attempts += 1
+        await self.queue.save(job)
+
+        started = time.perf_counter()
+        try:
+            await self.handler(job)
+        except Exception as e:
+            logger.error(f"Job {job.id} attempt {job.attempts} failed: {e}")
+            job.error = str(e)
+            metrics.observe_job(job.action.value, JobStatus.FAILED.value, time.perf_counter() - started)
+
+            if job.attempts < self.max_attempts:
+                job.status = JobStatus.QUEUED
+                await self.queue.retry_later(job, consumer, self._backoff(job))
+                return
+
+            job.status = JobStatus.FAILED
+            await self.queue.save(job)
+            if self.on_failure:
+                await self.on_failure(job, e)
+            await self.queue.ack(job, consumer)
+            return
+
+        metrics.observe_job(job.action.value, JobStatus.DONE.value, time.perf_counter() - started)
+        job.status = JobStatus.DONE
+        job.error = None
+        await self.queue.save(job)
+        await self.queue.ack(job, consumer)
+
+
+def build_worker_pool(concurrency: int | None = None) -> JobWorkerPool:
+    from core.services.resume_service import ResumeService
+    from core.utils.jobs.job_queue import job_queue
+
+    return JobWorkerPool(
+        queue=job_queue,
+        handler=ResumeService.run_generation_job,
+        on_failure=ResumeService.fail_generation_job,
+        concurrency=concurrency or int(os.getenv("JOB_CONCURRENCY", 4)),
+        max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", 3)),
+        retry_delay=float(os.getenv("JOB_RETRY_DELAY", 5)),
+    )
+
+
+async def main() -> None:
+    from core.db.db import engine
+    from core.utils.agents.gpt_agent import get_resume_agent
+    from core.utils.browser_pool import browser_pool
+    from core.utils.metrics_export import start_metrics_server
+    from core.utils.storage import storage
+
+    resume_agent = get_resume_agent()
+    # У воркера нет HTTP API, а счётчики задач и роутера моделей живут в его памяти; METRICS_PORT=0 — не отдавать
+    port = int(os.getenv("METRICS_PORT", 9100))
+    metrics_server = await start_metrics_server(os.getenv("METRICS_HOST", "0.0.0.0"), port, resume_agent) if port else None
+    await browser_pool.start()
+    pool = build_worker_pool()
+    await pool.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+        if metrics_server is not None:
+            metrics_server.close()
+        await browser_pool.stop()
+        await storage.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
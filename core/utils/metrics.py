@@ -0,0 +1,260 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Что считаем внутри запроса: SQL, команды Redis, вызовы агентов, запись файлов
+OPERATION_KINDS = ("db", "redis", "agent", "file")
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BACKGROUND_ROUTE = "background"
+
+
+@dataclass
+class RequestMetrics:
+    counts: dict[str, int] = field(default_factory=lambda: dict.fromkeys(OPERATION_KINDS, 0))
+    durations: dict[str, float] = field(default_factory=lambda: dict.fromkeys(OPERATION_KINDS, 0.0))
+
+    def record(self, kind: str, seconds: float) -> None:
+        self.counts[kind] += 1
+        self.durations[kind] += seconds
+
+    def server_timing(self, total: float) -> str:
+        """Значение заголовка Server-Timing (длительности в миллисекундах)."""
+        parts = [
+            f'{kind};dur={self.durations[kind] * 1000:.1f};desc="{self.counts[kind]} calls"'
+            for kind in OPERATION_KINDS
+            if self.counts[kind]
+        ]
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class MetricsRegistry:
+    """Метрики процесса в памяти с выводом в текстовом формате Prometheus.
+
+    Операции внутри HTTP-запроса копятся в RequestMetrics текущего контекста
+    и попадают в общие счётчики с меткой маршрута, когда запрос завершается.
+    Операции вне запроса (воркеры, фоновые задачи) учитываются сразу с route="background".
+    """
+
+    def __init__(self):
+        self.requests: dict[tuple[str, str, int], int] = defaultdict(int)
+        self.request_durations: dict[tuple[str, str], Histogram] = defaultdict(Histogram)
+        self.operations: dict[tuple[str, str], int] = defaultdict(int)
+        self.operation_seconds: dict[tuple[str, str], float] = defaultdict(float)
+        self.operations_per_request: dict[tuple[str, str], Histogram] = {}
+        self.jobs: dict[tuple[str, str], int] = defaultdict(int)
+        self.job_durations: dict[str, Histogram] = defaultdict(
+            lambda: Histogram(buckets=(1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0))
+        )
+        self.pool_checkouts = Histogram(buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+        self.pool_timeouts = 0
+
+    def record_operation(self, kind: str, seconds: float) -> None:
+        current = _current.get()
+        if current is not None:
+            current.record(kind, seconds)
+            return
+        self.operations[(BACKGROUND_ROUTE, kind)] += 1
+        self.operation_seconds[(BACKGROUND_ROUTE, kind)] += seconds
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, request: RequestMetrics) -> None:
+        self.requests[(method, route, status)] += 1
+        self.request_durations[(method, route)].observe(seconds)
+        for kind in OPERATION_KINDS:
+            self.operations[(route, kind)] += request.counts[kind]
+            self.operation_seconds[(route, kind)] += request.durations[kind]
+
+            key = (route, kind)
+            if key not in self.operations_per_request:
+                self.operations_per_request[key] = Histogram(buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50))
+            self.operations_per_request[key].observe(request.counts[kind])
+
+    def observe_job(self, action: str, status: str, seconds: float) -> None:
+        """Завершённая попытка задачи генерации; rate(app_jobs_total{status="done"}) * 60 — резюме в минуту."""
+        self.jobs[(action, status)] += 1
+        self.job_durations[action].observe(seconds)
+
+    def observe_pool_checkout(self, seconds: float, timed_out: bool = False) -> None:
+        """Получение соединения из пула БД, включая ожидание свободного и открытие нового."""
+        self.pool_checkouts.observe(seconds)
+        if timed_out:
+            self.pool_timeouts += 1
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_requests_total HTTP requests by route and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), value in sorted(self.requests.items()):
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {value}")
+
+        lines += [
+            "# HELP http_request_duration_seconds HTTP request latency.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.request_durations.items()):
+            lines += self._render_histogram("http_request_duration_seconds", histogram, method=method, route=route)
+
+        lines += [
+            "# HELP app_operations_total DB queries, Redis commands, agent calls and file writes.",
+            "# TYPE app_operations_total counter",
+        ]
+        for (route, kind), value in sorted(self.operations.items()):
+            lines.append(f"app_operations_total{_labels(route=route, kind=kind)} {value}")
+
+        lines += [
+            "# HELP app_operation_seconds_total Time spent in operations of each kind.",
+            "# TYPE app_operation_seconds_total counter",
+        ]
+        for (route, kind), value in sorted(self.operation_seconds.items()):
+            lines.append(f"app_operation_seconds_total{_labels(route=route, kind=kind)} {value:.6f}")
+
+        lines += [
+            "# HELP app_operations_per_request Operations of each kind issued by a single request.",
+            "# TYPE app_operations_per_request histogram",
+        ]
+        for (route, kind), histogram in sorted(self.operations_per_request.items()):
+            lines += self._render_histogram("app_operations_per_request", histogram, route=route, kind=kind)
+
+        lines += [
+            "# HELP app_jobs_total Generation job attempts by action and outcome.",
+            "# TYPE app_jobs_total counter",
+        ]
+        for (action, status), value in sorted(self.jobs.items()):
+            lines.append(f"app_jobs_total{_labels(action=action, status=status)} {value}")
+
+        lines += [
+            "# HELP app_job_duration_seconds Time a worker spent on a generation job attempt.",
+            "# TYPE app_job_duration_seconds histogram",
+        ]
+        for action, histogram in sorted(self.job_durations.items()):
+            lines += self._render_histogram("app_job_duration_seconds", histogram, action=action)
+
+        lines += [
+            "# HELP db_pool_checkout_seconds Time to get a connection from the DB pool.",
+            "# TYPE db_pool_checkout_seconds histogram",
+            *self._render_histogram("db_pool_checkout_seconds", self.pool_checkouts),
+            "# HELP db_pool_timeouts_total Requests that gave up waiting for a DB connection.",
+            "# TYPE db_pool_timeouts_total counter",
+            f"db_pool_timeouts_total {self.pool_timeouts}",
+        ]
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histogram(name: str, histogram: Histogram, **labels: str) -> list[str]:
+        lines = [
+            f"{name}_bucket{_labels(**labels, le=bound)} {count}"
+            for bound, count in zip(histogram.buckets, histogram.counts)
+        ]
+        lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {histogram.count}")
+        lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+        return lines
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+metrics = MetricsRegistry()
+
+
+@contextmanager
+def request_scope() -> Iterator[RequestMetrics]:
+    request = RequestMetrics()
+    token = _current.set(request)
+    try:
+        yield request
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def track(kind: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.record_operation(kind, time.perf_counter() - started)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.get("metrics_started")
+    if started:
+        metrics.record_operation("db", time.perf_counter() - started.pop())
+
+
+def _handle_error(exception_context) -> None:
+    started = exception_context.connection.info.get("metrics_started") if exception_context.connection else None
+    if started:
+        metrics.record_operation("db", time.perf_counter() - started.pop())
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def instrument_redis(client) -> None:
+    """Считать команды клиента redis.asyncio: одиночные и пайплайны (пайплайн — один round trip)."""
+    if getattr(client, "_metrics_instrumented", False):
+        return
+
+    execute_command = client.execute_command
+    pipeline = client.pipeline
+
+    async def instrumented_execute_command(*args, **options):
+        with track("redis"):
+            return await execute_command(*args, **options)
+
+    def instrumented_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def instrumented_execute(*execute_args, **execute_kwargs):
+            with track("redis"):
+                return await execute(*execute_args, **execute_kwargs)
+
+        pipe.execute = instrumented_execute
+        return pipe
+
+    client.execute_command = instrumented_execute_command
+    client.pipeline = instrumented_pipeline
+    client._metrics_instrumented = True
@@ -0,0 +1,111 @@
+import asyncio
+
+from loguru import logger
+
+from core.db import db
+from core.utils.html_store import html_store
+from core.utils.metrics import metrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def model_router_metrics(resume_agent) -> str:
+    if resume_agent is None:
+        return ""
+
+    lines = [
+        "# HELP agent_model_error_rate Share of failed agent calls in the router window.",
+        "# TYPE agent_model_error_rate gauge",
+        "# HELP agent_model_latency_seconds Agent call latency in the router window.",
+        "# TYPE agent_model_latency_seconds gauge",
+        "# HELP agent_model_circuit_open Whether the model's circuit breaker is open.",
+        "# TYPE agent_model_circuit_open gauge",
+    ]
+    for model, stats in resume_agent.model_router.snapshot().items():
+        lines.append(f'agent_model_error_rate{{model="{model}"}} {stats["error_rate"]}')
+        lines.append(f'agent_model_circuit_open{{model="{model}"}} {int(stats["state"] == "open")}')
+        for quantile, key in (("0.5", "p50"), ("0.95", "p95")):
+            if stats[key] is not None:
+                lines.append(f'agent_model_latency_seconds{{model="{model}",quantile="{quantile}"}} {stats[key]}')
+    return "\n".join(lines) + "\n"
+
+
+async def html_store_metrics() -> str:
+    stats = await html_store.stats()
+    lines = [
+        "# HELP html_store_reads_total HTML version reads by source (redis, disk, miss).",
+        "# TYPE html_store_reads_total counter",
+        f'html_store_reads_total{{source="redis"}} {stats["hits"]}',
+        f'html_store_reads_total{{source="disk"}} {stats["disk_reads"]}',
+        f'html_store_reads_total{{source="miss"}} {stats["misses"]}',
+        "# HELP html_store_bytes_total HTML bytes written: raw and after compression.",
+        "# TYPE html_store_bytes_total counter",
+        f'html_store_bytes_total{{kind="raw"}} {stats["raw_bytes"]}',
+        f'html_store_bytes_total{{kind="stored"}} {stats["stored_bytes"]}',
+        "# HELP html_store_bytes_saved_total Bytes saved by compressing HTML in Redis.",
+        "# TYPE html_store_bytes_saved_total counter",
+        f"html_store_bytes_saved_total {stats['bytes_saved']}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def db_pool_metrics() -> str:
+    pool = db.engine.pool
+    if not hasattr(pool, "checkedout"):
+        return ""
+
+    capacity = db.settings.pool_size + max(db.settings.max_overflow, 0)
+    lines = [
+        "# HELP db_pool_connections DB pool connections by state; overflow is negative until the pool is full.",
+        "# TYPE db_pool_connections gauge",
+        f'db_pool_connections{{state="checked_out"}} {pool.checkedout()}',
+        f'db_pool_connections{{state="idle"}} {pool.checkedin()}',
+        f'db_pool_connections{{state="overflow"}} {pool.overflow()}',
+        "# HELP db_pool_capacity Maximum connections the pool may open (pool_size + max_overflow).",
+        "# TYPE db_pool_capacity gauge",
+        f"db_pool_capacity {capacity}",
+        "# HELP db_pool_saturation Share of the pool capacity currently checked out.",
+        "# TYPE db_pool_saturation gauge",
+        f"db_pool_saturation {pool.checkedout() / capacity if capacity else 0}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+async def render_process_metrics(resume_agent=None) -> str:
+    """Все метрики процесса в формате Prometheus: счётчики, роутер моделей, HtmlStore и пул БД."""
+    return metrics.render() + model_router_metrics(resume_agent) + await html_store_metrics() + db_pool_metrics()
+
+
+async def start_metrics_server(host: str, port: int, resume_agent=None) -> asyncio.Server:
+    """Отдавать метрики процесса на GET /metrics для процессов без HTTP API (воркер задач).
+
+    Счётчики живут в памяти процесса, поэтому Prometheus должен опрашивать
+    каждый процесс отдельно: API — через его /metrics, воркер — через этот порт.
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            # Заголовки запроса не нужны, но их надо дочитать до пустой строки
+            while (await reader.readline()).strip():
+                pass
+
+            parts = request_line.decode("latin-1").split()
+            status, body = "404 Not Found", b""
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", (await render_process_metrics(resume_agent)).encode()
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.error(f"Failed to serve metrics: {e}")
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info(f"Serving metrics on {host}:{port}/metrics")
+    return server
+
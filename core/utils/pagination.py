@@ -0,0 +1,48 @@
+import base64
+import json
+
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(**values) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _has_type(value, expected: type) -> bool:
+    # bool — подкласс int, а JSON отдаёт целое число и там, где ждали float
+    if isinstance(value, bool):
+        return expected is bool
+    if expected is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, expected)
+
+
+def decode_cursor(cursor: str | None, **fields: type) -> dict:
+    """Значения курсора, например decode_cursor(cursor, id=int); {} без курсора.
+
+    Курсор приходит от клиента, поэтому проверяется, что в нём есть ровно поля fields
+    нужных типов: подделанный или устаревший курсор — это 400, а не 500 из запроса к БД.
+    """
+    if not cursor:
+        return {}
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, json.JSONDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, dict) or set(values) != set(fields):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not all(_has_type(values[name], expected) for name, expected in fields.items()):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def page_of(rows: list, limit: int, cursor_for) -> dict:
+    """Собрать страницу из limit + 1 строк: лишняя строка только говорит, что есть продолжение."""
+    items = rows[:limit]
+    next_cursor = cursor_for(items[-1]) if len(rows) > limit and items else None
+    return {"items": items, "next_cursor": next_cursor}
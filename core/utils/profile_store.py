@@ -0,0 +1,206 @@
+import json
+import os
+from collections import OrderedDict
+from typing import Iterable
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from core.models.profile import Profile
+from core.models.resume_version import ResumeVersion
+
+PROFILE_FIELDS = tuple(
+    column.name for column in Profile.__table__.columns
+    if column.name not in ("id", "version_id", "is_snapshot", "delta")
+)
+
+# Поля, которые хранятся в каждой строке и в режиме delta: по ним ищут резюме (SearchService)
+SEARCH_FIELDS = ("position", "skills")
+
+STORAGE_FULL = "full"
+STORAGE_DELTA = "delta"
+
+# Профиль новой версии = профиль базовой версии, поверх которого jsonb_populate_record
+# накладывает изменённые поля. Неизменённые поля не покидают БД
+CARRY_FORWARD_SQL = text(f"""
+    INSERT INTO profile ({", ".join(PROFILE_FIELDS)}, is_snapshot, version_id)
+    SELECT {", ".join(f"merged.{field}" for field in PROFILE_FIELDS)}, true, CAST(:version_id AS integer)
+    FROM profile AS base
+    CROSS JOIN LATERAL jsonb_populate_record(base, CAST(:changes AS jsonb)) AS merged
+    WHERE base.version_id = :base_version_id
+    RETURNING profile.*
+""")
+
+
+class ProfileStore:
+    """Хранение профилей версий: полной копией или дельтами со снимками.
+
+    В режиме full каждая версия хранит все поля профиля (как раньше). В режиме
+    delta версия 1 и каждая snapshot_every-я после неё — полный снимок, остальные
+    хранят в Profile.delta только поля, изменившиеся относительно предыдущей
+    версии (поля SEARCH_FIELDS хранятся всегда). Профиль восстанавливается
+    от ближайшего снимка одним запросом;
+    восстановленные профили держатся в LRU процесса по (resume_id, version) —
+    профиль версии после создания не меняется, поэтому кэш не инвалидируется.
+
+    Записи с is_snapshot=True читаются одинаково в обоих режимах, так что режим
+    можно переключать без миграции данных.
+    """
+
+    def __init__(self, mode: str = STORAGE_FULL, snapshot_every: int = 10, cache_size: int = 1024):
+        if mode not in (STORAGE_FULL, STORAGE_DELTA):
+            raise ValueError(f"Unknown profile storage mode: {mode}")
+        self.mode = mode
+        self.snapshot_every = max(snapshot_every, 1)
+        self.cache_size = cache_size
+        self._cache: OrderedDict[tuple[int, int], dict] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fields_of(profile: Profile) -> dict:
+        return {field: getattr(profile, field) for field in PROFILE_FIELDS}
+
+    def is_snapshot_version(self, version: int) -> bool:
+        return self.mode == STORAGE_FULL or (version - 1) % self.snapshot_every == 0
+
+    def build(self, version: int, data: dict, base: dict | None = None) -> Profile:
+        """Строка профиля для новой версии; base — профиль предыдущей версии того же резюме."""
+        data = {field: data.get(field) for field in PROFILE_FIELDS}
+        if base is None or self.is_snapshot_version(version):
+            return Profile(**data, is_snapshot=True)
+
+        delta = {field: value for field, value in data.items() if value != base.get(field)}
+        return Profile(is_snapshot=False, delta=delta, **{field: data[field] for field in SEARCH_FIELDS})
+
+    def merges_on_server(self, session: AsyncSession, base: Profile | None) -> bool:
+        """Можно ли собрать полную копию профиля в БД (carry_forward): только Postgres, режим full
+        и базовый профиль — полный снимок.
+
+        Строка-дельта (осталась с тех пор, как хранилище работало в режиме delta) хранит
+        не все поля, и INSERT ... SELECT скопировал бы в новую версию пустые значения.
+        Такую базу нужно восстановить (materialize) и собрать профиль через build().
+        """
+        return (
+            self.mode == STORAGE_FULL
+            and base is not None
+            and base.is_snapshot
+            and session.bind.dialect.name == "postgresql"
+        )
+
+    @staticmethod
+    async def carry_forward(
+            session: AsyncSession, base_version_id: int, version_model: ResumeVersion, changes: dict
+    ) -> Profile:
+        """Создать профиль уже вставленной версии одним INSERT ... SELECT от профиля base_version_id."""
+        profile = await session.scalar(
+            select(Profile).from_statement(CARRY_FORWARD_SQL),
+            {"version_id": version_model.id, "base_version_id": base_version_id, "changes": json.dumps(changes)},
+        )
+        set_committed_value(version_model, "profile", profile)
+        return profile
+
+    async def materialize(self, session: AsyncSession, version_model: ResumeVersion) -> dict:
+        """Поля профиля версии. Профиль версии должен быть загружен (см. core.db.loading)."""
+        profile = version_model.profile
+        if profile is None:
+            return {}
+
+        key = (version_model.resume_id, version_model.version)
+        if profile.is_snapshot:
+            data = self.fields_of(profile)
+            if self.mode == STORAGE_DELTA:
+                self._put(key, data)
+            return data
+
+        cached = self._get(key)
+        if cached is None:
+            previous = self._cache.get((version_model.resume_id, version_model.version - 1))
+            if previous is not None:
+                cached = {**previous, **(profile.delta or {})}
+                self._put(key, cached)
+            else:
+                cached = await self._load_chain(session, *key)
+
+        self._hydrate(profile, cached)
+        return dict(cached)
+
+    async def materialize_all(self, session: AsyncSession, versions: Iterable[ResumeVersion]) -> None:
+        """Восстановить профили загруженных или только что сохранённых версий,
+        чтобы ответ API видел полные поля.
+
+        Версии идут по возрастанию номера, поэтому при загрузке всех версий (Loading.FULL)
+        и сразу после создания версии от текущей каждая дельта накладывается на уже
+        восстановленную предыдущую без запросов к БД.
+        """
+        if self.mode == STORAGE_FULL:
+            return
+        for version_model in sorted(versions, key=lambda item: (item.resume_id, item.version)):
+            await self.materialize(session, version_model)
+
+    async def _load_chain(self, session: AsyncSession, resume_id: int, version: int) -> dict:
+        snapshot_version = (
+            select(func.max(ResumeVersion.version))
+            .join(Profile, Profile.version_id == ResumeVersion.id)
+            .where(
+                ResumeVersion.resume_id == resume_id,
+                ResumeVersion.version <= version,
+                Profile.is_snapshot.is_(True),
+            )
+            .scalar_subquery()
+        )
+        rows = await session.execute(
+            select(ResumeVersion.version, Profile.is_snapshot, Profile.delta,
+                   *(getattr(Profile, field) for field in PROFILE_FIELDS))
+            .join(Profile, Profile.version_id == ResumeVersion.id)
+            .where(
+                ResumeVersion.resume_id == resume_id,
+                ResumeVersion.version <= version,
+                ResumeVersion.version >= snapshot_version,
+            )
+            .order_by(ResumeVersion.version)
+        )
+
+        data: dict = {}
+        for row in rows:
+            if row.is_snapshot:
+                data = {field: getattr(row, field) for field in PROFILE_FIELDS}
+            else:
+                data = {**data, **(row.delta or {})}
+            self._put((resume_id, row.version), data)
+        return data
+
+    @staticmethod
+    def _hydrate(profile: Profile | None, data: dict) -> None:
+        # Значения ставятся как уже сохранённые: сессия не считает профиль изменённым
+        if profile is None or profile.is_snapshot:
+            return
+        for field, value in data.items():
+            set_committed_value(profile, field, value)
+
+    def _get(self, key: tuple[int, int]) -> dict | None:
+        data = self._cache.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._cache.move_to_end(key)
+        return data
+
+    def _put(self, key: tuple[int, int], data: dict) -> None:
+        self._cache[key] = data
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self.hits = self.misses = 0
+
+
+profile_store = ProfileStore(
+    mode=os.getenv("PROFILE_STORAGE", STORAGE_FULL),
+    snapshot_every=int(os.getenv("PROFILE_SNAPSHOT_EVERY", 10)),
+    cache_size=int(os.getenv("PROFILE_CACHE_SIZE", 1024)),
+)
@@ -1,3 +1,6 @@
 from redis.asyncio import Redis
 
+from core.utils.metrics import instrument_redis
+
 redis_cache = Redis(host="redis", port=6379)
+instrument_redis(redis_cache)
@@ -0,0 +1,120 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+SUPPORTED_EXTENSIONS = {".pdf", ".docx"}
+
+
+class UnsupportedDocument(Exception):
+    pass
+
+
+# Функции ниже выполняются в дочерних процессах пула, поэтому они модульного уровня
+# (их можно передать через pickle) и импортируют тяжёлые библиотеки сами.
+
+def count_pdf_pages(path: str) -> int:
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_pdf_pages(path: str, start: int, stop: int) -> list[str]:
+    """Текст страниц [start, stop). Кэш каждой страницы сбрасывается сразу после разбора,
+    чтобы память процесса не росла с размером документа."""
+    import pdfplumber
+
+    texts = []
+    with pdfplumber.open(path, pages=list(range(start + 1, stop + 1))) as pdf:
+        for page in pdf.pages:
+            texts.append(page.extract_text(x_tolerance=1.5, y_tolerance=3) or "")
+            page.close()
+    return texts
+
+
+def extract_docx_text(path: str) -> list[str]:
+    """DOCX хранит документ одним XML без страниц, поэтому возвращается одной «страницей»."""
+    import docx
+
+    document = docx.Document(path)
+    lines = [paragraph.text for paragraph in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            cells = [cell.text.strip() for cell in row.cells if cell.text.strip()]
+            if cells:
+                lines.append(" | ".join(dict.fromkeys(cells)))
+    return ["\n".join(lines)]
+
+
+class DocumentExtractor:
+    """Извлечение текста из PDF/DOCX в пуле процессов.
+
+    pdfplumber разбирает страницы на чистом Python и надолго занимает CPU,
+    поэтому разбор вынесен из event loop в ProcessPoolExecutor. PDF режется на
+    пачки по batch_pages страниц, пачки разбираются параллельно, а страницы
+    отдаются по порядку по мере готовности — потребитель может начать
+    сегментацию до конца разбора всего документа.
+    """
+
+    def __init__(self, workers: Optional[int] = None, batch_pages: int = 4):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.batch_pages = batch_pages
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, func, *args):
+        executor = self.executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            # Упавший на файле дочерний процесс ломает весь пул — следующий разбор начнётся с нового
+            if self._executor is executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            raise
+
+    async def pages(self, path: str | Path) -> AsyncIterator[str]:
+        path = str(path)
+        extension = Path(path).suffix.lower()
+        if extension not in SUPPORTED_EXTENSIONS:
+            raise UnsupportedDocument(f"Unsupported document type: {extension or 'unknown'}")
+
+        if extension == ".docx":
+            for page in await self._run(extract_docx_text, path):
+                yield page
+            return
+
+        total = await self._run(count_pdf_pages, path)
+        batches = [
+            asyncio.ensure_future(self._run(extract_pdf_pages, path, start, min(start + self.batch_pages, total)))
+            for start in range(0, total, self.batch_pages)
+        ]
+        try:
+            for batch in batches:
+                for page in await batch:
+                    yield page
+        finally:
+            for batch in batches:
+                batch.cancel()
+
+    async def extract(self, path: str | Path) -> str:
+        return "\n".join([page async for page in self.pages(path)])
+
+
+document_extractor = DocumentExtractor(
+    workers=int(os.getenv("IMPORT_WORKERS", 0)) or None,
+    batch_pages=int(os.getenv("IMPORT_BATCH_PAGES", 4)),
+)
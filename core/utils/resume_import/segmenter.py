@@ -0,0 +1,256 @@
+import re
+from dataclasses import dataclass, field
+
+# Заголовки секций в резюме на русском и английском → поле профиля
+SECTION_HEADINGS = {
+    "summary": (
+        "о себе", "обо мне", "краткая информация", "профиль", "резюме", "цель",
+        "summary", "about me", "about", "profile", "objective",
+    ),
+    "experience": (
+        "опыт работы", "опыт", "профессиональный опыт", "места работы",
+        "experience", "work experience", "professional experience", "employment history", "employment",
+    ),
+    "education": (
+        "образование", "обучение", "education", "academic background",
+    ),
+    "skills": (
+        "навыки", "ключевые навыки", "профессиональные навыки", "технические навыки", "стек", "технологии",
+        "skills", "key skills", "technical skills", "tech stack", "technologies",
+    ),
+    "contacts": (
+        "контакты", "контактная информация", "contacts", "contact", "contact information",
+    ),
+    # Секции, для которых в профиле нет отдельного поля, — их разбирает агент
+    "extra": (
+        "проекты", "достижения", "языки", "иностранные языки", "курсы", "сертификаты", "публикации",
+        "дополнительно", "дополнительная информация", "хобби", "интересы",
+        "projects", "achievements", "languages", "courses", "certifications", "certificates",
+        "publications", "additional information", "interests", "hobbies",
+    ),
+}
+
+_HEADING_TO_FIELD = {heading: field_name for field_name, headings in SECTION_HEADINGS.items() for heading in headings}
+
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE = re.compile(r"(?<!\w)\+?\d[\d\s().-]{8,}\d")
+TELEGRAM = re.compile(r"(?:t\.me/|(?<![\w.])@)([A-Za-z][\w]{4,31})\b")
+URL = re.compile(r"(?:https?://)?(?:www\.)?((?:github\.com|linkedin\.com|gitlab\.com)/[\w./-]+)", re.IGNORECASE)
+
+_MONTH = r"(?:[A-Za-zА-Яа-яё]{3,9}\.?\s+)?"
+_YEAR = r"(?:19|20)\d{2}"
+_PRESENT = r"(?:настоящее время|наст\.? время|по настоящее время|сейчас|present|now|current)"
+PERIOD = re.compile(
+    rf"({_MONTH}{_YEAR}|\d{{2}}[./]{_YEAR})\s*(?:[-–—]|по|to)\s*({_MONTH}{_YEAR}|\d{{2}}[./]{_YEAR}|{_PRESENT})"
+    rf"|\b{_YEAR}\b",
+    re.IGNORECASE,
+)
+
+_BULLET = re.compile(r"^\s*[•·▪◦●\-–—*]\s*")
+_SKILL_SEPARATORS = re.compile(r"[,;•·▪|]|\s{2,}")
+
+
+@dataclass
+class SegmentedProfile:
+    fields: dict = field(default_factory=dict)
+    # Блоки текста, которые эвристики не смогли отнести ни к одному полю
+    unclassified: list[str] = field(default_factory=list)
+
+
+def _normalize_heading(line: str) -> str:
+    return re.sub(r"[\s:•\-–—]+$", "", line.strip()).strip().lower()
+
+
+def heading_field(line: str) -> str | None:
+    """Поле профиля, если строка похожа на заголовок секции.
+
+    Незнакомый короткий заголовок (из нескольких слов капсом или с двоеточием в конце) тоже
+    открывает новую секцию — "extra", чтобы её текст не приклеился к предыдущей.
+    """
+    if len(line) > 40:
+        return None
+    field_name = _HEADING_TO_FIELD.get(_normalize_heading(line))
+    if field_name:
+        return field_name
+    # Одно слово капсом чаще аббревиатура (МФТИ, IBM), чем заголовок
+    if not any(char.isdigit() for char in line) and (
+            line.rstrip().endswith(":") or (line.isupper() and len(line.split()) >= 2)
+    ):
+        return "extra"
+    return None
+
+
+def extract_contacts(text: str) -> dict:
+    contacts = {}
+    if email := EMAIL.search(text):
+        contacts["email"] = email.group(0)
+    if phone := PHONE.search(text):
+        contacts["phone"] = re.sub(r"\s+", " ", phone.group(0)).strip()
+    if telegram := TELEGRAM.search(EMAIL.sub("", text)):
+        contacts["telegram"] = f"@{telegram.group(1)}"
+    for url in URL.finditer(text):
+        domain = url.group(1).split(".", 1)[0].lower()
+        contacts.setdefault(domain, f"https://{url.group(1).rstrip('/.')}")
+    return contacts
+
+
+def _strip_contacts(line: str) -> str:
+    for pattern in (EMAIL, PHONE, URL, TELEGRAM):
+        line = pattern.sub("", line)
+    return line.strip(" |,;·•-–—\t")
+
+
+def _looks_like_name(line: str) -> bool:
+    words = line.split()
+    return (
+        2 <= len(words) <= 4
+        and not any(char.isdigit() for char in line)
+        and all(word[0].isupper() for word in words if word[0].isalpha())
+    )
+
+
+def parse_header(lines: list[str], fields: dict) -> list[str]:
+    """Имя и должность из шапки до первого заголовка. Возвращает нераспознанные строки."""
+    rest = []
+    for line in lines:
+        text = _strip_contacts(line)
+        if not text:
+            continue
+        if "name" not in fields and _looks_like_name(text):
+            fields["name"] = text
+        elif "name" in fields and "position" not in fields and len(text) <= 60:
+            fields["position"] = text
+        else:
+            rest.append(line)
+    return rest
+
+
+def parse_skills(lines: list[str]) -> list[str]:
+    skills = []
+    for line in lines:
+        line = _BULLET.sub("", line)
+        if ":" in line and len(line.split(":", 1)[0]) <= 30:
+            # "Языки: Python, Go" — категория перед двоеточием не является навыком
+            line = line.split(":", 1)[1]
+        skills.extend(part.strip(" .") for part in _SKILL_SEPARATORS.split(line) if part.strip(" ."))
+    return list(dict.fromkeys(skills))
+
+
+def _find_period(line: str) -> re.Match | None:
+    period = PERIOD.search(line)
+    # Одиночный год в длинной строке скорее часть описания ("перевёл сервис на Python 3 в 2021")
+    if period and period.group(1) is None and len(line) > 60:
+        return None
+    return period
+
+
+def _split_entries(lines: list[str]) -> list[tuple[str, list[str]]]:
+    """Разбить секцию на записи по строкам с периодом: [(период, строки записи), ...].
+
+    Строки без маркера списка, идущие после описания предыдущей записи
+    (или до первого периода), считаются заголовком следующей записи.
+    """
+    entries: list[tuple[str, list[str]]] = []
+    described = False
+    pending: list[str] = []
+    for line in lines:
+        period = _find_period(line)
+        if period:
+            rest = (line[:period.start()] + line[period.end():]).strip(" ,|·—–-")
+            entries.append((period.group(0).strip(), [*pending, *([rest] if rest else [])]))
+            pending, described = [], False
+        elif not entries or (described and not _BULLET.match(line)):
+            pending.append(line)
+        else:
+            entries[-1][1].append(line)
+            described = described or bool(_BULLET.match(line))
+
+    if pending and entries:
+        entries[-1][1].extend(pending)
+    return entries
+
+
+def parse_experience(lines: list[str]) -> list[dict]:
+    experience = []
+    for period, entry_lines in _split_entries(lines):
+        titles = [line for line in entry_lines if not _BULLET.match(line)][:2]
+        if len(titles) == 1 and re.search(r"\s[—–]\s|,\s", titles[0]):
+            # "Senior Developer — Yandex" в одной строке
+            titles = [part.strip() for part in re.split(r"\s[—–]\s|,\s", titles[0], maxsplit=1)]
+            entry_lines = entry_lines[1:]
+        description = [_BULLET.sub("", line) for line in entry_lines if line not in titles]
+        experience.append({
+            "position": titles[0] if titles else "",
+            "company": titles[1] if len(titles) > 1 else "",
+            "period": period,
+            "description": " ".join(description).strip(),
+        })
+    return experience
+
+
+def parse_education(lines: list[str]) -> list[dict]:
+    education = []
+    for period, entry_lines in _split_entries(lines):
+        education.append({
+            "institution": entry_lines[0] if entry_lines else "",
+            "degree": " ".join(entry_lines[1:]).strip(),
+            "period": period,
+        })
+    return education
+
+
+def segment(text: str) -> SegmentedProfile:
+    """Разбить текст резюме на поля профиля по заголовкам секций и регуляркам.
+
+    Контакты ищутся по всему тексту, имя и должность — в шапке до первого
+    заголовка. Секции без распознанного заголовка и секции, из которых не
+    удалось достать ни одной записи, попадают в unclassified для агента.
+    """
+    result = SegmentedProfile()
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+
+    contacts = extract_contacts(text)
+    if contacts:
+        result.fields["contacts"] = contacts
+
+    sections: list[tuple[str | None, list[str]]] = [(None, [])]
+    for line in lines:
+        field_name = heading_field(line)
+        if field_name == "extra":
+            # Заголовок незнакомой секции передаём агенту вместе с её текстом
+            sections.append((field_name, [line]))
+        elif field_name:
+            sections.append((field_name, []))
+        else:
+            sections[-1][1].append(line)
+
+    header_rest = parse_header(sections[0][1], result.fields)
+    if header_rest:
+        result.unclassified.append("\n".join(header_rest))
+
+    for field_name, section_lines in sections[1:]:
+        if not section_lines:
+            continue
+        block = "\n".join(section_lines)
+
+        # Контакты уже найдены регулярками по всему тексту
+        if field_name == "extra":
+            result.unclassified.append(block)
+        elif field_name == "summary":
+            result.fields["summary"] = " ".join(filter(None, [result.fields.get("summary"), *section_lines]))
+        elif field_name == "skills":
+            result.fields.setdefault("skills", []).extend(parse_skills(section_lines))
+        elif field_name == "experience":
+            entries = parse_experience(section_lines)
+            if entries:
+                result.fields.setdefault("experience", []).extend(entries)
+            else:
+                result.unclassified.append(f"Опыт работы:\n{block}")
+        elif field_name == "education":
+            entries = parse_education(section_lines)
+            if entries:
+                result.fields.setdefault("education", []).extend(entries)
+            else:
+                result.unclassified.append(f"Образование:\n{block}")
+
+    return result
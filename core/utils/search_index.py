@@ -0,0 +1,85 @@
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str | None) -> list[str]:
+    return TOKEN.findall(text.lower()) if text else []
+
+
+@dataclass
+class SearchDocument:
+    resume_id: int
+    position: str | None
+    skills: list[str] = field(default_factory=list)
+    tokens: frozenset[str] = frozenset()
+
+
+class InvertedIndex:
+    """Инвертированный индекс по должности и навыкам текущей версии резюме.
+
+    Запасной вариант поиска без Postgres (sqlite в разработке и проверках): строится
+    из БД при первом поиске и дальше обновляется сервисом резюме при создании
+    версий. Ранжирование — доля слов запроса, найденных в документе; фильтр по
+    навыкам, как и jsonb @>, требует точного совпадения каждого навыка.
+    """
+
+    def __init__(self):
+        self.postings: dict[str, set[int]] = defaultdict(set)
+        self.documents: dict[int, SearchDocument] = {}
+        self.loaded = False
+
+    def add(self, resume_id: int, position: str | None, skills: list[str] | None) -> None:
+        self.remove(resume_id)
+        skills = list(skills or [])
+        tokens = frozenset(tokenize(position) + [token for skill in skills for token in tokenize(skill)])
+        self.documents[resume_id] = SearchDocument(resume_id, position, skills, tokens)
+        for token in tokens:
+            self.postings[token].add(resume_id)
+
+    def remove(self, resume_id: int) -> None:
+        document = self.documents.pop(resume_id, None)
+        if document is None:
+            return
+        for token in document.tokens:
+            self.postings[token].discard(resume_id)
+            if not self.postings[token]:
+                del self.postings[token]
+
+    def search(
+            self,
+            query: str | None = None,
+            skills: list[str] | None = None,
+            limit: int = 50,
+            after: tuple[float, int] | None = None,
+    ) -> list[tuple[float, SearchDocument]]:
+        """До limit документов по убыванию (rank, resume_id), строго после курсора after."""
+        query_tokens = set(tokenize(query))
+        if query_tokens:
+            candidates = set().union(*(self.postings.get(token, set()) for token in query_tokens))
+        else:
+            candidates = set(self.documents)
+
+        required = set(skills or [])
+        hits = []
+        for resume_id in candidates:
+            document = self.documents[resume_id]
+            if required and not required.issubset(document.skills):
+                continue
+            rank = len(query_tokens & document.tokens) / len(query_tokens) if query_tokens else 0.0
+            if after is not None and (rank, resume_id) >= after:
+                continue
+            hits.append((rank, document))
+
+        hits.sort(key=lambda hit: (hit[0], hit[1].resume_id), reverse=True)
+        return hits[:limit]
+
+    def clear(self) -> None:
+        self.postings.clear()
+        self.documents.clear()
+        self.loaded = False
+
+
+search_index = InvertedIndex()
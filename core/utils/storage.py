@@ -0,0 +1,248 @@
+import asyncio
+import os
+import shutil
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import AsyncIterator, Optional, Union
+from uuid import uuid4
+
+from core.utils.metrics import track
+
+RESUME_FILES_DIR = Path(__file__).parent.parent.parent / "resume_files"
+CHUNK_SIZE = 64 * 1024
+
+
+class InvalidStorageKey(ValueError):
+    """Ключ указывает за пределы хранилища."""
+
+
+class StorageBackend(ABC):
+    """Асинхронное хранилище файлов резюме: HTML версий, PDF и PNG.
+
+    Файлы адресуются ключами вида "<user_id>/resume_<id>/html/<name>.html" —
+    именно они лежат в ResumeVersion.path_to_*, поэтому записи не зависят от
+    каталога, в котором запущен конкретный контейнер.
+    """
+
+    @abstractmethod
+    async def write(self, key: str, data: bytes) -> None:
+        """Записать файл целиком; читатели видят либо старое содержимое, либо новое."""
+
+    @abstractmethod
+    async def read(self, key: str) -> Optional[bytes]:
+        """Прочитать файл целиком или вернуть None, если его нет."""
+
+    @abstractmethod
+    def stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Читать файл кусками (для отдачи клиенту); FileNotFoundError, если его нет."""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Есть ли файл с таким ключом."""
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str) -> None:
+        """Удалить все файлы, ключи которых начинаются с prefix."""
+
+    async def read_text(self, key: str) -> Optional[str]:
+        data = await self.read(key)
+        return data.decode("utf-8") if data is not None else None
+
+    async def write_text(self, key: str, text: str) -> None:
+        await self.write(key, text.encode("utf-8"))
+
+    async def close(self) -> None:
+        """Освободить ресурсы (пул потоков, соединения)."""
+
+
+class LocalStorage(StorageBackend):
+    """Файлы на локальном диске (или общем томе) в каталоге root.
+
+    Блокирующие вызовы файловой системы выполняются в отдельном пуле потоков,
+    запись идёт во временный файл с последующим os.replace. Абсолютные пути,
+    сохранённые в path_to_* до появления хранилища, читаются, если лежат внутри root.
+    Ключ, который после нормализации (.., абсолютный путь) указывает за пределы
+    root, отклоняется с InvalidStorageKey.
+    """
+
+    def __init__(self, root: Union[str, Path] = RESUME_FILES_DIR, max_workers: int = 8):
+        self.root = Path(os.path.abspath(root))
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _path(self, key: str) -> Path:
+        # abspath нормализует .. без обращения к диску; абсолютный key заменяет root целиком
+        path = Path(os.path.abspath(self.root / key))
+        if self.root not in path.parents:
+            raise InvalidStorageKey(f"Storage key {key!r} points outside of {self.root}")
+        return path
+
+    async def _run(self, func, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="storage")
+        with track("file"):
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _write_sync(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def _read_sync(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    async def write(self, key: str, data: bytes) -> None:
+        await self._run(self._write_sync, key, data)
+
+    async def read(self, key: str) -> Optional[bytes]:
+        return await self._run(self._read_sync, key)
+
+    async def stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        file = await self._run(open, self._path(key), "rb")
+        try:
+            while chunk := await self._run(file.read, chunk_size):
+                yield chunk
+        finally:
+            await self._run(file.close)
+
+    async def exists(self, key: str) -> bool:
+        return await self._run(self._path(key).is_file)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        path = self._path(prefix)
+        if prefix.endswith("/"):
+            await self._run(lambda: shutil.rmtree(path, ignore_errors=True))
+        else:
+            await self._run(lambda: path.unlink(missing_ok=True))
+
+    async def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+class S3Storage(StorageBackend):
+    """S3-совместимое хранилище (AWS S3, MinIO, moto) через aiobotocore.
+
+    Нужен пакет aiobotocore (extra "s3"); учётные данные берутся из стандартных
+    переменных окружения AWS_*. Клиент создаётся при первом обращении и живёт до close().
+    """
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None, region: Optional[str] = None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.endpoint_url = endpoint_url
+        self.region = region
+        self._client = None
+        self._exit_stack: Optional[AsyncExitStack] = None
+        self._lock = asyncio.Lock()
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key.lstrip('/')}"
+
+    async def _get_client(self):
+        if self._client is not None:
+            return self._client
+        async with self._lock:
+            if self._client is None:
+                from aiobotocore.session import get_session
+
+                self._exit_stack = AsyncExitStack()
+                self._client = await self._exit_stack.enter_async_context(
+                    get_session().create_client("s3", endpoint_url=self.endpoint_url, region_name=self.region)
+                )
+        return self._client
+
+    @staticmethod
+    def _is_missing(error: Exception) -> bool:
+        code = getattr(error, "response", {}).get("Error", {}).get("Code")
+        return code in ("NoSuchKey", "404", "NotFound")
+
+    async def write(self, key: str, data: bytes) -> None:
+        client = await self._get_client()
+        # PUT в S3 атомарен: объект появляется только целиком
+        with track("file"):
+            await client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+
+    async def read(self, key: str) -> Optional[bytes]:
+        chunks = []
+        try:
+            async for chunk in self.stream(key):
+                chunks.append(chunk)
+        except FileNotFoundError:
+            return None
+        return b"".join(chunks)
+
+    async def stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        client = await self._get_client()
+        try:
+            with track("file"):
+                response = await client.get_object(Bucket=self.bucket, Key=self._key(key))
+        except Exception as e:
+            if self._is_missing(e):
+                raise FileNotFoundError(key) from e
+            raise
+
+        body = response["Body"]
+        try:
+            while chunk := await body.read(chunk_size):
+                yield chunk
+        finally:
+            body.close()
+
+    async def exists(self, key: str) -> bool:
+        client = await self._get_client()
+        try:
+            with track("file"):
+                await client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except Exception as e:
+            if self._is_missing(e):
+                return False
+            raise
+        return True
+
+    async def delete_prefix(self, prefix: str) -> None:
+        client = await self._get_client()
+        paginator = client.get_paginator("list_objects_v2")
+        async for page in paginator.paginate(Bucket=self.bucket, Prefix=self._key(prefix)):
+            objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+            if objects:
+                with track("file"):
+                    await client.delete_objects(Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True})
+
+    async def close(self) -> None:
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+            self._exit_stack = None
+            self._client = None
+
+
+def build_storage(backend: str | None = None) -> StorageBackend:
+    backend = backend or os.getenv("STORAGE_BACKEND", "local")
+    if backend == "s3":
+        return S3Storage(
+            bucket=os.environ["S3_BUCKET"],
+            prefix=os.getenv("S3_PREFIX", ""),
+            endpoint_url=os.getenv("S3_ENDPOINT_URL"),
+            region=os.getenv("S3_REGION"),
+        )
+    return LocalStorage(
+        root=os.getenv("STORAGE_ROOT", RESUME_FILES_DIR),
+        max_workers=int(os.getenv("STORAGE_THREADS", 8)),
+    )
+
+
+storage = build_storage()
@@ -0,0 +1,60 @@
+from pathlib import Path
+from typing import Union
+
+from jinja2 import Environment, FileSystemLoader, TemplateNotFound, select_autoescape
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "templates" / "resume"
+TEMPLATE_SUFFIX = ".html.j2"
+
+
+class ResumeTemplateNotFound(Exception):
+    pass
+
+
+class TemplateRenderer:
+    """Рендер резюме из профиля по готовым Jinja2-шаблонам.
+
+    Все шаблоны компилируются один раз при старте (precompile) и дальше
+    берутся из кэша Environment без проверки файлов на диске, так что
+    рендер стоит миллисекунды. Файлы с префиксом "_" — служебные
+    (базовый шаблон, макросы) и пользователю не показываются.
+    """
+
+    def __init__(self, templates_dir: Union[str, Path] = TEMPLATES_DIR, auto_reload: bool = False):
+        self.templates_dir = Path(templates_dir)
+        self.env = Environment(
+            loader=FileSystemLoader(self.templates_dir),
+            autoescape=select_autoescape(default=True),
+            auto_reload=auto_reload,
+            cache_size=-1,
+            trim_blocks=True,
+            lstrip_blocks=True,
+        )
+        self.names = self._discover()
+
+    def _discover(self) -> list[str]:
+        return sorted(
+            path.name.removesuffix(TEMPLATE_SUFFIX)
+            for path in self.templates_dir.glob(f"*{TEMPLATE_SUFFIX}")
+            if not path.name.startswith("_")
+        )
+
+    def available(self) -> list[str]:
+        return list(self.names)
+
+    def precompile(self) -> None:
+        self.names = self._discover()
+        for name in self.names:
+            self.env.get_template(f"{name}{TEMPLATE_SUFFIX}")
+
+    def render(self, name: str, profile: dict) -> str:
+        if name not in self.names:
+            raise ResumeTemplateNotFound(name)
+        try:
+            template = self.env.get_template(f"{name}{TEMPLATE_SUFFIX}")
+        except TemplateNotFound as e:
+            raise ResumeTemplateNotFound(name) from e
+        return template.render(profile=profile)
+
+
+template_renderer = TemplateRenderer()
@@ -0,0 +1,64 @@
+"""Микробенчмарк накладных расходов на подготовку агента на один запрос.
+
+before — как было: новый ResumeServiceAgent на запрос, load_dotenv, чтение
+файла инструкций и сборка Agent для каждой модели из списка fallback.
+after — общий AgentRegistry: инструкции и агенты берутся из памяти процесса.
+
+    python -m scripts.bench_agent_registry --iterations 2000
+"""
+import argparse
+import time
+
+from agents import Agent, ModelSettings
+from dotenv import load_dotenv
+
+from core.utils.agents.agent_registry import AgentRegistry
+from core.utils.agents.gpt_agent import DEFAULT_MODELS, INSTRUCTIONS_DIR
+
+
+def before() -> None:
+    load_dotenv()
+    for model in DEFAULT_MODELS:
+        with open(INSTRUCTIONS_DIR / "resume_creator_agent_instructions.txt", "r", encoding="utf-8") as file:
+            instructions = file.read()
+        Agent(
+            name="Resume Creator",
+            instructions=instructions,
+            model=model,
+            model_settings=ModelSettings(max_tokens=8192, store=True),
+        )
+
+
+def after(registry: AgentRegistry) -> None:
+    registry.instructions_for("Resume Creator")
+    for model in DEFAULT_MODELS:
+        registry.get("Resume Creator", model)
+
+
+def measure(label: str, func, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    per_call = (time.perf_counter() - started) / iterations * 1_000_000
+    print(f"{label:<28} {per_call:10.1f} µs/request")
+    return per_call
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    registry = AgentRegistry(INSTRUCTIONS_DIR)
+    registry.warm_up(DEFAULT_MODELS)
+    reloading_registry = AgentRegistry(INSTRUCTIONS_DIR, hot_reload=True)
+    reloading_registry.warm_up(DEFAULT_MODELS)
+
+    old = measure("before (per-request build)", before, args.iterations)
+    new = measure("after (registry)", lambda: after(registry), args.iterations)
+    measure("after (registry, hot reload)", lambda: after(reloading_registry), args.iterations)
+    print(f"speedup: {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
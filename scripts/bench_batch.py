@@ -0,0 +1,146 @@
+"""Бенчмарк пакетного создания резюме (POST /api/v1/resume/batch/).
+
+Приём: --resumes резюме создаются по одному через ResumeService.create и одной
+пачкой через ResumeService.create_batch — сравниваются время и число SQL-запросов.
+Генерация: те же задачи выполняет JobWorkerPool с --workers воркерами, вместо
+LLM — задержка --latency секунд через ModelRouter с лимитами --rpm и
+--max-concurrency на модель; печатается пропускная способность в резюме в минуту
+для одного воркера и для пула.
+
+Нужны БД из DB_URL и очередь из JOB_QUEUE_BACKEND; созданные резюме удаляются.
+
+    python -m scripts.bench_batch --resumes 200 --workers 16 --latency 2 --rpm 300
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core import User
+from core.db.db import engine
+from core.schemas.job_schema import GenerationJob, JobAction
+from core.schemas.resume_schema import ResumeCreate
+from core.services.resume_service import ResumeService
+from core.utils.agents.gpt_agent import DEFAULT_MODELS
+from core.utils.agents.model_router import ModelRouter
+from core.utils.agents.rate_limiter import build_limiters
+from core.utils.jobs.job_queue import InMemoryJobQueue
+from core.utils.jobs.worker import JobWorkerPool
+
+
+def payloads(user_id: int, count: int) -> list[ResumeCreate]:
+    return [
+        ResumeCreate(
+            title=f"bench batch {index}",
+            user_id=user_id,
+            name=f"Candidate {index}",
+            position="Python Developer",
+            skills=["Python", "FastAPI", "PostgreSQL"],
+        )
+        for index in range(count)
+    ]
+
+
+async def ingest(user_id: int, count: int) -> None:
+    statements = []
+
+    def count_statement(*_) -> None:
+        statements.append(1)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        print(f"{'ingest':<10} {'total, ms':>10} {'per resume, ms':>15} {'queries':>8}")
+
+        statements.clear()
+        started = time.perf_counter()
+        for data in payloads(user_id, count):
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                await ResumeService.create(data=data, session=session)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{'single':<10} {elapsed:10.1f} {elapsed / count:15.2f} {len(statements):8d}")
+
+        statements.clear()
+        started = time.perf_counter()
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            await ResumeService.create_batch(items=payloads(user_id, count), session=session)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{'batch':<10} {elapsed:10.1f} {elapsed / count:15.2f} {len(statements):8d}")
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+
+
+async def throughput(count: int, workers: int, latency: float, rpm: float | None, max_concurrency: int | None) -> float:
+    router = ModelRouter(
+        DEFAULT_MODELS,
+        limiters=build_limiters(
+            DEFAULT_MODELS,
+            rpm={"*": rpm} if rpm else {},
+            max_concurrency={"*": max_concurrency} if max_concurrency else {},
+        ),
+    )
+
+    finished = asyncio.Event()
+    done = 0
+
+    async def generate(job: GenerationJob) -> None:
+        nonlocal done
+
+        async def call(model: str) -> str:
+            await asyncio.sleep(latency * random.uniform(0.8, 1.2))
+            return model
+
+        await router.run(call)
+        done += 1
+        if done == count:
+            finished.set()
+
+    queue = InMemoryJobQueue()
+    await queue.enqueue_many([
+        GenerationJob(action=JobAction.CREATE_RESUME, user_id=0, resume_id=index, version_id=index, version=1)
+        for index in range(count)
+    ])
+    pool = JobWorkerPool(queue=queue, handler=generate, concurrency=workers)
+
+    started = time.perf_counter()
+    await pool.start()
+    await finished.wait()
+    elapsed = time.perf_counter() - started
+    await pool.stop()
+    return count / elapsed * 60
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=2.0, help="имитация времени ответа модели, с")
+    parser.add_argument("--rpm", type=float, default=None, help="лимит вызовов в минуту на модель")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="одновременных вызовов на модель")
+    args = parser.parse_args()
+
+    engine.echo = False
+    # telegram_id в БД — Integer, id должен помещаться в int32
+    user_id = random.randint(2_000_000_000, 2_147_000_000)
+    async with AsyncSession(engine) as session:
+        session.add(User(telegram_id=user_id, name="bench batch", resumes=[]))
+        await session.commit()
+
+    try:
+        await ingest(user_id, args.resumes)
+    finally:
+        async with AsyncSession(engine) as session:
+            await session.delete(await session.get(User, user_id))
+            await session.commit()
+        await engine.dispose()
+
+    print(f"\n{'generation':<10} {'workers':>8} {'resumes/min':>12}")
+    for workers in (1, args.workers):
+        per_minute = await throughput(args.resumes, workers, args.latency, args.rpm, args.max_concurrency)
+        print(f"{'simulated':<10} {workers:8d} {per_minute:12.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
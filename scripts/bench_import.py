@@ -0,0 +1,149 @@
+"""Бенчмарк извлечения текста из PDF при импорте резюме.
+
+before — как было бы без пула: pdfplumber в основном процессе, документ
+целиком, страницы не освобождаются до закрытия файла.
+after — DocumentExtractor: пачки страниц в ProcessPoolExecutor.
+
+Считает страницы в секунду и пиковый RSS основного процесса и дочерних.
+Без --corpus генерирует синтетический корпус резюме.
+
+    python -m scripts.bench_import --corpus ./samples --workers 4
+    python -m scripts.bench_import --documents 40 --pages 6
+"""
+import argparse
+import asyncio
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pdfplumber
+
+from core.utils.resume_import.extractor import DocumentExtractor
+from core.utils.resume_import.segmenter import segment
+
+SAMPLE_LINES = [
+    "Ivan Petrov",
+    "Python Backend Developer",
+    "ivan.petrov@example.com | +7 999 123 45 67 | github.com/ivanp",
+    "WORK EXPERIENCE",
+    "Senior Developer, Acme",
+    "Jan 2020 - Present",
+    "- Designed and maintained high-load REST APIs on FastAPI and PostgreSQL",
+    "- Reduced p95 latency of the billing service by 40 percent",
+    "Middle Developer, Initech",
+    "2017 - 2020",
+    "- Built ETL pipelines and internal tooling",
+    "EDUCATION",
+    "Moscow Institute of Physics and Technology",
+    "BSc Applied Mathematics",
+    "2013 - 2017",
+    "SKILLS",
+    "Python, FastAPI, SQLAlchemy, PostgreSQL, Redis, Docker, Kubernetes",
+]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_sample_pdf(path: Path, pages: int) -> None:
+    """Минимальный PDF с текстом на каждой странице, без сторонних библиотек."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in range(pages):
+        lines = [f"BT /F1 11 Tf 50 {800 - index * 40} Td ({_escape(line)}) Tj ET"
+                 for index, line in enumerate(SAMPLE_LINES)]
+        stream = "\n".join(lines).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(output))
+
+
+def peak_rss_mb(who: int) -> float:
+    # На Linux ru_maxrss в килобайтах, на macOS — в байтах
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(who).ru_maxrss / scale
+
+
+def before(paths: list[Path]) -> int:
+    pages = 0
+    for path in paths:
+        with pdfplumber.open(path) as pdf:
+            text = "\n".join(page.extract_text() or "" for page in pdf.pages)
+            pages += len(pdf.pages)
+        segment(text)
+    return pages
+
+
+async def after(paths: list[Path], extractor: DocumentExtractor) -> int:
+    async def parse(path: Path) -> int:
+        pages = [page async for page in extractor.pages(path)]
+        segment("\n".join(pages))
+        return len(pages)
+
+    return sum(await asyncio.gather(*(parse(path) for path in paths)))
+
+
+def report(label: str, pages: int, elapsed: float) -> float:
+    rate = pages / elapsed
+    print(f"{label:<24} {pages:6d} pages {elapsed:8.2f} s {rate:10.1f} pages/s")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", type=Path, help="папка с PDF; без неё генерируется синтетический корпус")
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-pages", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.corpus:
+            paths = sorted(args.corpus.glob("*.pdf"))
+        else:
+            paths = [Path(tmp_dir) / f"resume_{index}.pdf" for index in range(args.documents)]
+            for path in paths:
+                write_sample_pdf(path, args.pages)
+        if not paths:
+            parser.error("corpus has no PDF files")
+
+        started = time.perf_counter()
+        pages = before(paths)
+        old = report("before (in-process)", pages, time.perf_counter() - started)
+        print(f"  peak RSS main: {peak_rss_mb(resource.RUSAGE_SELF):.1f} MB")
+
+        extractor = DocumentExtractor(workers=args.workers, batch_pages=args.batch_pages)
+        # Первый запуск поднимает процессы пула — в проде это происходит один раз при старте
+        asyncio.run(after(paths[:1], extractor))
+
+        started = time.perf_counter()
+        pages = asyncio.run(after(paths, extractor))
+        new = report(f"after ({extractor.workers} processes)", pages, time.perf_counter() - started)
+        extractor.shutdown()
+        print(f"  peak RSS children: {peak_rss_mb(resource.RUSAGE_CHILDREN):.1f} MB")
+        print(f"speedup: {new / old:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Бенчмарк профилей загрузки (core.db.loading) на эндпоинтах чтения.
+
+Создаёт пользователя с --resumes резюме по --versions версий в каждом и для
+GET /api/v1/resume/get/{id}/ и GET /api/v1/users/get/{id}/ с каждым профилем
+меряет медианную задержку, число SQL-запросов, размер ответа и пиковую
+память процесса на запрос (tracemalloc). Нужна БД из DB_URL.
+
+    python -m scripts.bench_loading --resumes 20 --versions 50
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import tracemalloc
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.main import app
+from core import Profile, Resume, ResumeVersion, User
+from core.db.db import engine
+from core.db.loading import Loading
+from core.db.query_counter import count_queries, install
+from core.models.resume_version import ResumeVersionStatus
+
+REPEATS = 20
+EXPERIENCE = [
+    {"company": f"Company {index}", "role": "Developer", "period": "2020 - 2024",
+     "description": "Designed and maintained high-load REST APIs. " * 5}
+    for index in range(5)
+]
+
+
+async def seed(telegram_id: int, resumes: int, versions: int) -> int:
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        user = User(telegram_id=telegram_id, name="bench loading", resumes=[])
+        for index in range(resumes):
+            resume_versions = [
+                ResumeVersion(
+                    version=number,
+                    status=ResumeVersionStatus.READY,
+                    profile=Profile(name="Ivan Petrov", position="Developer", skills=["Python"] * 10,
+                                    summary="Backend developer. " * 20, experience=EXPERIENCE),
+                )
+                for number in range(1, versions + 1)
+            ]
+            user.resumes.append(Resume(
+                title=f"Resume {index}", versions=resume_versions, current_version=resume_versions[-1]
+            ))
+        session.add(user)
+        await session.commit()
+        return user.resumes[0].id
+
+
+async def measure(client: AsyncClient, url: str, loading: Loading) -> tuple[float, int, int, float]:
+    latencies = []
+    for _ in range(REPEATS):
+        with count_queries() as counter:
+            tracemalloc.start()
+            started = time.perf_counter()
+            response = await client.get(url, params={"loading": loading.value})
+            latencies.append(time.perf_counter() - started)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        response.raise_for_status()
+    return statistics.median(latencies) * 1000, counter.count, len(response.content), peak / 1024
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=20)
+    parser.add_argument("--versions", type=int, default=50)
+    args = parser.parse_args()
+
+    install(engine)
+    engine.echo = False
+    # telegram_id в БД — Integer, id должен помещаться в int32
+    telegram_id = random.randint(2_000_000_000, 2_147_000_000)
+    resume_id = await seed(telegram_id, args.resumes, args.versions)
+
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            print(f"{'endpoint':<22} {'loading':<20} {'ms':>8} {'queries':>8} {'KiB body':>9} {'KiB peak':>9}")
+            for name, url in (
+                    ("GET /resume/get/{id}/", f"/api/v1/resume/get/{resume_id}/"),
+                    ("GET /users/get/{id}/", f"/api/v1/users/get/{telegram_id}/"),
+            ):
+                for loading in Loading:
+                    latency, queries, size, peak = await measure(client, url, loading)
+                    print(f"{name:<22} {loading.value:<20} {latency:8.2f} {queries:8d} {size / 1024:9.1f} {peak:9.1f}")
+    finally:
+        async with AsyncSession(engine) as session:
+            user = await session.get(User, telegram_id)
+            await session.delete(user)
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
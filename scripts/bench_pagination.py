@@ -0,0 +1,80 @@
+"""Бенчмарк постраничного списка пользователей: keyset против OFFSET.
+
+Вставляет --users пользователей (по умолчанию 100 000) с id из отдельного
+диапазона, меряет время получения первой, средней и последней страницы
+обоими способами и удаляет тестовые строки. Нужна БД из DB_URL.
+
+    python -m scripts.bench_pagination --users 100000 --limit 50
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
+
+from core.db.db import engine
+from core.models.user import User
+
+# telegram_id — Integer: берём верх диапазона int32, где реальных пользователей нет
+FIRST_ID = 2_100_000_000
+INSERT_BATCH = 5_000
+REPEATS = 5
+
+
+def base_query(limit: int):
+    return (
+        select(User)
+        .options(raiseload(User.resumes))
+        .where(User.telegram_id >= FIRST_ID)
+        .order_by(User.telegram_id)
+        .limit(limit)
+    )
+
+
+async def timed(session: AsyncSession, query) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        (await session.scalars(query)).all()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    engine.echo = False
+    ids = range(FIRST_ID, FIRST_ID + args.users)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        for start in range(0, args.users, INSERT_BATCH):
+            await session.execute(insert(User), [
+                {"telegram_id": telegram_id, "name": f"bench {telegram_id}"}
+                for telegram_id in ids[start:start + INSERT_BATCH]
+            ])
+        await session.commit()
+
+        try:
+            print(f"{'page':<8} {'offset, ms':>12} {'keyset, ms':>12}")
+            for label, position in (("first", 0), ("middle", args.users // 2), ("last", args.users - args.limit)):
+                offset_ms = await timed(session, base_query(args.limit).offset(position))
+                keyset = base_query(args.limit)
+                if position:
+                    # Курсор страницы — id последней строки предыдущей страницы
+                    keyset = keyset.where(User.telegram_id > ids[position - 1])
+                keyset_ms = await timed(session, keyset)
+                print(f"{label:<8} {offset_ms:12.2f} {keyset_ms:12.2f}")
+        finally:
+            await session.execute(delete(User).where(User.telegram_id >= FIRST_ID, User.telegram_id < ids.stop))
+            await session.commit()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
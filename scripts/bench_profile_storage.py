@@ -0,0 +1,140 @@
+"""Бенчмарк хранения профилей: полные копии против дельт со снимками.
+
+Для каждого режима создаёт --resumes резюме по --versions версий, где каждая
+правка меняет одно поле (как правка через PATCH /resume/update/), и сравнивает:
+размер строк profile (pg_column_size на Postgres, иначе длина JSON строки) и
+задержку чтения профиля последней версии — с холодным и с прогретым LRU.
+Нужна БД из DB_URL; созданные резюме удаляются.
+
+    python -m scripts.bench_profile_storage --resumes 50 --versions 40 --snapshot-every 10
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from core import Profile, Resume, ResumeVersion, User
+from core.db.db import engine
+from core.models.resume_version import ResumeVersionStatus
+from core.utils.profile_store import PROFILE_FIELDS, STORAGE_DELTA, STORAGE_FULL, ProfileStore
+
+BASE_PROFILE = {
+    "name": "Ivan Petrov",
+    "position": "Python Backend Developer",
+    "contacts": {"email": "ivan.petrov@example.com", "telegram": "@ivanp"},
+    "summary": "Backend developer with 7 years of experience in high-load services. " * 3,
+    "skills": ["Python", "FastAPI", "SQLAlchemy", "PostgreSQL", "Redis", "Docker", "Kubernetes"],
+    "experience": [
+        {"company": f"Company {index}", "role": "Senior Developer", "period": "2018 - 2024",
+         "description": "Designed and maintained REST APIs, reduced p95 latency by 40 percent. " * 4}
+        for index in range(4)
+    ],
+    "education": [{"institution": "Moscow Institute of Physics and Technology", "degree": "BSc", "year": "2017"}],
+}
+
+
+def edit(number: int) -> dict:
+    if number % 3 == 0:
+        return {"summary": f"{BASE_PROFILE['summary']} Revision {number}."}
+    if number % 3 == 1:
+        return {"skills": [*BASE_PROFILE["skills"], f"Skill {number}"]}
+    return {"position": f"Python Backend Developer ({number})"}
+
+
+async def seed(session: AsyncSession, user_id: int, store: ProfileStore, resumes: int, versions: int) -> list[int]:
+    resume_ids = []
+    for index in range(resumes):
+        resume = Resume(title=f"{store.mode} {index}", user_id=user_id, versions=[])
+        data, previous = dict(BASE_PROFILE), None
+        for number in range(1, versions + 1):
+            if number > 1:
+                data = {**data, **edit(number)}
+            version_model = ResumeVersion(
+                version=number, status=ResumeVersionStatus.READY, profile=store.build(number, data, previous)
+            )
+            version_model.resume = resume
+            resume.current_version = version_model
+            previous = data
+        session.add(resume)
+        await session.flush()
+        resume_ids.append(resume.id)
+    await session.commit()
+    return resume_ids
+
+
+async def table_size(session: AsyncSession, resume_ids: list[int]) -> int:
+    rows = (
+        select(Profile)
+        .join(ResumeVersion, ResumeVersion.id == Profile.version_id)
+        .where(ResumeVersion.resume_id.in_(resume_ids))
+    )
+    if engine.dialect.name == "postgresql":
+        return await session.scalar(
+            select(func.sum(func.pg_column_size(Profile.__table__.table_valued())))
+            .join(ResumeVersion, ResumeVersion.id == Profile.version_id)
+            .where(ResumeVersion.resume_id.in_(resume_ids))
+        )
+    return sum(
+        len(json.dumps({field: getattr(profile, field) for field in (*PROFILE_FIELDS, "delta")}, default=str))
+        for profile in (await session.scalars(rows)).all()
+    )
+
+
+async def read_latency(store: ProfileStore, resume_ids: list[int], warm: bool) -> float:
+    latencies = []
+    if not warm:
+        store.clear()
+    for resume_id in resume_ids:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            started = time.perf_counter()
+            resume = await session.get(Resume, resume_id, options=[
+                selectinload(Resume.current_version).selectinload(ResumeVersion.profile)
+            ])
+            await store.materialize(session, resume.current_version)
+            latencies.append(time.perf_counter() - started)
+    return statistics.median(latencies) * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=50)
+    parser.add_argument("--versions", type=int, default=40)
+    parser.add_argument("--snapshot-every", type=int, default=10)
+    args = parser.parse_args()
+
+    engine.echo = False
+    # telegram_id в БД — Integer, id должен помещаться в int32
+    user_id = random.randint(2_000_000_000, 2_147_000_000)
+    stores = [
+        ProfileStore(mode=STORAGE_FULL),
+        ProfileStore(mode=STORAGE_DELTA, snapshot_every=args.snapshot_every, cache_size=args.resumes * args.versions),
+    ]
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(User(telegram_id=user_id, name="bench profiles", resumes=[]))
+        await session.commit()
+
+    try:
+        print(f"{'mode':<8} {'profile KiB':>12} {'cold read, ms':>14} {'warm read, ms':>14}")
+        for store in stores:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                resume_ids = await seed(session, user_id, store, args.resumes, args.versions)
+                size = await table_size(session, resume_ids)
+            cold = await read_latency(store, resume_ids, warm=False)
+            warm = await read_latency(store, resume_ids, warm=True)
+            print(f"{store.mode:<8} {size / 1024:12.1f} {cold:14.2f} {warm:14.2f}")
+    finally:
+        async with AsyncSession(engine) as session:
+            await session.delete(await session.get(User, user_id))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
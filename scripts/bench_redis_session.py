@@ -0,0 +1,133 @@
+"""Бенчмарк хранилища истории агента: RedisSession до и после перехода на redis.asyncio.
+
+before — как было: синхронный клиент redis.from_url на каждый объект сессии,
+вызовы через asyncio.to_thread под threading.Lock, RPUSH по одному элементу,
+LLEN + LRANGE для последних сообщений.
+after — core.utils.agents.redis_session.RedisSession на общем пуле redis.asyncio.
+
+--sessions сессий (новый объект на каждый ход, как в ResumeServiceAgent) параллельно
+делают --turns ходов: add_items(--items) и get_items(limit=--limit). Печатаются
+операции в секунду и задержка event loop (насколько опаздывает sleep(1 ms)).
+Нужен Redis из --redis-url; ключи сессий удаляются.
+
+    python -m scripts.bench_redis_session --sessions 50 --turns 40 --redis-url redis://localhost:6379
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from typing import List, Optional
+
+import redis
+from redis.asyncio import Redis
+
+from core.utils.agents.redis_session import RedisSession
+
+PREFIX = "bench_session:"
+
+
+class ThreadedRedisSession:
+    """Прежняя реализация (для сравнения)."""
+
+    def __init__(self, session_id: str, redis_url: str, prefix: str = PREFIX, ttl: Optional[int] = 3600):
+        self.session_id = session_id
+        self.prefix = prefix
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.redis = redis.from_url(redis_url, decode_responses=True)
+
+    def _key(self) -> str:
+        return f"{self.prefix}{self.session_id}"
+
+    async def get_items(self, limit: Optional[int] = None) -> List[dict]:
+        def _get_items_sync():
+            with self._lock:
+                key = self._key()
+                total = self.redis.llen(key)
+                if total == 0:
+                    return []
+                start = max(total - limit, 0) if limit else 0
+                return [json.loads(raw) for raw in self.redis.lrange(key, start, -1)]
+
+        return await asyncio.to_thread(_get_items_sync)
+
+    async def add_items(self, items: List[dict]) -> None:
+        def _add_items_sync():
+            with self._lock:
+                key = self._key()
+                pipe = self.redis.pipeline()
+                for item in items:
+                    pipe.rpush(key, json.dumps(item))
+                if self.ttl:
+                    pipe.expire(key, self.ttl)
+                pipe.execute()
+
+        await asyncio.to_thread(_add_items_sync)
+
+    async def close(self) -> None:
+        self.redis.close()
+
+
+async def watch_loop_lag(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - started - 0.001)
+
+
+async def run(make_session, args) -> tuple[float, float, float]:
+    items = [
+        {"role": "assistant", "content": [{"type": "output_text", "text": "x" * args.item_size}]}
+        for _ in range(args.items)
+    ]
+
+    async def conversation(number: int) -> None:
+        for _ in range(args.turns):
+            session = make_session(f"{number}")
+            await session.add_items(items)
+            await session.get_items(limit=args.limit)
+            await session.close()
+
+    lags, stop = [], asyncio.Event()
+    watcher = asyncio.create_task(watch_loop_lag(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(conversation(number) for number in range(args.sessions)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await watcher
+
+    lags.sort()
+    operations = args.sessions * args.turns * 2
+    return operations / elapsed, statistics.median(lags) * 1000, lags[int(len(lags) * 0.99) - 1] * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--items", type=int, default=4, help="элементов истории за ход")
+    parser.add_argument("--item-size", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--redis-url", default="redis://localhost:6379")
+    args = parser.parse_args()
+
+    client = Redis.from_url(args.redis_url)
+    variants = {
+        "before": lambda session_id: ThreadedRedisSession(session_id, args.redis_url),
+        "after": lambda session_id: RedisSession(session_id, redis_client=client, prefix=PREFIX, ttl=3600),
+    }
+
+    try:
+        print(f"{'variant':<8} {'ops/s':>10} {'loop lag p50, ms':>17} {'loop lag p99, ms':>17}")
+        for label, make_session in variants.items():
+            ops, lag_p50, lag_p99 = await run(make_session, args)
+            print(f"{label:<8} {ops:10.0f} {lag_p50:17.2f} {lag_p99:17.2f}")
+            await client.delete(*[f"{PREFIX}{number}" for number in range(args.sessions)])
+    finally:
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+"""Бенчмарк поиска резюме (GET /api/v1/resume/search/) на большом объёме.
+
+Вставляет --profiles резюме (по умолчанию 1 000 000) с одной версией и
+профилем из синтетического словаря должностей и навыков, делает ANALYZE и
+меряет медиану и p95 по набору типичных запросов: слово из должности, опечатка
+(триграммы), навыки (jsonb @>) и их сочетание, первая и следующая страницы.
+Созданные данные удаляются.
+На sqlite работает через InvertedIndex в памяти — для сравнения порядка величин.
+
+    python -m scripts.bench_search --profiles 1000000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import insert, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core import Profile, Resume, ResumeVersion, User
+from core.db.db import engine
+from core.models.resume_version import ResumeVersionStatus
+from core.services.search_service import SearchService
+from core.utils.search_index import search_index
+
+BATCH = 10_000
+REPEATS = 20
+LEVELS = ["Junior", "Middle", "Senior", "Lead", "Principal"]
+ROLES = [
+    "Python Developer", "Backend Engineer", "Frontend Developer", "Data Scientist", "DevOps Engineer",
+    "QA Engineer", "Product Manager", "Android Developer", "iOS Developer", "Machine Learning Engineer",
+    "Разработчик Python", "Аналитик данных", "Тестировщик", "Системный администратор",
+]
+SKILLS = [
+    "Python", "FastAPI", "Django", "PostgreSQL", "Redis", "Docker", "Kubernetes", "React", "TypeScript",
+    "Go", "Java", "Kotlin", "Swift", "Pandas", "PyTorch", "SQL", "Linux", "Terraform", "Kafka", "Airflow",
+]
+QUERIES = [
+    {"query": "python developer"},
+    {"query": "pyhton"},
+    {"query": "senior backend", "skills": ["PostgreSQL"]},
+    {"skills": ["Kubernetes", "Go"]},
+    {"query": "аналитик"},
+]
+
+
+async def seed(user_id: int, profiles: int) -> None:
+    rng = random.Random(42)
+    async with AsyncSession(engine) as session:
+        for start in range(0, profiles, BATCH):
+            size = min(BATCH, profiles - start)
+            resume_ids = (await session.scalars(
+                insert(Resume).returning(Resume.id),
+                [{"title": f"bench {start + index}", "user_id": user_id} for index in range(size)],
+            )).all()
+            version_ids = (await session.scalars(
+                insert(ResumeVersion).returning(ResumeVersion.id),
+                [{"resume_id": resume_id, "version": 1, "status": ResumeVersionStatus.READY}
+                 for resume_id in resume_ids],
+            )).all()
+            await session.execute(insert(Profile), [
+                {
+                    "version_id": version_id,
+                    "name": f"Candidate {version_id}",
+                    "position": f"{rng.choice(LEVELS)} {rng.choice(ROLES)}",
+                    "skills": rng.sample(SKILLS, rng.randint(3, 8)),
+                }
+                for version_id in version_ids
+            ])
+            await session.commit()
+            print(f"  inserted {start + size} profiles", end="\r")
+        print()
+
+        await session.execute(
+            update(Resume)
+            .where(Resume.user_id == user_id, ResumeVersion.resume_id == Resume.id)
+            .values(current_version_id=ResumeVersion.id)
+        )
+        await session.commit()
+
+    if engine.dialect.name == "postgresql":
+        async with engine.connect() as connection:
+            await connection.execution_options(isolation_level="AUTOCOMMIT")
+            await connection.execute(text("ANALYZE resume, resume_version, profile"))
+
+
+async def measure(params: dict) -> tuple[float, float, int]:
+    latencies, found = [], 0
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        # Первый вызов прогревает кэш страниц БД (и строит InvertedIndex на sqlite)
+        await SearchService.search(session, params.get("query"), params.get("skills"), limit=20)
+        for _ in range(REPEATS):
+            started = time.perf_counter()
+            page = await SearchService.search(session, params.get("query"), params.get("skills"), limit=20)
+            if page["next_cursor"]:
+                await SearchService.search(
+                    session, params.get("query"), params.get("skills"), limit=20, cursor=page["next_cursor"]
+                )
+            latencies.append(time.perf_counter() - started)
+            found = len(page["items"])
+    latencies.sort()
+    return statistics.median(latencies) * 1000, latencies[int(len(latencies) * 0.95) - 1] * 1000, found
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    engine.echo = False
+    # telegram_id в БД — Integer, id должен помещаться в int32
+    user_id = random.randint(2_000_000_000, 2_147_000_000)
+    async with AsyncSession(engine) as session:
+        session.add(User(telegram_id=user_id, name="bench search", resumes=[]))
+        await session.commit()
+
+    try:
+        started = time.perf_counter()
+        await seed(user_id, args.profiles)
+        print(f"seeded {args.profiles} profiles in {time.perf_counter() - started:.1f} s")
+        search_index.clear()
+
+        print(f"{'query':<48} {'p50, ms':>9} {'p95, ms':>9} {'hits':>5}")
+        for params in QUERIES:
+            p50, p95, found = await measure(params)
+            print(f"{str(params):<48} {p50:9.2f} {p95:9.2f} {found:5d}")
+    finally:
+        async with AsyncSession(engine) as session:
+            await session.delete(await session.get(User, user_id))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""Бенчмарк записи и чтения HTML версий: блокирующий open() в корутине против core.utils.storage.
+
+blocking — как было в gpt_agent/HtmlStore: os.makedirs + open().write() прямо
+в event loop. storage — хранилище из STORAGE_BACKEND (LocalStorage в пуле
+потоков с атомарной записью или S3Storage, например против MinIO из
+docker-compose --profile s3). --writers корутин параллельно пишут и читают по
+--files файлов размером --size КБ; печатаются файлы в секунду и задержка
+event loop (насколько опаздывает sleep(1 ms)) — её платят все остальные
+запросы процесса. Файлы пишутся под префиксом bench_storage/ и удаляются.
+
+    python -m scripts.bench_storage --writers 50 --files 20 --size 60
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from core.utils.storage import storage
+
+PREFIX = "bench_storage"
+
+
+class BlockingStorage:
+    """Прежний способ (для сравнения): файловые вызовы прямо в корутине."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    async def write(self, key: str, data: bytes) -> None:
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(data)
+
+    async def read(self, key: str) -> bytes:
+        with open(os.path.join(self.root, key), "rb") as file:
+            return file.read()
+
+
+async def watch_loop_lag(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - started - 0.001)
+
+
+async def run(backend, args) -> tuple[float, float, float]:
+    payload = os.urandom(args.size * 1024)
+
+    async def writer(number: int) -> None:
+        for index in range(args.files):
+            key = f"{PREFIX}/{number}/resume_html_v{index}.html"
+            await backend.write(key, payload)
+            await backend.read(key)
+
+    lags, stop = [], asyncio.Event()
+    watcher = asyncio.create_task(watch_loop_lag(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(number) for number in range(args.writers)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await watcher
+
+    lags.sort()
+    files = args.writers * args.files
+    return files / elapsed, statistics.median(lags) * 1000, lags[int(len(lags) * 0.99) - 1] * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=50)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--size", type=int, default=60, help="размер файла, КБ")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        variants: dict[str, object] = {"blocking": BlockingStorage(root), "storage": storage}
+        print(f"{'variant':<9} {'files/s':>10} {'loop lag p50, ms':>17} {'loop lag p99, ms':>17}")
+        try:
+            for label, backend in variants.items():
+                files, lag_p50, lag_p99 = await run(backend, args)
+                print(f"{label:<9} {files:10.0f} {lag_p50:17.2f} {lag_p99:17.2f}")
+        finally:
+            await storage.delete_prefix(f"{PREFIX}/")
+            await storage.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
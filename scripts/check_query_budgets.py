@@ -0,0 +1,240 @@
+"""Проверка бюджета SQL-запросов на эндпоинты API.
+
+Прогоняет через ASGI-приложение сценарий по всем маршрутам: пользователь →
+создание резюме (одно, пачкой, импортом DOCX) → чтение, списки, поиск, скачивание →
+задачи → локальная правка и правка через агента → удаление — и считает
+запросы к БД на каждый вызов (core.db.query_counter). Если какой-то эндпоинт
+превысил бюджет, у маршрута API нет бюджета или сценарий его не вызвал —
+печатает ошибку и выходит с кодом 1, так что скрипт можно ставить в CI.
+
+Нужны БД из DB_URL и Redis (как в docker-compose). Очередь задач — in-memory,
+агент не вызывается: резюме создаются по шаблону, импортируемый документ
+целиком разбирается правилами. Тот же сценарий на sqlite и fakeredis гоняет
+тест tests/test_query_budgets.py; ветки только для Postgres (блокировка
+FOR UPDATE, carry_forward профиля в SQL, полнотекстовый поиск) считает только
+этот скрипт.
+
+    python -m scripts.check_query_budgets
+"""
+import asyncio
+import io
+import os
+import random
+import sys
+
+os.environ.setdefault("JOB_QUEUE_BACKEND", "memory")
+
+import docx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.routing import APIRoute  # noqa: E402
+from httpx import ASGITransport, AsyncClient, Response  # noqa: E402
+
+from backend.main import app  # noqa: E402
+from core.db.db import engine  # noqa: E402
+from core.db.query_counter import QueryBudgetExceeded, count_queries, install  # noqa: E402
+
+# COMMIT в счёт не входит — это число SELECT/INSERT/UPDATE/DELETE на запрос.
+# Ключ — метод и шаблон пути маршрута, в скобках — вариант вызова того же маршрута
+QUERY_BUDGETS = {
+    "GET /": 0,
+    "GET /metrics": 0,
+    "POST /api/v1/users/create/": 2,  # проверка telegram_id, INSERT
+    "GET /api/v1/users/": 1,
+    "GET /api/v1/users/get/{telegram_id}/": 1,  # loading=summary
+    "PATCH /api/v1/users/update/{user_id}/": 2,
+    "DELETE /api/v1/users/delete/{user_id}/": 3,  # пользователь, ссылки на артефакты, DELETE
+    "POST /api/v1/resume/create/": 5,  # пользователь, резюме, версия, профиль, current_version_id
+    "POST /api/v1/resume/batch/": 5,  # пользователи, резюме, версии, профили, указатели — на всю пачку
+    "POST /api/v1/resume/import/": 6,  # пользователь до разбора файла и create
+    "GET /api/v1/resume/templates/": 0,
+    "GET /api/v1/resume/user/{user_id}/": 1,  # одна страница, без версий
+    "GET /api/v1/resume/search/": 1,
+    "GET /api/v1/resume/get/{resume_id}/": 3,  # резюме, текущая версия, её профиль
+    "GET /api/v1/resume/get/{resume_id}/ (summary)": 1,
+    "GET /api/v1/resume/{resume_id}/versions/{version_id}/download/{kind}/": 1,
+    "PATCH /api/v1/resume/update/{resume_id}/ (fields)": 5,  # резюме с текущей версией, title, версия, указатель, профиль
+    "PATCH /api/v1/resume/update/{resume_id}/ (agent)": 4,
+    "DELETE /api/v1/resume/delete/{resume_id}/": 3,  # резюме, ссылки на артефакты, DELETE (версии удаляет каскад БД)
+    # Задачи живут в очереди (Redis или память процесса), БД не читают
+    "GET /api/v1/jobs/batch/{batch_id}/": 0,
+    "GET /api/v1/jobs/{job_id}/": 0,
+    "GET /api/v1/jobs/{job_id}/stream/": 0,
+}
+BATCH_ITEMS = 3
+
+# На sqlite INSERT ... RETURNING с порядком строк идёт построчно (резюме и версии — по
+# запросу на элемент), а поиск без Postgres сначала читает профили в индекс в памяти
+SQLITE_BUDGETS = {
+    "POST /api/v1/resume/batch/": 3 + 2 * BATCH_ITEMS,
+    "GET /api/v1/resume/search/": 2,
+}
+
+
+def budget_of(name: str) -> int:
+    if engine.dialect.name == "sqlite":
+        return SQLITE_BUDGETS.get(name, QUERY_BUDGETS[name])
+    return QUERY_BUDGETS[name]
+
+
+def route_of(name: str) -> str:
+    return name.split(" (")[0]
+
+
+def routes_without_budget(application: FastAPI) -> list[str]:
+    """Маршруты API, для которых в QUERY_BUDGETS нет ни одного бюджета."""
+    budgeted = {route_of(name) for name in QUERY_BUDGETS}
+    return [
+        f"{method} {route.path}"
+        for route in application.routes if isinstance(route, APIRoute)
+        for method in sorted(route.methods)
+        if f"{method} {route.path}" not in budgeted
+    ]
+
+
+def import_document() -> bytes:
+    """DOCX, который правила импорта разбирают целиком, без агента."""
+    document = docx.Document()
+    for line in ("Ivan Petrov", "Python Developer", "ivan@example.com", "Skills", "Python, SQL"):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+class Scenario:
+    def __init__(self, client: AsyncClient):
+        self.client = client
+        self.called: set[str] = set()
+
+    async def call(self, name: str, method: str, url: str, expect: int | None = None, **kwargs) -> Response:
+        with count_queries(budget=budget_of(name), label=name) as counter:
+            response = await self.client.request(method, url, **kwargs)
+        if expect is None:
+            response.raise_for_status()
+        elif response.status_code != expect:
+            raise AssertionError(f"{name}: expected {expect}, got {response.status_code}: {response.text}")
+        self.called.add(name)
+        print(f"{name:<75} {counter.count:3d} / {counter.budget}")
+        return response
+
+    async def json(self, name: str, method: str, url: str, **kwargs) -> dict:
+        return (await self.call(name, method, url, **kwargs)).json()
+
+
+async def run_scenario(client: AsyncClient, telegram_id: int) -> set[str]:
+    """Прогнать сценарий по всем маршрутам от имени нового пользователя telegram_id.
+
+    Возвращает имена вызванных бюджетов; QueryBudgetExceeded, если бюджет превышен.
+    Пользователь удаляется последним шагом сценария.
+    """
+    scenario = Scenario(client)
+    await scenario.call("GET /", "GET", "/")
+    await scenario.call(
+        "POST /api/v1/users/create/", "POST", "/api/v1/users/create/",
+        json={"name": "query budget", "telegram_id": telegram_id},
+    )
+
+    resume = {
+        "title": "Query budget",
+        "user_id": telegram_id,
+        "creation_mode": "template",
+        "template": "classic",
+        "name": "Ivan Petrov",
+        "position": "Developer",
+        "skills": ["Python"],
+    }
+    created = await scenario.json("POST /api/v1/resume/create/", "POST", "/api/v1/resume/create/", json=resume)
+    resume_id = created["resume"]["id"]
+    version_id = created["resume"]["versions"][0]["id"]
+    job_id = created["job_id"]
+
+    batch = await scenario.json(
+        "POST /api/v1/resume/batch/", "POST", "/api/v1/resume/batch/",
+        json={"items": [{**resume, "title": f"Batch {i}"} for i in range(BATCH_ITEMS)]},
+    )
+    await scenario.call(
+        "POST /api/v1/resume/import/", "POST", "/api/v1/resume/import/",
+        data={"user_id": str(telegram_id)},
+        files={"file": ("cv.docx", import_document(), "application/octet-stream")},
+    )
+    await scenario.call("GET /api/v1/resume/templates/", "GET", "/api/v1/resume/templates/")
+
+    await scenario.call("GET /api/v1/resume/get/{resume_id}/", "GET", f"/api/v1/resume/get/{resume_id}/")
+    await scenario.call(
+        "GET /api/v1/resume/get/{resume_id}/ (summary)", "GET", f"/api/v1/resume/get/{resume_id}/",
+        params={"loading": "summary"},
+    )
+    await scenario.call(
+        "GET /api/v1/resume/{resume_id}/versions/{version_id}/download/{kind}/", "GET",
+        f"/api/v1/resume/{resume_id}/versions/{version_id}/download/html/",
+    )
+    await scenario.call(
+        "GET /api/v1/users/get/{telegram_id}/", "GET", f"/api/v1/users/get/{telegram_id}/"
+    )
+    await scenario.call(
+        "PATCH /api/v1/users/update/{user_id}/", "PATCH", f"/api/v1/users/update/{telegram_id}/",
+        json={"name": "query budget renamed"},
+    )
+    await scenario.call("GET /api/v1/resume/user/{user_id}/", "GET", f"/api/v1/resume/user/{telegram_id}/")
+    await scenario.call("GET /api/v1/users/", "GET", "/api/v1/users/", params={"limit": 20})
+    await scenario.call(
+        "GET /api/v1/resume/search/", "GET", "/api/v1/resume/search/",
+        params={"q": "Developer", "skills": ["Python"]},
+    )
+
+    await scenario.call("GET /api/v1/jobs/{job_id}/", "GET", f"/api/v1/jobs/{job_id}/")
+    await scenario.call("GET /api/v1/jobs/batch/{batch_id}/", "GET", f"/api/v1/jobs/batch/{batch['batch_id']}/")
+    # Поток незавершённой задачи не заканчивается, поэтому проверяется ответ до тела: у всех маршрутов
+    # задач запросы к БД могли бы быть только там
+    await scenario.call(
+        "GET /api/v1/jobs/{job_id}/stream/", "GET", "/api/v1/jobs/unknown-job/stream/", expect=404
+    )
+    await scenario.call("GET /metrics", "GET", "/metrics")
+
+    await scenario.call(
+        "PATCH /api/v1/resume/update/{resume_id}/ (fields)", "PATCH", f"/api/v1/resume/update/{resume_id}/",
+        json={"title": "Renamed", "name": "Petr Ivanov"},
+    )
+    await scenario.call(
+        "PATCH /api/v1/resume/update/{resume_id}/ (agent)", "PATCH", f"/api/v1/resume/update/{resume_id}/",
+        json={"instructions": "Сделай резюме короче"},
+    )
+    await scenario.call(
+        "DELETE /api/v1/resume/delete/{resume_id}/", "DELETE", f"/api/v1/resume/delete/{resume_id}/"
+    )
+    await scenario.call(
+        "DELETE /api/v1/users/delete/{user_id}/", "DELETE", f"/api/v1/users/delete/{telegram_id}/"
+    )
+    return scenario.called
+
+
+def check_coverage(application: FastAPI, called: set[str]) -> list[str]:
+    """Ошибки покрытия: маршруты без бюджета и бюджеты, которые сценарий не вызвал."""
+    errors = [f"{route}: no query budget" for route in routes_without_budget(application)]
+    errors += [f"{name}: not called by the scenario" for name in QUERY_BUDGETS if name not in called]
+    return errors
+
+
+async def main() -> int:
+    install(engine)
+    engine.echo = False
+    # telegram_id в БД — Integer, id должен помещаться в int32
+    telegram_id = random.randint(2_000_000_000, 2_147_000_000)
+    errors: list[str] = []
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://budget") as client:
+        try:
+            errors = check_coverage(app, await run_scenario(client, telegram_id))
+        except QueryBudgetExceeded as e:
+            errors = [str(e)]
+        finally:
+            # Пользователь уже удалён сценарием, если он дошёл до конца
+            await client.delete(f"/api/v1/users/delete/{telegram_id}/")
+
+    for error in errors:
+        print(error, file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,86 @@
+"""Перевод сохранённых профилей между полными копиями и дельтами.
+
+--compact переписывает профили в формат PROFILE_STORAGE=delta: снимок у версии 1
+и каждой PROFILE_SNAPSHOT_EVERY-й после неё, у остальных — только изменённые поля.
+--expand возвращает всем версиям полные копии. Для переключения на
+PROFILE_STORAGE=full это не нужно (дельты читаются в любом режиме), но перед
+откатом миграции d2a9f4e61c08 обязательно — иначе дельты потеряются.
+
+Резюме обрабатываются по одному в своей транзакции, повторный запуск безопасен.
+
+    python -m scripts.compact_profiles --compact
+    python -m scripts.compact_profiles --expand
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core import Profile, Resume, ResumeVersion
+from core.db.db import engine
+from core.utils.profile_store import PROFILE_FIELDS, STORAGE_DELTA, ProfileStore, profile_store
+
+BATCH = 500
+
+
+async def rewrite_resume(session: AsyncSession, resume_id: int, store: ProfileStore, expand: bool) -> int:
+    rows = await session.execute(
+        select(ResumeVersion.version, Profile)
+        .join(Profile, Profile.version_id == ResumeVersion.id)
+        .where(ResumeVersion.resume_id == resume_id)
+        .order_by(ResumeVersion.version)
+    )
+
+    changed = 0
+    previous: dict | None = None
+    for version, profile in rows:
+        data = store.fields_of(profile) if profile.is_snapshot else {**(previous or {}), **(profile.delta or {})}
+
+        if expand:
+            values = {**data, "is_snapshot": True, "delta": None}
+        else:
+            target = store.build(version, data, previous)
+            values = {field: getattr(target, field) for field in PROFILE_FIELDS}
+            values.update(is_snapshot=target.is_snapshot, delta=target.delta)
+
+        if values["is_snapshot"] != profile.is_snapshot or values["delta"] != profile.delta:
+            await session.execute(update(Profile).where(Profile.id == profile.id).values(**values))
+            changed += 1
+        previous = data
+
+    await session.commit()
+    return changed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--compact", action="store_true")
+    mode.add_argument("--expand", action="store_true")
+    args = parser.parse_args()
+
+    engine.echo = False
+    store = ProfileStore(mode=STORAGE_DELTA, snapshot_every=profile_store.snapshot_every)
+    last_id, resumes, changed = 0, 0, 0
+
+    while True:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            resume_ids = (await session.scalars(
+                select(Resume.id).where(Resume.id > last_id).order_by(Resume.id).limit(BATCH)
+            )).all()
+        if not resume_ids:
+            break
+
+        for resume_id in resume_ids:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                changed += await rewrite_resume(session, resume_id, store, expand=args.expand)
+        resumes += len(resume_ids)
+        last_id = resume_ids[-1]
+        print(f"{resumes} resumes processed, {changed} profiles rewritten")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
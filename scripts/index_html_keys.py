@@ -0,0 +1,73 @@
+"""Построить индекс HTML-ключей пользователей для уже сохранённых резюме.
+
+HtmlStore регистрирует каждый записанный ключ resume:html:{user_id}:{resume_id}:{version}
+в множестве resume:html_keys:{user_id}, а clear_user_session удаляет только ключи
+из этого множества. Ключи, записанные до появления индекса (в том числе старого
+формата resume:html:{user_id}:{version}, которые больше не читаются), в него не
+попали — скрипт один раз проходит SCAN по resume:html:* и добавляет их пачками
+через пайплайн. Повторный запуск безопасен (SADD идемпотентен).
+С --drop-legacy ключи старого формата вместо индексации удаляются: они без TTL
+и без сжатия, а тот же HTML лежит на диске.
+
+    python -m scripts.index_html_keys --redis-url redis://redis:6379 [--drop-legacy]
+"""
+import argparse
+import asyncio
+import re
+from collections import defaultdict
+
+from redis.asyncio import Redis
+
+from core.utils.html_store import HtmlStore, html_store
+
+HTML_KEY_PREFIX = html_store.prefix
+KEY_PATTERN = re.compile(rf"^{re.escape(HTML_KEY_PREFIX)}(\d+):(\d+:)?\d+$")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--redis-url", default="redis://redis:6379")
+    parser.add_argument("--count", type=int, default=1000, help="размер шага SCAN")
+    parser.add_argument("--drop-legacy", action="store_true")
+    args = parser.parse_args()
+
+    client = Redis.from_url(args.redis_url)
+    scanned, indexed, dropped, users = 0, 0, 0, set()
+    try:
+        cursor = 0
+        while True:
+            cursor, keys = await client.scan(cursor, match=f"{HTML_KEY_PREFIX}*", count=args.count)
+            scanned += len(keys)
+
+            by_user: dict[int, list[str]] = defaultdict(list)
+            legacy: list[str] = []
+            for key in keys:
+                key = key.decode() if isinstance(key, bytes) else key
+                match = KEY_PATTERN.match(key)
+                if not match:
+                    continue
+                if args.drop_legacy and match.group(2) is None:
+                    legacy.append(key)
+                else:
+                    by_user[int(match.group(1))].append(key)
+
+            if legacy:
+                await client.unlink(*legacy)
+                dropped += len(legacy)
+            if by_user:
+                async with client.pipeline(transaction=False) as pipe:
+                    for user_id, user_keys in by_user.items():
+                        pipe.sadd(HtmlStore.index_key(user_id), *user_keys)
+                    await pipe.execute()
+                indexed += sum(len(user_keys) for user_keys in by_user.values())
+                users.update(by_user)
+
+            if cursor == 0:
+                break
+        print(f"{scanned} keys scanned, {indexed} indexed for {len(users)} users, {dropped} legacy keys dropped")
+    finally:
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
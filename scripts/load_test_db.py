@@ -0,0 +1,113 @@
+"""Нагрузочный тест API при --clients одновременных клиентах: старый движок БД против нового.
+
+before — движок, как он создавался раньше: echo=True (каждый запрос пишется
+в лог, здесь в /dev/null), пул по умолчанию (5 + 10 overflow, ожидание до 30 с),
+кэш выражений asyncpg по умолчанию. after — core.db.db.build_engine с настройками
+из DB_* (см. DatabaseSettings). Приложение вызывается в процессе через ASGI,
+без сети: каждый клиент в цикле читает пользователя, страницу списка и
+обновляет last_seen. Печатаются запросы в секунду, задержки, ошибки и итог
+метрик пула (время получения соединения, таймауты ожидания).
+
+Создаёт --users пользователей в отдельном диапазоне id и удаляет их. Нужна БД из DB_URL;
+для честного сравнения — Postgres, с запасом max_connections под DB_POOL_SIZE + DB_MAX_OVERFLOW.
+
+    python -m scripts.load_test_db --clients 200 --duration 20
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import time
+from datetime import UTC, datetime
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from backend.main import app
+from core.db import db
+from core.models.user import User
+from core.utils.metrics import Histogram, metrics
+
+FIRST_ID = 2_000_000_000
+
+
+def legacy_engine() -> AsyncEngine:
+    # Размеры и таймаут пула — значения SQLAlchemy по умолчанию; класс пула только добавляет метрики
+    engine = create_async_engine(
+        db.settings.url, echo=True, future=True, pool_pre_ping=True, poolclass=db.InstrumentedQueuePool
+    )
+    # echo пишет в stdout; в бою это логи контейнера, здесь — /dev/null, цена форматирования остаётся
+    logging.getLogger("sqlalchemy.engine.Engine").handlers = [logging.StreamHandler(open(os.devnull, "w"))]
+    return engine
+
+
+async def client(http: AsyncClient, user_ids: range, deadline: float, latencies: list[float], errors: list[int]) -> None:
+    while time.perf_counter() < deadline:
+        user_id = random.choice(user_ids)
+        for method, url, body in (
+                ("GET", f"/api/v1/users/get/{user_id}/", None),
+                ("GET", "/api/v1/users/", None),
+                ("PATCH", f"/api/v1/users/update/{user_id}/", {"last_seen": datetime.now(UTC).isoformat()}),
+        ):
+            started = time.perf_counter()
+            try:
+                response = await http.request(method, url, json=body, params={"limit": 20} if body is None else None)
+                status = response.status_code
+            except Exception:
+                status = 599
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors.append(status)
+
+
+async def run(label: str, engine: AsyncEngine, args, user_ids: range) -> None:
+    db.engine = engine
+    metrics.pool_checkouts = Histogram(buckets=metrics.pool_checkouts.buckets)
+    metrics.pool_timeouts = 0
+
+    latencies, errors = [], []
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://load", timeout=None) as http:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(client(http, user_ids, deadline, latencies, errors) for _ in range(args.clients)))
+        elapsed = time.perf_counter() - started
+
+    await engine.dispose()
+    latencies.sort()
+    checkouts = metrics.pool_checkouts
+    checkout_ms = f"{checkouts.sum / checkouts.count * 1000:.1f}" if checkouts.count else "-"
+    print(
+        f"{label:<7} {len(latencies) / elapsed:9.0f} {statistics.median(latencies) * 1000:9.1f} "
+        f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:9.1f} {latencies[int(len(latencies) * 0.99) - 1] * 1000:9.1f} "
+        f"{len(errors):7} {checkout_ms:>13} {metrics.pool_timeouts:9}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20, help="секунд на вариант")
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    user_ids = range(FIRST_ID, FIRST_ID + args.users)
+    engine = db.build_engine(db.settings)
+    async with engine.begin() as connection:
+        await connection.execute(insert(User), [{"telegram_id": user_id, "name": f"load {user_id}"} for user_id in user_ids])
+
+    try:
+        print(f"{'variant':<7} {'req/s':>9} {'p50, ms':>9} {'p95, ms':>9} {'p99, ms':>9} {'errors':>7} "
+              f"{'checkout, ms':>13} {'timeouts':>9}")
+        await run("before", legacy_engine(), args, user_ids)
+        await run("after", db.build_engine(db.settings), args, user_ids)
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(delete(User).where(User.telegram_id >= FIRST_ID, User.telegram_id < user_ids.stop))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""Перевод файлов резюме на ключи хранилища core.utils.storage.
+
+До появления хранилища в ResumeVersion.path_to_* записывались абсолютные пути
+внутри resume_files/ конкретного контейнера. Скрипт переписывает их в ключи
+относительно корня (<user>/resume_<id>/html/..., artifacts/<ab>/<key>/...),
+а с --copy ещё и переносит файлы из локального каталога --source-root в хранилище,
+настроенное через STORAGE_BACKEND (например, в S3/MinIO). Общие артефакты
+копируются один раз. Версии обрабатываются пачками в своей транзакции,
+повторный запуск безопасен.
+
+    python -m scripts.migrate_storage [--copy] [--source-root /app/resume_files]
+"""
+import argparse
+import asyncio
+from pathlib import PurePosixPath
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core import ResumeVersion
+from core.db.db import engine
+from core.utils.storage import RESUME_FILES_DIR, InvalidStorageKey, LocalStorage, storage
+
+BATCH = 500
+PATH_COLUMNS = ("path_to_html", "path_to_pdf", "path_to_image")
+
+
+def to_key(path: str, source_root: str) -> str:
+    """Ключ файла для старого абсолютного пути; ключи возвращаются как есть."""
+    if not path.startswith("/"):
+        return path
+    parts = PurePosixPath(path).parts
+    root_parts = PurePosixPath(source_root).parts
+    if parts[:len(root_parts)] == root_parts:
+        return str(PurePosixPath(*parts[len(root_parts):]))
+    # Путь из другого контейнера: корень мог называться иначе, но каталог всегда resume_files
+    if "resume_files" in parts:
+        return str(PurePosixPath(*parts[parts.index("resume_files") + 1:]))
+    return path
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source-root", default=str(RESUME_FILES_DIR))
+    parser.add_argument("--copy", action="store_true", help="скопировать файлы в настроенное хранилище")
+    args = parser.parse_args()
+
+    engine.echo = False
+    source = LocalStorage(args.source_root)
+    seen: set[str] = set()
+    last_id, versions, rewritten, copied, missing = 0, 0, 0, 0, 0
+
+    try:
+        while True:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                rows = (await session.execute(
+                    select(ResumeVersion.id, *(getattr(ResumeVersion, column) for column in PATH_COLUMNS))
+                    .where(ResumeVersion.id > last_id)
+                    .order_by(ResumeVersion.id)
+                    .limit(BATCH)
+                )).all()
+                if not rows:
+                    break
+
+                for version_id, *paths in rows:
+                    values = {}
+                    for column, path in zip(PATH_COLUMNS, paths):
+                        if not path:
+                            continue
+                        key = to_key(path, args.source_root)
+                        if args.copy and key not in seen:
+                            seen.add(key)
+                            try:
+                                data = await source.read(key)
+                            except InvalidStorageKey:
+                                # Путь не удалось привести к ключу внутри --source-root
+                                data = None
+                            if data is None:
+                                missing += 1
+                            else:
+                                await storage.write(key, data)
+                                copied += 1
+                        if key != path:
+                            values[column] = key
+
+                    if values:
+                        await session.execute(update(ResumeVersion).where(ResumeVersion.id == version_id).values(**values))
+                        rewritten += 1
+
+                await session.commit()
+            versions += len(rows)
+            last_id = rows[-1][0]
+            print(f"{versions} versions processed, {rewritten} rewritten, {copied} files copied, {missing} missing")
+    finally:
+        await source.close()
+        await storage.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""Окружение тестов: sqlite вместо Postgres, fakeredis вместо Redis, очередь задач в памяти.
+
+Всё настраивается до импорта приложения: движок БД, хранилище и клиенты Redis —
+синглтоны модулей и читают окружение и core.utils.redis_cache при импорте.
+Нужны пакеты из extra "test" (pip install -e .[test]).
+"""
+import os
+import tempfile
+
+import fakeredis
+
+TMP_DIR = tempfile.mkdtemp(prefix="resume-tests-")
+
+os.environ["DB_URL"] = f"sqlite+aiosqlite:///{TMP_DIR}/test.db"
+os.environ["DB_POOL_SIZE"] = "0"
+os.environ["JOB_QUEUE_BACKEND"] = "memory"
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ["STORAGE_ROOT"] = os.path.join(TMP_DIR, "resume_files")
+# Агент не вызывается, но клиент OpenAI требует ключ при создании
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import core.utils.redis_cache as redis_module  # noqa: E402
+
+redis_module.redis_cache = fakeredis.FakeAsyncRedis()
+
+import asyncio  # noqa: E402
+
+import pytest  # noqa: E402
+from openai.types.responses import ResponseTextDeltaEvent  # noqa: E402
+
+
+class FakeRunner:
+    """Заменитель agents.Runner для ResumeServiceAgent(runner=...).
+
+    outputs[model] — ответ модели: строка или исключение, которое вызов бросит;
+    delays[model] — задержка ответа (в потоке — перед каждым куском). Модели
+    вызовов копятся в calls.
+    """
+
+    def __init__(self, outputs: dict, delays: dict | None = None, chunk_size: int = 8):
+        self.outputs = outputs
+        self.delays = delays or {}
+        self.chunk_size = chunk_size
+        self.calls: list[str] = []
+
+    def _output(self, model: str) -> str:
+        output = self.outputs[model]
+        if isinstance(output, BaseException):
+            raise output
+        return output
+
+    async def run(self, agent, input, session=None, **kwargs):
+        self.calls.append(agent.model)
+        await asyncio.sleep(self.delays.get(agent.model, 0))
+        return _FakeResult(self._output(agent.model))
+
+    def run_streamed(self, agent, input, session=None, **kwargs):
+        self.calls.append(agent.model)
+        return _FakeStreamedResult(self, agent.model)
+
+
+class _FakeResult:
+    def __init__(self, final_output: str):
+        self.final_output = final_output
+
+
+class _FakeEvent:
+    type = "raw_response_event"
+
+    def __init__(self, delta: str, sequence_number: int):
+        self.data = ResponseTextDeltaEvent(
+            content_index=0, delta=delta, item_id="fake", logprobs=[], output_index=0,
+            sequence_number=sequence_number, type="response.output_text.delta",
+        )
+
+
+class _FakeStreamedResult:
+    def __init__(self, runner: FakeRunner, model: str):
+        self.runner = runner
+        self.model = model
+        self.final_output = None
+
+    async def stream_events(self):
+        output = self.runner._output(self.model)
+        for start in range(0, len(output), self.runner.chunk_size):
+            await asyncio.sleep(self.runner.delays.get(self.model, 0))
+            yield _FakeEvent(output[start:start + self.runner.chunk_size], start)
+        self.final_output = output
+
+
+@pytest.fixture
+def fake_redis():
+    """Отдельный пустой fakeredis на тест."""
+    return fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+
+
+@pytest.fixture
+def fake_runner():
+    return FakeRunner
@@ -0,0 +1,49 @@
+import asyncio
+
+from core.utils.artifact_store import ArtifactStore
+from core.utils.storage import LocalStorage
+
+KEY = ArtifactStore.make_key("<p>resume</p>", {"format": "A4"})
+
+
+def test_artifact_is_removed_with_the_last_reference(fake_redis, tmp_path):
+    async def scenario():
+        store = ArtifactStore(fake_redis, storage=LocalStorage(tmp_path))
+        await store.acquire(KEY, version_id=1)
+        await store.acquire(KEY, version_id=1)  # повтор задачи той же версии
+        await store.acquire(KEY, version_id=2)
+        await store.put(KEY, b"%PDF", b"PNG")
+
+        await store.release(KEY, version_id=1)
+        await store.release(KEY, version_id=1)
+        still_there = await store.get(KEY)
+
+        await store.release(KEY, version_id=2)
+        gone = await store.get(KEY)
+        deleting = await fake_redis.exists(store._deleting_key(KEY))
+        await store.storage.close()
+        return still_there, gone, deleting
+
+    still_there, gone, deleting = asyncio.run(scenario())
+    assert still_there is not None
+    assert gone is None
+    assert not deleting
+
+
+def test_acquire_waits_for_a_running_delete(fake_redis, tmp_path):
+    async def scenario():
+        store = ArtifactStore(fake_redis, storage=LocalStorage(tmp_path))
+        await fake_redis.set(store._deleting_key(KEY), 1)
+        acquire = asyncio.create_task(store.acquire(KEY, version_id=3))
+        await asyncio.sleep(0.1)
+        waiting = not acquire.done()
+
+        await fake_redis.delete(store._deleting_key(KEY))
+        await asyncio.wait_for(acquire, timeout=1)
+        refs = await fake_redis.smembers(store._refs_key(KEY))
+        await store.storage.close()
+        return waiting, refs
+
+    waiting, refs = asyncio.run(scenario())
+    assert waiting
+    assert refs == {b"3"}
@@ -0,0 +1,45 @@
+import pytest
+
+from core.utils.html_binding import BindingError, field_changes, render_fields
+
+HTML = (
+    '<h1 data-field="name">Иван Петров</h1>'
+    '<a data-field="contacts.email" href="mailto:ivan@example.com">ivan@example.com</a>'
+    '<a data-field="contacts.github" href="https://github.com/ivan">github.com/ivan</a>'
+    '<ul data-field="skills"><li class="skill">Python</li></ul>'
+)
+
+
+def test_renders_text_lists_and_links():
+    html = render_fields(HTML, {
+        "name": "Пётр <Сидоров>",
+        "skills": ["Go", "SQL"],
+        "contacts": {"email": "petr@example.com", "github": "github.com/petr"},
+    })
+    assert '<h1 data-field="name">Пётр &lt;Сидоров&gt;</h1>' in html
+    assert '<li class="skill">Go</li><li class="skill">SQL</li>' in html
+    assert 'href="mailto:petr@example.com">petr@example.com</a>' in html
+    assert 'href="https://github.com/petr">github.com/petr</a>' in html
+
+
+@pytest.mark.parametrize("changes", [
+    {"summary": "new"},
+    {"name": None},
+    {"contacts": {"telegram": "@petr"}},
+    {"contacts": {"github": "@petr"}},
+    {"contacts": {"email": "not an email"}},
+])
+def test_changes_that_need_the_agent(changes):
+    with pytest.raises(BindingError):
+        render_fields(HTML, changes)
+
+
+def test_self_closing_bound_element_needs_the_agent():
+    with pytest.raises(BindingError):
+        render_fields('<img data-field="name"/>', {"name": "Пётр"})
+
+
+def test_field_changes_keep_only_changed_values():
+    old = {"name": "Иван", "contacts": {"email": "a@b.c", "phone": "1"}}
+    new = {"name": "Иван", "contacts": {"email": "x@b.c"}}
+    assert field_changes(old, new) == {"contacts": {"phone": None, "email": "x@b.c"}}
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from core.utils.html_patch import PatchApplyError, apply_patches, locate, parse_patch_output
+
+HTML = (
+    '<html><body>\n'
+    '<section data-section="summary"><p>Old summary</p></section>\n'
+    '<section data-section="skills"><ul><li>Python</li></ul></section>\n'
+    '</body></html>'
+)
+
+
+def test_replaces_only_the_patched_section():
+    patched = apply_patches(HTML, [
+        {"section": "summary", "html": '<section data-section="summary"><p>New</p></section>'},
+    ])
+    assert '<p>New</p>' in patched
+    assert 'Old summary' not in patched
+    assert '<li>Python</li>' in patched
+
+
+def test_empty_html_removes_the_section():
+    patched = apply_patches(HTML, [{"section": "skills", "html": ""}])
+    assert "skills" not in patched
+
+
+def test_offsets_ignore_unicode_line_separators():
+    # str.splitlines() считает \u2028 переводом строки, а HTMLParser — нет
+    html = HTML.replace("Old summary", "Old\u2028summary")
+    patched = apply_patches(html, [
+        {"section": "skills", "html": '<section data-section="skills"><ul><li>Go</li></ul></section>'},
+    ])
+    assert patched == html.replace("<li>Python</li>", "<li>Go</li>")
+
+
+@pytest.mark.parametrize("patch", [
+    {"section": "missing", "html": ""},
+    {"section": "summary", "html": "<section data-section=\"summary\"><p>unclosed</section>"},
+    {"section": "summary", "html": "<section><p>marker lost</p></section>"},
+    {"html": "<p>no section</p>"},
+])
+def test_rejects_patches_that_cannot_be_applied(patch):
+    with pytest.raises(PatchApplyError):
+        apply_patches(HTML, [patch])
+
+
+def test_parse_patch_output():
+    patches = [{"section": "summary", "html": ""}]
+    assert parse_patch_output(json.dumps({"patches": patches})) == patches
+    assert parse_patch_output('{"mode": "full"}') is None
+    for output in ("not json", "[]", '{"patches": {}}'):
+        with pytest.raises(PatchApplyError):
+            parse_patch_output(output)
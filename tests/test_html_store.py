@@ -0,0 +1,44 @@
+import asyncio
+
+from core.utils.html_store import HtmlStore
+from core.utils.storage import LocalStorage
+
+
+def test_keeps_latest_versions_hot_and_reads_older_from_storage(fake_redis, tmp_path):
+    async def scenario():
+        store = HtmlStore(fake_redis, storage=LocalStorage(tmp_path), keep_versions=2, ttl=3600)
+        for version in (1, 2, 3):
+            await store.put(1, 10, version, f"<p>v{version}</p>")
+
+        assert not await fake_redis.exists(store.key(1, 10, 1))
+        assert await store.get(1, 10, 1) == "<p>v1</p>"
+        assert await store.get(1, 10, 3) == "<p>v3</p>"
+        assert await store.get(1, 10, 4) is None
+
+        # Индекс и множество горячих версий не живут дольше HTML
+        assert 0 < await fake_redis.ttl(store.index_key(1)) <= 3600
+        assert 0 < await fake_redis.ttl(HtmlStore._hot_key(10)) <= 3600
+        stats = await store.stats()
+        await store.storage.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert (stats["hits"], stats["disk_reads"], stats["misses"]) == (1, 1, 1)
+
+
+def test_forget_resume_drops_only_its_hot_keys(fake_redis, tmp_path):
+    async def scenario():
+        store = HtmlStore(fake_redis, storage=LocalStorage(tmp_path))
+        await store.put(1, 10, 1, "<p>a</p>")
+        await store.put(1, 11, 1, "<p>b</p>")
+
+        await store.forget_resume(1, 10)
+        index = await fake_redis.smembers(store.index_key(1))
+        # Файл удалённого из Redis резюме остаётся в хранилище
+        html = await store.get(1, 10, 1)
+        await store.storage.close()
+        return index, html
+
+    index, html = asyncio.run(scenario())
+    assert {key.decode() for key in index} == {"resume:html:1:11:1", "resume:html_hot:11"}
+    assert html == "<p>a</p>"
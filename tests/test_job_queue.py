@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from core.schemas.job_schema import GenerationJob, JobAction, JobStatus
+from core.utils.jobs.job_queue import InMemoryJobQueue, RedisJobQueue
+from core.utils.jobs.worker import JobWorkerPool
+
+CONSUMER = "host:1:pool:0"
+
+
+def make_job(**fields) -> GenerationJob:
+    return GenerationJob(action=JobAction.CREATE_RESUME, user_id=1, resume_id=1, version_id=1, version=1, **fields)
+
+
+async def processing(queue: RedisJobQueue, consumer: str = CONSUMER) -> list[str]:
+    return [job_id.decode() for job_id in await queue.redis_client.lrange(queue._processing_key(consumer), 0, -1)]
+
+
+def test_dequeue_keeps_job_in_processing_until_ack(fake_redis):
+    async def scenario():
+        queue = RedisJobQueue(fake_redis)
+        job = await queue.enqueue(make_job())
+
+        taken = await queue.dequeue(CONSUMER, timeout=0.1)
+        assert taken.id == job.id
+        assert await processing(queue) == [job.id]
+        assert await fake_redis.llen(queue.queue_key) == 0
+
+        await queue.ack(taken, CONSUMER)
+        assert await processing(queue) == []
+
+    asyncio.run(scenario())
+
+
+def test_retry_later_is_stored_in_redis_and_promoted_when_due(fake_redis):
+    async def scenario():
+        queue = RedisJobQueue(fake_redis)
+        await queue.enqueue(make_job())
+        job = await queue.dequeue(CONSUMER, timeout=0.1)
+
+        job.attempts = 1
+        await queue.retry_later(job, CONSUMER, delay=60)
+        assert await processing(queue) == []
+        assert await queue.promote_due() == 0
+
+        await queue.retry_later(job, CONSUMER, delay=0)
+        assert await queue.promote_due() == 1
+        assert [job_id.decode() for job_id in await fake_redis.lrange(queue.queue_key, 0, -1)] == [job.id]
+        assert (await queue.get(job.id)).attempts == 1
+
+    asyncio.run(scenario())
+
+
+def test_requeue_stale_returns_jobs_of_workers_without_heartbeat(fake_redis):
+    async def scenario():
+        queue = RedisJobQueue(fake_redis)
+        alive, dead = "alive:0", "dead:0"
+        for consumer in (alive, dead):
+            await queue.enqueue(make_job())
+            await queue.dequeue(consumer, timeout=0.1)
+
+        await queue.heartbeat([alive], ttl=60)
+        await queue.heartbeat([dead], ttl=0.05)
+        await asyncio.sleep(0.1)
+
+        assert await queue.requeue_stale() == 1
+        assert await processing(queue, dead) == []
+        assert len(await processing(queue, alive)) == 1
+        assert await fake_redis.llen(queue.queue_key) == 1
+        assert await fake_redis.smembers(queue.consumers_key) == {alive.encode()}
+
+    asyncio.run(scenario())
+
+
+def test_release_returns_in_flight_jobs(fake_redis):
+    async def scenario():
+        queue = RedisJobQueue(fake_redis)
+        job = await queue.enqueue(make_job())
+        await queue.heartbeat([CONSUMER], ttl=60)
+        await queue.dequeue(CONSUMER, timeout=0.1)
+
+        assert await queue.release([CONSUMER]) == 1
+        assert await processing(queue) == []
+        assert (await queue.dequeue("other:0", timeout=0.1)).id == job.id
+        assert not await fake_redis.exists(queue._heartbeat_key(CONSUMER))
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("failures, status, attempts", [(1, JobStatus.DONE, 2), (5, JobStatus.FAILED, 3)])
+def test_worker_retries_failed_job_until_max_attempts(failures, status, attempts):
+    failed = []
+
+    async def handler(job: GenerationJob) -> None:
+        if job.attempts <= failures:
+            raise RuntimeError(f"attempt {job.attempts}")
+
+    async def on_failure(job: GenerationJob, error: Exception) -> None:
+        failed.append(str(error))
+
+    async def scenario():
+        queue = InMemoryJobQueue()
+        pool = JobWorkerPool(queue, handler, on_failure=on_failure, concurrency=1, max_attempts=3, retry_delay=0)
+        job = await queue.enqueue(make_job())
+
+        while (current := await queue.get(job.id)).status not in (JobStatus.DONE, JobStatus.FAILED):
+            await queue.promote_due()
+            taken = await queue.dequeue(pool.consumers[0], timeout=0.1)
+            await pool.process(taken, pool.consumers[0])
+        assert queue._processing[pool.consumers[0]] == []
+        return current
+
+    job = asyncio.run(scenario())
+    assert (job.status, job.attempts) == (status, attempts)
+    assert failed == ([] if status == JobStatus.DONE else ["attempt 3"])
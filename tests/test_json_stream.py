@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+from core.utils.agents.json_stream import JsonStringFieldDecoder
+
+HTML = '<p class="name">Иван "Ваня" Петров\n\t\\ 😀 </p>'
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1000])
+def test_decodes_field_from_any_chunking(chunk_size):
+    output = json.dumps({"title": "x", "html_code": HTML, "tail": "ignored"})
+    decoder = JsonStringFieldDecoder("html_code")
+    text = "".join(decoder.feed(output[i:i + chunk_size]) for i in range(0, len(output), chunk_size))
+    assert text == HTML
+
+
+def test_non_ascii_escapes_and_surrogate_pairs_split_across_chunks():
+    output = json.dumps({"html_code": HTML}, ensure_ascii=True)
+    decoder = JsonStringFieldDecoder("html_code")
+    assert "".join(decoder.feed(char) for char in output) == HTML
+
+
+def test_ignores_other_fields_and_text_after_the_value():
+    decoder = JsonStringFieldDecoder("html_code")
+    assert decoder.feed('{"html": "no", "html_code"') == ""
+    assert decoder.feed(': "<b>ok</b>", "html_code": "again"}') == "<b>ok</b>"
+    assert decoder.feed('"more"') == ""
@@ -0,0 +1,25 @@
+import asyncio
+
+from core.utils.agents.llm_cache import LLMResultCache
+
+
+def test_key_ignores_payload_key_order():
+    cache = LLMResultCache(redis_client=None)
+    assert cache.make_key("kind", "m", {"a": 1, "b": 2}, "i") == cache.make_key("kind", "m", '{"b": 2, "a": 1}', "i")
+    assert cache.make_key("kind", "m", {"a": 1}, "i") != cache.make_key("kind", "m", {"a": 1}, "other instructions")
+    assert cache.make_key("kind", "m", {"a": 1}, "i") != cache.make_key("kind", "n", {"a": 1}, "i")
+
+
+def test_returns_first_hit_and_evicts_least_recently_used(fake_redis):
+    async def scenario():
+        cache = LLMResultCache(fake_redis, max_entries=2)
+        await cache.set("llm_cache:a", "A")
+        await cache.set("llm_cache:b", "B")
+        assert await cache.get(["llm_cache:missing", "llm_cache:a"]) == "A"
+
+        await cache.set("llm_cache:c", "C")
+        assert await cache.get(["llm_cache:b"]) is None
+        assert await cache.get(["llm_cache:a"]) == "A"
+        return await cache.stats()
+
+    assert asyncio.run(scenario()) == {"hits": 2, "misses": 1, "evictions": 1}
@@ -0,0 +1,39 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from backend.metrics_middleware import MetricsMiddleware
+from core.utils.metrics import metrics, track
+
+ROUTE = "/stream/{name}/"
+
+
+def test_streamed_body_is_counted_for_its_route():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get(ROUTE)
+    async def stream(name: str):
+        async def chunks():
+            for part in (b"a", b"b"):
+                # Операции при отдаче тела — как чтение файла из хранилища при скачивании
+                with track("file"):
+                    await asyncio.sleep(0.01)
+                yield part
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    async def scenario():
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://metrics") as client:
+            return await client.get("/stream/x/")
+
+    files_before = metrics.operations[(ROUTE, "file")]
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 200 and response.content == b"ab"
+    assert "total;dur=" in response.headers["Server-Timing"]
+    assert metrics.requests[("GET", ROUTE, 200)] >= 1
+    assert metrics.operations[(ROUTE, "file")] - files_before == 2
+    assert metrics.request_durations[("GET", ROUTE)].sum >= 0.02
@@ -0,0 +1,176 @@
+import asyncio
+import json
+
+import pytest
+
+from core.utils.agents.gpt_agent import INSTRUCTIONS_DIR, ResumeServiceAgent
+from core.utils.agents.model_router import CircuitState, ModelRouter
+
+HTML = "<html><body><h1>Иван Петров</h1></body></html>"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def failing(*models: str):
+    async def call(model: str) -> str:
+        if model in models:
+            raise RuntimeError(f"{model} failed")
+        return model
+    return call
+
+
+def test_circuit_opens_after_consecutive_failures_and_closes_after_probe():
+    clock = Clock()
+    router = ModelRouter(["a", "b"], consecutive_failures_threshold=2, open_seconds=60, clock=clock)
+
+    assert asyncio.run(router.run(failing("a"))) == "b"
+    assert router.stats["a"].state == CircuitState.CLOSED
+    with pytest.raises(RuntimeError):
+        asyncio.run(router._attempt("a", failing("a")))
+    assert router.stats["a"].state == CircuitState.OPEN
+    assert router.ordered_models() == ["b"]
+
+    clock.now += 60
+    assert router.ordered_models()[0] == "b"
+    assert router.stats["a"].state == CircuitState.HALF_OPEN
+
+    # Проба успешна — цепь закрывается, окно ошибок начинается заново
+    assert asyncio.run(router._attempt("a", failing())) == "a"
+    assert router.stats["a"].state == CircuitState.CLOSED
+    assert router.stats["a"].error_rate == 0
+
+
+def test_failed_probe_reopens_circuit():
+    clock = Clock()
+    router = ModelRouter(["a"], consecutive_failures_threshold=1, open_seconds=60, clock=clock)
+    with pytest.raises(RuntimeError):
+        asyncio.run(router.run(failing("a")))
+    clock.now += 60
+    router.ordered_models()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(router.run(failing("a")))
+    assert router.stats["a"].state == CircuitState.OPEN
+    assert router.stats["a"].opened_at == clock.now
+    assert not router.stats["a"].probe_in_flight
+
+
+def test_half_open_lets_through_a_single_probe():
+    clock = Clock()
+    router = ModelRouter(["a", "b"], consecutive_failures_threshold=1, open_seconds=60, clock=clock)
+    asyncio.run(router.run(failing("a")))
+    clock.now += 60
+    router.ordered_models()
+
+    router.stats["a"].probe_in_flight = True
+    assert router.ordered_models() == ["b"]
+
+
+def test_all_open_circuits_still_get_a_call():
+    router = ModelRouter(["a", "b"], consecutive_failures_threshold=1)
+    with pytest.raises(RuntimeError, match="b failed"):
+        asyncio.run(router.run(failing("a", "b")))
+    assert router.ordered_models() == ["a", "b"]
+
+
+def test_faster_model_goes_first():
+    clock = Clock()
+    router = ModelRouter(["slow", "fast"], clock=clock)
+    router.record("slow", 5.0, ok=True)
+    router.record("fast", 1.0, ok=True)
+    assert router.ordered_models() == ["fast", "slow"]
+
+
+def test_hedge_returns_first_success_and_cancels_the_rest():
+    cancelled = []
+
+    async def call(model: str) -> str:
+        try:
+            await asyncio.sleep({"a": 1.0, "b": 0.01}[model])
+        except asyncio.CancelledError:
+            cancelled.append(model)
+            raise
+        return model
+
+    router = ModelRouter(["a", "b"], hedge_after=0.02)
+    assert asyncio.run(router.run(call)) == "b"
+    assert cancelled == ["a"]
+    assert not router.stats["a"].probe_in_flight
+
+
+def test_limiter_failure_is_not_recorded_as_model_failure():
+    class BrokenLimiter:
+        async def __aenter__(self):
+            raise RuntimeError("limiter is down")
+
+        async def __aexit__(self, *exc_info):
+            return None
+
+        def ready(self) -> bool:
+            return True
+
+    router = ModelRouter(["a"], limiters={"a": BrokenLimiter()})
+    router.stats["a"].state = CircuitState.HALF_OPEN
+    with pytest.raises(RuntimeError, match="limiter is down"):
+        asyncio.run(router.run(failing()))
+    assert router.stats["a"].calls == 0
+    assert not router.stats["a"].probe_in_flight
+
+
+def test_empty_model_list_is_rejected():
+    with pytest.raises(ValueError):
+        ModelRouter([])
+
+
+def _agent(fake_redis, runner, hedge_after=None) -> ResumeServiceAgent:
+    return ResumeServiceAgent(
+        fake_redis, INSTRUCTIONS_DIR, backup_models=["a", "b"],
+        model_router=ModelRouter(["a", "b"], hedge_after=hedge_after), runner=runner,
+    )
+
+
+def test_agent_falls_back_on_broken_output_and_caches_only_parsed(fake_redis, fake_runner):
+    runner = fake_runner({"a": '{"html_code": "<html', "b": json.dumps({"html_code": HTML})})
+    agent = _agent(fake_redis, runner)
+
+    async def run_twice():
+        first = await agent._cached_run("Resume Creator", "payload", "input", agent._html_code)
+        second = await agent._cached_run("Resume Creator", "payload", "input", agent._html_code)
+        return first, second
+
+    assert asyncio.run(run_twice()) == (HTML, HTML)
+    # Второй вызов взят из кэша, обрезанный ответ модели a туда не попал
+    assert runner.calls == ["a", "b"]
+    assert agent.model_router.stats["a"].error_rate == 1
+
+
+def test_streamed_hedge_resets_and_sends_the_winner(fake_redis, fake_runner):
+    runner = fake_runner(
+        {"a": json.dumps({"html_code": HTML}), "b": json.dumps({"html_code": HTML})},
+        delays={"a": 0.01, "b": 0.001},
+    )
+    # a успевает выйти в эфир, но медленнее хеджа b, который заканчивает первым
+    agent = _agent(fake_redis, runner, hedge_after=0.03)
+    events, html = [], []
+
+    async def on_delta(text: str) -> None:
+        events.append("delta")
+        html.append(text)
+
+    async def on_reset() -> None:
+        events.append("reset")
+        html.clear()
+
+    result = asyncio.run(agent._cached_run(
+        "Resume Creator", "stream", "input", agent._html_code, on_delta=on_delta, on_reset=on_reset
+    ))
+    assert result == HTML
+    assert "".join(html) == HTML
+    assert events.count("reset") == 2  # эфир у a, затем переход к b
+    assert runner.calls == ["a", "b"]
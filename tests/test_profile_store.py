@@ -0,0 +1,78 @@
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from core.db.db import engine
+from core.models.base import Base
+from core.models.resume import Resume
+from core.models.resume_version import ResumeVersion
+from core.models.user import User
+from core.utils.profile_store import STORAGE_DELTA, ProfileStore
+
+TELEGRAM_ID = 2_000_000_017
+
+VERSIONS = [
+    {"name": "Иван", "position": "Junior", "skills": ["Python"]},
+    {"name": "Иван", "position": "Middle", "skills": ["Python"]},
+    {"name": "Иван Петров", "position": "Middle", "skills": ["Python", "SQL"]},
+    {"name": "Иван Петров", "position": "Senior", "skills": ["Python", "SQL"], "summary": "Бэкенд"},
+    {"name": "Иван Петров", "position": "Lead", "skills": ["Python", "SQL"], "summary": "Бэкенд"},
+]
+
+
+def test_build_stores_snapshots_and_deltas():
+    store = ProfileStore(mode=STORAGE_DELTA, snapshot_every=3)
+    assert store.build(1, VERSIONS[0]).is_snapshot
+
+    delta = store.build(2, VERSIONS[1], base=VERSIONS[0])
+    assert not delta.is_snapshot
+    assert delta.delta == {"position": "Middle"}
+    # Поля поиска хранятся и в дельте
+    assert (delta.position, delta.skills) == ("Middle", ["Python"])
+
+    assert store.build(4, VERSIONS[3], base=VERSIONS[2]).is_snapshot
+
+
+async def _restore(numbers: list[int]) -> dict[int, dict]:
+    writer = ProfileStore(mode=STORAGE_DELTA, snapshot_every=3)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(User(telegram_id=TELEGRAM_ID, name="delta"))
+        resume = Resume(title="delta", user_id=TELEGRAM_ID, versions=[])
+        base = None
+        for number, data in enumerate(VERSIONS, start=1):
+            version = ResumeVersion(version=number, resume=resume)
+            version.profile = writer.build(number, data, base)
+            base = data
+        session.add(resume)
+        await session.commit()
+        resume_id = resume.id
+
+    # Новый ProfileStore с пустым кэшем: профиль собирается из БД от ближайшего снимка
+    reader = ProfileStore(mode=STORAGE_DELTA, snapshot_every=3)
+    try:
+        async with AsyncSession(engine) as session:
+            restored = {}
+            for number in numbers:
+                version = await session.scalar(
+                    select(ResumeVersion)
+                    .options(selectinload(ResumeVersion.profile))
+                    .where(ResumeVersion.resume_id == resume_id, ResumeVersion.version == number)
+                )
+                restored[number] = await reader.materialize(session, version)
+            return restored
+    finally:
+        async with AsyncSession(engine) as session:
+            await session.delete(await session.get(User, TELEGRAM_ID))
+            await session.commit()
+        await engine.dispose()
+
+
+def test_materialize_rebuilds_profiles_from_the_nearest_snapshot():
+    restored = asyncio.run(_restore([5, 3, 2]))
+    for number, profile in restored.items():
+        assert profile == {field: VERSIONS[number - 1].get(field) for field in profile}
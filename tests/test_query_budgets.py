@@ -0,0 +1,36 @@
+"""Бюджеты SQL-запросов всех маршрутов API (scripts/check_query_budgets.py) на sqlite.
+
+Ветки только для Postgres здесь не выполняются: блокировка резюме FOR UPDATE
+при правке, carry_forward профиля в SQL (profile_store.merges_on_server) и
+полнотекстовый поиск. Их запросы считает скрипт, запущенный на Postgres из DB_URL.
+"""
+import asyncio
+
+from httpx import ASGITransport, AsyncClient
+
+from backend.main import app
+from core.db.db import engine
+from core.db.query_counter import install
+from core.models.base import Base
+from scripts.check_query_budgets import check_coverage, run_scenario
+
+TELEGRAM_ID = 2_000_000_001
+
+
+async def _check_budgets() -> set[str]:
+    install(engine)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://budget") as client:
+        try:
+            # QueryBudgetExceeded — подкласс AssertionError, pytest покажет лишние запросы
+            return await run_scenario(client, TELEGRAM_ID)
+        finally:
+            await client.delete(f"/api/v1/users/delete/{TELEGRAM_ID}/")
+            await engine.dispose()
+
+
+def test_endpoints_stay_within_query_budgets():
+    called = asyncio.run(_check_budgets())
+    assert check_coverage(app, called) == []
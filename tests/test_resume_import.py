@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from backend.main import app
+from core.db.db import engine
+from core.models.base import Base
+from core.utils.agents.gpt_agent import ResumeServiceAgent
+from core.utils.resume_import.extractor import document_extractor
+
+TELEGRAM_ID = 2_000_000_011
+
+
+async def _post_import(client: AsyncClient, user_id: int, content: bytes, filename: str = "cv.pdf"):
+    return await client.post(
+        "/api/v1/resume/import/",
+        data={"user_id": str(user_id)},
+        files={"file": (filename, content, "application/pdf")},
+    )
+
+
+async def _import(user_id: int, content: bytes):
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://import") as client:
+        response = await client.post("/api/v1/users/create/", json={"name": "import", "telegram_id": TELEGRAM_ID})
+        assert response.status_code in (200, 201, 409)
+        try:
+            return await _post_import(client, user_id, content)
+        finally:
+            await client.delete(f"/api/v1/users/delete/{TELEGRAM_ID}/")
+            await engine.dispose()
+
+
+def test_unknown_user_is_rejected_before_extraction(monkeypatch):
+    async def extract(path):
+        raise AssertionError("document must not be parsed for an unknown user")
+
+    monkeypatch.setattr(document_extractor, "extract", extract)
+    response = asyncio.run(_import(TELEGRAM_ID + 1, b"%PDF-1.4"))
+    assert response.status_code == 404
+
+
+def test_corrupt_pdf_is_unprocessable():
+    try:
+        response = asyncio.run(_import(TELEGRAM_ID, b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog"))
+    finally:
+        document_extractor.shutdown()
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Cannot read document"
+
+
+def test_classified_fragments_reject_wrong_types():
+    assert ResumeServiceAgent._classified_fragments('{"skills": ["Python"], "extra": {"Языки": "English"}}') == {
+        "skills": ["Python"], "extra": {"Языки": "English"},
+    }
+    for output in ('{"skills": "Python"}', '{"experience": {"company": "ACME"}}', '["Python"]'):
+        with pytest.raises(ValueError):
+            ResumeServiceAgent._classified_fragments(output)
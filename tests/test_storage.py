@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from core.utils.storage import CHUNK_SIZE, InvalidStorageKey, LocalStorage, S3Storage
+
+
+@pytest.mark.parametrize("key", ["../outside.html", "1/../../outside.html", "/etc/passwd", "", "1/.."])
+def test_local_storage_rejects_keys_outside_root(tmp_path, key):
+    storage = LocalStorage(tmp_path / "root")
+    with pytest.raises(InvalidStorageKey):
+        storage._path(key)
+
+
+def test_local_storage_roundtrip_and_legacy_absolute_path(tmp_path):
+    async def scenario():
+        storage = LocalStorage(tmp_path)
+        await storage.write("1/resume_2/html/a.html", b"<p>a</p>")
+        # Старые записи path_to_* хранят абсолютный путь внутри root
+        legacy = await storage.read(str(tmp_path / "1/resume_2/html/a.html"))
+        streamed = [chunk async for chunk in storage.stream("1/resume_2/html/a.html")]
+        await storage.delete_prefix("1/resume_2/")
+        exists = await storage.exists("1/resume_2/html/a.html")
+        with pytest.raises(InvalidStorageKey):
+            await storage.write("../escape.html", b"x")
+        await storage.close()
+        return legacy, streamed, exists
+
+    legacy, streamed, exists = asyncio.run(scenario())
+    assert legacy == b"<p>a</p>" and streamed == [b"<p>a</p>"] and not exists
+    assert not (tmp_path.parent / "escape.html").exists()
+
+
+class StubS3Error(Exception):
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class StubBody:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.closed = False
+
+    async def read(self, size: int) -> bytes:
+        chunk, self.data = self.data[:size], self.data[size:]
+        return chunk
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class StubPaginator:
+    def __init__(self, objects: dict[str, bytes]):
+        self.objects = objects
+
+    async def paginate(self, Bucket: str, Prefix: str):
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        # Две страницы, чтобы проверить обход пагинатора
+        for page in (keys[:1], keys[1:]):
+            yield {"Contents": [{"Key": key} for key in page]} if page else {}
+
+
+class StubS3Client:
+    """Минимальный клиент aiobotocore: объекты одного бакета в словаре."""
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.bodies: list[StubBody] = []
+
+    async def put_object(self, Bucket: str, Key: str, Body: bytes):
+        self.objects[Key] = Body
+
+    async def get_object(self, Bucket: str, Key: str):
+        if Key not in self.objects:
+            raise StubS3Error("NoSuchKey")
+        self.bodies.append(StubBody(self.objects[Key]))
+        return {"Body": self.bodies[-1]}
+
+    async def head_object(self, Bucket: str, Key: str):
+        if Key not in self.objects:
+            raise StubS3Error("404")
+        return {}
+
+    def get_paginator(self, name: str):
+        assert name == "list_objects_v2"
+        return StubPaginator(self.objects)
+
+    async def delete_objects(self, Bucket: str, Delete: dict):
+        for item in Delete["Objects"]:
+            self.objects.pop(item["Key"], None)
+
+
+def test_s3_storage_against_stub_client():
+    async def scenario():
+        client = StubS3Client()
+        storage = S3Storage(bucket="resumes", prefix="prod/")
+        storage._client = client
+
+        data = b"x" * (CHUNK_SIZE + 10)
+        await storage.write("1/resume_2/pdf/a.pdf", data)
+        await storage.write_text("1/resume_2/html/a.html", "<p>a</p>")
+        await storage.write("1/resume_3/html/b.html", b"<p>b</p>")
+
+        result = {
+            "keys": set(client.objects),
+            "read": await storage.read("1/resume_2/pdf/a.pdf"),
+            "text": await storage.read_text("1/resume_2/html/a.html"),
+            "missing": await storage.read("1/resume_2/pdf/none.pdf"),
+            "exists": await storage.exists("1/resume_2/html/a.html"),
+            "absent": await storage.exists("1/resume_2/html/none.html"),
+        }
+        with pytest.raises(FileNotFoundError):
+            async for _ in storage.stream("1/resume_2/pdf/none.pdf"):
+                pass
+
+        await storage.delete_prefix("1/resume_2/")
+        result["left"] = set(client.objects)
+        result["bodies_closed"] = all(body.closed for body in client.bodies)
+        return result
+
+    result = asyncio.run(scenario())
+    assert result["keys"] == {"prod/1/resume_2/pdf/a.pdf", "prod/1/resume_2/html/a.html", "prod/1/resume_3/html/b.html"}
+    assert result["read"] == b"x" * (CHUNK_SIZE + 10)
+    assert result["text"] == "<p>a</p>"
+    assert result["missing"] is None
+    assert result["exists"] and not result["absent"]
+    assert result["left"] == {"prod/1/resume_3/html/b.html"}
+    assert result["bodies_closed"]